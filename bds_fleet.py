@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import math
+import time
+
+import numpy as np
+
+from json_payloads import bds_template
+from location_calculator import advance_positions
+from target_builder import RealtimeTargetTemplate, join_target_lists
+
+# BDS(北斗)船队位置流。
+# - N 个终端的位置、航速、航向保存在 numpy 数组中，每次定时器触发时整体推算一次，
+#   各终端的航向、航速独立随机游走
+# - 按总发送速率（终端次/秒）轮流取出到期的终端发送，单个终端的上报间隔 = 终端数 / 总速率
+# - 每个终端的BDS消息模板只构建一次；utc 每秒只格式化一次
+# - 组合类型（RADAR_BDS、AIS_A_BDS 等）同时向 unionTargetPb 发送融合目标，
+#   目标ID、MMSI、北斗号在生成时确定，整个运行期间不变
+
+BDS_FLEET_CLASSES = ("BDS", "RADAR_BDS", "AIS_A_BDS", "AIS_B_BDS", "RADAR_AIS_A_BDS", "RADAR_AIS_B_BDS")
+
+DEFAULT_RATE = 200  # 终端次/秒
+# 一条 TargetProtoList 消息最多包含的目标数
+PB_BATCH_SIZE = 200
+# 航向、航速随机游走的标准差（每秒）
+COURSE_SIGMA_DEG = 2.0
+SPEED_SIGMA_KNOTS = 0.2
+SPEED_RANGE_KNOTS = (2.0, 20.0)
+
+
+def random_ids(rng, count, prefix="", length=9):
+    """
+    按 random_generation 规则（前缀 + 1-9 的随机数字，与界面随机生成一致）生成 count 个互不相同的ID字符串。
+    """
+    random_len = length - len(prefix)
+    if random_len <= 0:
+        raise ValueError(f"总长度({length})必须大于前缀'{prefix}'的长度。")
+    if count > 9 ** min(random_len, 12):
+        raise ValueError(f"长度为 {length} 的ID不足以生成 {count} 个不重复的值。")
+    ids = []
+    seen = set()
+    while len(ids) < count:
+        need = count - len(ids)
+        digits = (rng.integers(1, 10, size=(need, random_len), dtype=np.uint8) + ord("0")).tobytes().decode("ascii")
+        for i in range(need):
+            an_id = prefix + digits[i * random_len:(i + 1) * random_len]
+            if an_id not in seen:
+                seen.add(an_id)
+                ids.append(an_id)
+    return ids
+
+
+class BdsFleet:
+    """
+    N 个北斗终端组成的船队，按总发送速率错开发送各终端的位置。
+    :param count: 终端数
+    :param selected_class: 目标类型，取值见 BDS_FLEET_CLASSES
+    :param center: (纬度, 经度)，终端在其周围 radius_deg 度范围内随机分布
+    :param fields: 所有终端共用的字段
+        province(省份英文名), provider, adapterId, eTargetType, sost, s_class,
+        sources: {源键: [id字符串, ...]}（仅组合类型使用，只取类型中包含的信息源）
+    :param id_rules: 配置中的 random_generation，用于生成目标ID、MMSI、北斗号
+    :param start_time: 单调时钟的开始时间
+    :param rate: 总发送速率（终端次/秒）
+    :param seed: 相同参数和种子生成的船队相同
+    """
+    def __init__(self, count, selected_class, center, fields, id_rules, start_time,
+                 rate=DEFAULT_RATE, seed=0, radius_deg=0.2):
+        if count <= 0 or rate <= 0:
+            raise ValueError("终端数和发送速率必须大于0。")
+        if selected_class not in BDS_FLEET_CLASSES:
+            raise ValueError(f"不支持的目标类型: {selected_class}")
+        rng = np.random.default_rng(seed)
+        self.count = count
+        self.selected_class = selected_class
+        self.rate = float(rate)
+        self._rng = rng
+
+        # 运动状态
+        center_lat, center_lon = center
+        self.lat = center_lat + rng.uniform(-radius_deg, radius_deg, count)
+        self.lon = center_lon + rng.uniform(-radius_deg, radius_deg, count)
+        self.speed = rng.uniform(SPEED_RANGE_KNOTS[0], SPEED_RANGE_KNOTS[1] / 2, count)
+        self.course = rng.uniform(0.0, 360.0, count)
+
+        # 各终端不变的身份信息
+        lengths = rng.integers(20, 300, count)
+        self.terminals = [int(t) for t in random_ids(rng, count, **id_rule(id_rules, "bds"))]
+        self.ship_names = [f"BDS{i:05d}" for i in range(count)]
+        self._bds_templates = [
+            bds_template(province=fields["province"], provider=fields["provider"], ship_length=float(length),
+                         ship_name=name, terminal=terminal)
+            for length, name, terminal in zip(lengths.tolist(), self.ship_names, self.terminals)
+        ]
+
+        self.target_ids = []
+        self.mmsis = []
+        self._pb_templates = []
+        if selected_class != "BDS":
+            self.target_ids = [int(t) for t in random_ids(rng, count, **id_rule(id_rules, "id"))]
+            is_ais = "AIS" in selected_class
+            if is_ais:
+                self.mmsis = [int(m) for m in random_ids(rng, count, **id_rule(id_rules, "mmsi"))]
+            source_keys = ["bds"] + [key for key in ("ais", "radar") if key.upper() in selected_class]
+            sources = {key: ids for key, ids in fields.get("sources", {}).items() if key in source_keys}
+            for i, length in enumerate(lengths.tolist()):
+                self._pb_templates.append(RealtimeTargetTemplate({
+                    "id": self.target_ids[i],
+                    "sost": fields["sost"],
+                    "eTargetType": fields["eTargetType"],
+                    "adapterId": fields["adapterId"],
+                    "mmsi": self.mmsis[i] if is_ais else 0,
+                    "vesselName": self.ship_names[i] if is_ais else "",
+                    "len": length,
+                    "shiptype": fields.get("shiptype", 0),
+                    "s_class": fields["s_class"],
+                    "is_radar": "RADAR" in selected_class,
+                    "sources": sources,
+                }))
+        self._reported = np.zeros(count, dtype=bool)
+
+        self.start_time = start_time
+        self.last_time = start_time
+        self.sent = 0  # 已发送的终端次（跨周期累计）
+        self.skipped = 0  # 延迟过大时放弃补发的终端次
+        self.bds_messages = 0
+        self.pb_messages = 0
+        self._utc_second = None
+        self._utc_text = ""
+
+    @property
+    def has_protobuf(self):
+        return bool(self._pb_templates)
+
+    @property
+    def cycle(self):
+        return self.sent // self.count
+
+    @property
+    def report_interval(self):
+        """单个终端的上报间隔（秒）"""
+        return self.count / self.rate
+
+    def _advance(self, dt):
+        """把全部终端推进 dt 秒，然后各自随机调整航向和航速。"""
+        self.lat, self.lon = advance_positions(self.lat, self.lon, self.speed, self.course, dt)
+        scale = math.sqrt(dt)
+        self.course = (self.course + self._rng.normal(0.0, COURSE_SIGMA_DEG * scale, self.count)) % 360.0
+        self.speed = np.clip(self.speed + self._rng.normal(0.0, SPEED_SIGMA_KNOTS * scale, self.count),
+                             *SPEED_RANGE_KNOTS)
+
+    def _utc(self, wall_time):
+        second = int(wall_time)
+        if second != self._utc_second:
+            self._utc_second = second
+            self._utc_text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        return self._utc_text
+
+    def _dynamic_values(self, indices):
+        """取出指定终端的位置、航速、航向（Python float 列表，编码时不经过通用编码器）。"""
+        return (np.round(self.lat[indices], 6).tolist(), np.round(self.lon[indices], 6).tolist(),
+                np.round(self.speed[indices], 1).tolist(), np.round(self.course[indices], 1).tolist())
+
+    def _protobuf_messages(self, indices, values, last_tm, status=None):
+        """每个目标单独序列化后按 PB_BATCH_SIZE 拼接为多目标消息。"""
+        lat, lon, speed, course = values
+        reported = self._reported
+        chunks = []
+        for k, i in enumerate(indices):
+            target_status = status if status is not None else (2 if reported[i] else 1)
+            chunks.append(self._pb_templates[i].render(last_tm, target_status, lon[k], lat[k],
+                                                       speed[k], course[k]).SerializeToString())
+        reported[indices] = status != 3
+        return join_target_lists(chunks, PB_BATCH_SIZE)
+
+    def due_messages(self, now, wall_time):
+        """
+        推进运动状态并取出从上次调用到 now 之间到期的终端；定时器延迟时补发，但最多补一轮。
+        :param now: 单调时钟
+        :param wall_time: time.time()，用于 utc 和 lastTm
+        :return: (BDS JSON 消息列表, unionTargetPb 消息列表)，均为 bytes
+        """
+        dt = now - self.last_time
+        if dt > 0:
+            self._advance(dt)
+            self.last_time = now
+
+        count = self.count
+        due = int((now - self.start_time) * self.rate) + 1
+        if due - self.sent > count:
+            self.skipped += due - count - self.sent
+            self.sent = due - count
+        if due <= self.sent:
+            return [], []
+        indices = (np.arange(self.sent, due) % count).tolist()
+        self.sent = due
+
+        values = self._dynamic_values(indices)
+        lat, lon, speed, course = values
+        utc = self._utc(wall_time)
+        templates = self._bds_templates
+        bds_messages = [templates[i].render_bytes(course[k], lat[k], lon[k], speed[k], utc)
+                        for k, i in enumerate(indices)]
+        pb_messages = self._protobuf_messages(indices, values, int(wall_time * 1000)) if self._pb_templates else []
+        self.bds_messages += len(bds_messages)
+        self.pb_messages += len(pb_messages)
+        return bds_messages, pb_messages
+
+    def delete_messages(self, wall_time):
+        """:return: 已上报过的融合目标的删除消息（数据状态3），纯BDS类型返回空列表"""
+        if not self._pb_templates:
+            return []
+        indices = np.flatnonzero(self._reported).tolist()
+        if not indices:
+            return []
+        return self._protobuf_messages(indices, self._dynamic_values(indices), int(wall_time * 1000), status=3)
+
+
+def id_rule(id_rules, key):
+    rule = (id_rules or {}).get(key, {})
+    return {"prefix": rule.get("prefix", ""), "length": rule.get("length", 9)}
@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import zlib
+
+# 模拟器热点路径的基准测试，不需要Kafka和数据库。
+# 所有输入数据由固定种子生成，结果写入JSON文件；指定 --baseline 时与上一次结果对比，便于跟踪性能回退。
+# 用法: python benchmark.py [-o benchmark_results.json] [--only realtime_pb playback_pb] [--baseline old.json]
+
+DEFAULT_OUTPUT = "benchmark_results.json"
+SEED = 20240601
+BASE_TM = 1717200000000  # 2024-06-01 00:00:00 UTC (ms)
+S_CLASS_MAP = {"RADAR": 1, "AIS_A": 1, "AIS_B": 2, "OTHERS": 14}
+
+
+def _rate(func, min_time):
+    """
+    重复调用 func 直到累计耗时不少于 min_time 秒。
+    :return: (每秒调用次数, 每次调用微秒数)
+    """
+    func()  # 预热
+    count = 0
+    batch = 1
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            func()
+        count += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return count / elapsed, elapsed / count * 1e6
+        batch = min(batch * 2, 10000)
+
+
+def _timed(func, repeat):
+    """:return: repeat 次调用中最短的耗时(秒)及最后一次的返回值"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+# ===================================================================
+# 测试数据
+# ===================================================================
+
+def synthetic_track_points(count, mmsi, rng, interval_ms=6000, start_tm=BASE_TM):
+    """
+    生成与数据库查询结果格式相同的轨迹点（dict列表），航速航向缓慢变化。
+    sources / fusionTargets 为JSON字符串，同一条轨迹中只有少数几种取值。
+    """
+    from location_calculator import LocationCalculator
+
+    calculator = LocationCalculator(30.0 + rng.random(), 122.0 + rng.random(), 12.0, rng.uniform(0, 360))
+    sources = json.dumps([{"provider": "HLX", "type": "AIS", "ids": ["334", "337"]},
+                          {"provider": "HLX", "type": "RADAR", "ids": ["18"]}])
+    points = []
+    for i in range(count):
+        if i % 50 == 0:
+            calculator.update_params(speed_knots=rng.uniform(5, 20),
+                                     course_degrees=(calculator.course_degrees + rng.uniform(-15, 15)) % 360)
+        lat, lon = calculator.calculate_next_point(interval_ms / 1000.0)
+        last_tm = start_tm + i * interval_ms
+        # 融合信息中的更新时间每分钟变化一次
+        fusion = json.dumps([{"targetId": 9000000000 + mmsi, "stationId": 334, "stationType": "AIS",
+                              "updateTime": last_tm - last_tm % 60000}])
+        points.append({
+            "lastTm": last_tm,
+            "lastDT": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(last_tm / 1000)),
+            "longitude": lon, "latitude": lat,
+            "speed": calculator.speed_knots, "course": calculator.course_degrees,
+            "heading": calculator.course_degrees,
+            "maxLen": 90, "len": 90, "idR": 18, "shipType": 70, "state": 1, "aidType": 1,
+            "mmsi": mmsi, "vesselName": f"SIMU {mmsi}", "targetType": "TT_AR", "status": "2",
+            "province": "Shandong", "sClass": "AIS_A",
+            "sources": sources, "fusionTargets": fusion,
+        })
+    return points
+
+
+def synthetic_trajectories(total_points, track_count, seed=SEED):
+    """:return: prepare_playback 的输入 [(行号, 轨迹点列表, 目标ID), ...]"""
+    rng = random.Random(seed)
+    per_track = max(1, total_points // track_count)
+    return [(row, synthetic_track_points(per_track, 412000000 + row, rng), 1123456789012340000 + row)
+            for row in range(track_count)]
+
+
+def sample_ais_static_payload():
+    """与静态信息页签发送内容相同结构的AIS静态信息。"""
+    return {"AisExts": [{
+        "MMSI": "412345678", "Vessel Name": "SIMU VESSEL", "Ship Class": "A",
+        "Nationality": "CN", "IMO": "9876543", "Call_Sign": "BXYZ",
+        "LengthRealTime": "90.0", "Length": "90.0", "Wide": "16.0", "Draught": "6.5",
+        "Ship Type": "Cargo", "Destination": "QINGDAO", "etaTime": "2024-06-01 12:00:00",
+        "A (to Bow)": "40", "B (to Stern)": "50", "C (to Port)": "8", "C (to Starboard)": "8",
+        "extInfo": None
+    }]}
+
+
+def sample_bds_payload():
+    """与实时目标页签发送内容相同结构的BDS位置信息。"""
+    return {
+        "altitude": 0, "communicate": 0, "course": 90.0,
+        "disassemble": 0, "distress": 0, "jobType": "",
+        "latitude": 37.10129318, "longitude": 122.92539836,
+        "online": 0, "power": 0, "provider": 1,
+        "province": "Shandong", "shipLength": 90.0, "shipName": "SIMU VESSEL",
+        "source": 2, "speed": 12.5, "status": 0, "terminal": 123456789,
+        "tilt": 0, "utc": "2024-06-01 00:00:00"
+    }
+
+
+def _prepare(total_points, track_count):
+    from playback_prep import prepare_playback
+    trajectories = synthetic_trajectories(total_points, track_count)
+    return trajectories, prepare_playback(trajectories, s_class_map=S_CLASS_MAP)
+
+
+# ===================================================================
+# 基准测试项，每项返回 {指标名: 数值}
+# ===================================================================
+
+def bench_location_calculator(args):
+    from location_calculator import LocationCalculator
+    calculator = LocationCalculator(37.1, 122.9, 12.5, 45.0)
+    ops, us = _rate(lambda: calculator.calculate_next_point(1.0), args.min_time)
+    return {"points_per_sec": ops, "us_per_point": us}
+
+
+def bench_realtime_pb(args):
+    from target_builder import RealtimeTargetTemplate
+    template = RealtimeTargetTemplate({
+        "id": 1123456789012345678, "sost": 1, "eTargetType": 1, "adapterId": 15,
+        "mmsi": 412345678, "vesselName": "SIMU VESSEL", "len": 90, "shiptype": 70,
+        "s_class": 1, "is_radar": True,
+        "sources": {"ais": ["334", "337"], "radar": ["18"]},
+    })
+    state = {"tm": BASE_TM}
+
+    def build_and_serialize():
+        state["tm"] += 1000
+        return template.render(state["tm"], 1, 122.92539836, 37.10129318, 12.5, 90.0).SerializeToString()
+
+    ops, us = _rate(build_and_serialize, args.min_time)
+    return {"messages_per_sec": ops, "us_per_message": us, "message_bytes": len(build_and_serialize())}
+
+
+def bench_playback_pb(args):
+    import target_pb2
+    from playback_prep import build_playback_target
+    trajectories, prepared = _prepare(2000, 1)
+    track = prepared.tracks[0]
+    state = {"i": 0}
+
+    def build_and_serialize():
+        i = state["i"] = (state["i"] + 1) % len(track)
+        message = target_pb2.TargetProtoList()
+        message.list.append(build_playback_target(track, i, 0))
+        return message.SerializeToString()
+
+    ops, us = _rate(build_and_serialize, args.min_time)
+    return {"messages_per_sec": ops, "us_per_message": us, "message_bytes": len(build_and_serialize())}
+
+
+def bench_decode_data(args):
+    import target_pb2
+    from decode_data import decode_data
+    from playback_prep import build_playback_target
+    trajectories, prepared = _prepare(200, 1)
+    track = prepared.tracks[0]
+
+    results = {}
+    for targets in (1, 50):
+        message = target_pb2.TargetProtoList()
+        for i in range(targets):
+            message.list.append(build_playback_target(track, i, 0))
+        hex_string = zlib.compress(message.SerializeToString()).hex()
+        kb = len(hex_string) / 2 / 1024.0
+        ops, us = _rate(lambda: decode_data(hex_string), args.min_time)
+        results[f"{targets}_targets_frames_per_sec"] = ops
+        results[f"{targets}_targets_ms_per_kb"] = us / 1000.0 / kb
+    return results
+
+
+def bench_json_payloads(args):
+    results = {}
+    for name, payload in (("ais_static", sample_ais_static_payload()), ("bds", sample_bds_payload())):
+        # indent=2 为当前发送使用的格式，compact 用于对比
+        ops, us = _rate(lambda: json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8'), args.min_time)
+        results[f"{name}_indent_us"] = us
+        ops, us = _rate(lambda: json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                        args.min_time)
+        results[f"{name}_compact_us"] = us
+        results[f"{name}_indent_bytes"] = len(json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    from json_payloads import bds_template, encode_ais_record, iter_ais_exts_batches
+    bds = sample_bds_payload()
+    template = bds_template(bds["province"], bds["provider"], bds["shipLength"], bds["shipName"], bds["terminal"])
+    ops, us = _rate(lambda: template.render_bytes(bds["course"], bds["latitude"], bds["longitude"],
+                                                  bds["speed"], bds["utc"]), args.min_time)
+    results["bds_template_us"] = us
+
+    # 1000 艘船的AIS静态信息，每条消息100艘：逐条编码 vs 预编码片段拼接
+    record = sample_ais_static_payload()["AisExts"][0]
+    records = [dict(record, MMSI=str(412000000 + i)) for i in range(1000)]
+    fragments = [encode_ais_record(r) for r in records]
+    ops, us = _rate(lambda: [json.dumps({"AisExts": records[i:i + 100]}, ensure_ascii=False, indent=2).encode('utf-8')
+                             for i in range(0, len(records), 100)], args.min_time)
+    results["ais_static_1000_vessels_indent_ms"] = us / 1000.0
+    ops, us = _rate(lambda: list(iter_ais_exts_batches(fragments, 100)), args.min_time)
+    results["ais_static_1000_vessels_batched_ms"] = us / 1000.0
+    return results
+
+
+class _DrawHost:
+    """
+    提供 MainWindow.draw_trajectories 用到的控件和状态，避免构造完整窗口（会连接Kafka和数据库）。
+    """
+    def __init__(self, show_timestamp):
+        from PyQt5.QtWidgets import QCheckBox, QGraphicsScene, QTableWidget
+        from main_window import ZoomableView
+
+        self.playback_table = QTableWidget(0, 1)
+        self.playback_query_cache = {}
+        self.show_timestamp_checkbox = QCheckBox()
+        self.show_timestamp_checkbox.setChecked(show_timestamp)
+        self.trajectory_scene = QGraphicsScene()
+        self.trajectory_preview = ZoomableView(self.trajectory_scene)
+        self.trajectory_preview.resize(800, 600)
+
+    def set_trajectories(self, trajectories):
+        from PyQt5.QtCore import Qt
+        from PyQt5.QtWidgets import QTableWidgetItem
+
+        self.playback_table.setRowCount(len(trajectories))
+        self.playback_query_cache.clear()
+        for row, points, target_id in trajectories:
+            item = QTableWidgetItem()
+            item.setCheckState(Qt.Checked)
+            self.playback_table.setItem(row, 0, item)
+            self.playback_query_cache[row] = {"params": {}, "points": points}
+
+
+def bench_draw_trajectories(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = {}
+    for show_timestamp in (False, True):
+        host = _DrawHost(show_timestamp)
+        for total_points in args.draw_points:
+            host.set_trajectories(synthetic_trajectories(total_points, 4))
+            elapsed, _ = _timed(lambda: MainWindow.draw_trajectories(host), args.repeat)
+            app.processEvents()
+            suffix = "_labels" if show_timestamp else ""
+            results[f"{total_points}_points{suffix}_ms"] = elapsed * 1000
+    return results
+
+
+def bench_v4_prep(args):
+    from playback_prep import PlaybackStream, prepare_playback
+    results = {}
+    for total_points in args.prep_points:
+        trajectories = synthetic_trajectories(total_points, 4)
+        prep_time, prepared = _timed(lambda: prepare_playback(trajectories, s_class_map=S_CLASS_MAP), args.repeat)
+
+        def drain():
+            stream = PlaybackStream(prepared, BASE_TM)
+            while stream.next() is not None:
+                pass
+
+        drain_time, _ = _timed(drain, args.repeat)
+        results[f"{total_points}_points_prepare_ms"] = prep_time * 1000
+        results[f"{total_points}_points_stream_ms"] = drain_time * 1000
+        results[f"{total_points}_points_prepare_us_per_point"] = prep_time / prepared.total_points * 1e6
+    return results
+
+
+def bench_bds_fleet(args):
+    """1000 个终端，每次取出一轮全部到期终端：纯BDS与 RADAR_AIS_A_BDS（同时生成 unionTargetPb）。"""
+    from bds_fleet import BdsFleet
+    id_rules = {"id": {"prefix": "11", "length": 19}, "mmsi": {"length": 9}, "bds": {"length": 9}}
+    fields = {"province": "Shandong", "provider": 66, "adapterId": 37, "eTargetType": 9, "sost": 1, "s_class": 1,
+              "sources": {"ais": ["334"], "radar": ["18"], "bds": ["66"]}}
+    results = {}
+    for selected_class in ("BDS", "RADAR_AIS_A_BDS"):
+        fleet = BdsFleet(1000, selected_class, (36.0, 120.3), fields, id_rules, 0.0, rate=1000, seed=SEED)
+        clock = [0.0]
+
+        def cycle():
+            clock[0] += 1.0
+            return fleet.due_messages(clock[0], BASE_TM / 1000.0 + clock[0])
+
+        ops, us = _rate(cycle, args.min_time)
+        results[f"{selected_class}_1000_terminals_ms"] = us / 1000.0
+    return results
+
+
+def bench_motion_models(args):
+    """1000 艘随机类型的船，1 小时航迹（10 秒间隔）一次性批量生成。"""
+    import numpy as np
+    from motion_models import evaluate_tracks, random_models
+    models = random_models(1000, (36.0, 120.3), seed=SEED)
+    noisy_models = random_models(1000, (36.0, 120.3), seed=SEED, noise_sigma=0.5)
+    times = np.arange(0.0, 3600.0, 10.0)
+    results = {}
+    for name, model_list in (("plain", models), ("noise", noisy_models)):
+        elapsed, tracks = _timed(lambda: evaluate_tracks(model_list, times), args.repeat)
+        results[f"{name}_1000_ships_ms"] = elapsed * 1000
+        results[f"{name}_ns_per_point"] = elapsed / tracks["latitude"].size * 1e9
+    return results
+
+
+def bench_scenario_cache(args):
+    """1000 艘随机类型的船、1 小时（10 秒间隔）的场景：编译、打开缓存、读取并序列化一帧。"""
+    import tempfile
+    from scenario_cache import ScenarioCache, compile_scenario
+    spec = {"duration": 3600, "interval": 10, "defaults": {"sost": 1, "eTargetType": 9, "adapterId": 37},
+            "random": {"count": 1000, "seed": SEED, "center": [36.0, 120.3], "noise_sigma": 0.5}}
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        elapsed, _ = _timed(lambda: compile_scenario(spec, cache_dir, force=True), args.repeat)
+        results["compile_1000_ships_ms"] = elapsed * 1000
+        elapsed, cache = _timed(lambda: ScenarioCache(cache_dir), args.repeat)
+        results["open_ms"] = elapsed * 1000
+        frame = [0]
+
+        def next_frame():
+            frame[0] = (frame[0] + 1) % cache.frame_count
+            return cache.frame_messages(frame[0], BASE_TM, 2)
+
+        ops, us = _rate(next_frame, args.min_time)
+        results["frame_1000_targets_ms"] = us / 1000.0
+        del cache
+    return results
+
+
+BENCHMARKS = {
+    "location_calculator": bench_location_calculator,
+    "realtime_pb": bench_realtime_pb,
+    "playback_pb": bench_playback_pb,
+    "decode_data": bench_decode_data,
+    "json_payloads": bench_json_payloads,
+    "draw_trajectories": bench_draw_trajectories,
+    "v4_prep": bench_v4_prep,
+    "bds_fleet": bench_bds_fleet,
+    "motion_models": bench_motion_models,
+    "scenario_cache": bench_scenario_cache,
+}
+
+
+def environment_info():
+    from pb_backend import get_protobuf_backend
+    try:
+        backend = get_protobuf_backend()
+    except ImportError:
+        backend = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "protobuf_backend": backend,
+        "seed": SEED,
+    }
+
+
+def compare_results(baseline, results):
+    """
+    与基线结果逐项对比。
+    :return: [(测试项, 指标, 基线值, 当前值, 当前/基线), ...]
+    """
+    rows = []
+    for name, metrics in results.items():
+        base_metrics = baseline.get("results", {}).get(name, {})
+        for metric, value in metrics.items():
+            base_value = base_metrics.get(metric)
+            if isinstance(base_value, (int, float)) and base_value:
+                rows.append((name, metric, base_value, value, value / base_value))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="模拟器热点路径基准测试（不需要Kafka和数据库），结果输出为JSON。")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help=f"结果输出路径，默认 {DEFAULT_OUTPUT}")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只运行指定的测试项")
+    parser.add_argument("--min-time", type=float, default=0.5, help="吞吐量测试每项的最短运行时间(秒)")
+    parser.add_argument("--repeat", type=int, default=3, help="耗时测试的重复次数，取最短值")
+    parser.add_argument("--draw-points", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="轨迹绘制测试的总点数")
+    parser.add_argument("--prep-points", type=int, nargs="+", default=[10000, 100000],
+                        help="v4发送准备测试的总点数")
+    parser.add_argument("--baseline", help="用于对比的历史结果文件")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"运行 {name} ...")
+        start = time.perf_counter()
+        results[name] = BENCHMARKS[name](args)
+        print(f"  完成，耗时 {time.perf_counter() - start:.1f}s")
+        for metric, value in results[name].items():
+            print(f"  {metric}: {value:.3f}")
+
+    report = {"environment": environment_info(), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"与基线 {args.baseline} 对比 (当前/基线):")
+        for name, metric, base_value, value, ratio in compare_results(baseline, results):
+            print(f"  {name}.{metric}: {base_value:.3f} -> {value:.3f} ({ratio:.2f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
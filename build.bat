@@ -7,6 +7,14 @@ call .\.venv\Scripts\activate.bat
 echo [INFO] Installing dependencies from requirements.txt...
 pip install -r requirements.txt
 
+echo [INFO] Generating protobuf bindings from target.proto...
+python generate_proto.py
+if errorlevel 1 (
+    echo [ERROR] Protobuf generation failed.
+    pause
+    exit /b 1
+)
+
 echo [INFO] Cleaning up previous builds...
 if exist build rmdir /s /q build
 if exist dist rmdir /s /q dist
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from itertools import islice
+from multiprocessing import Pool
+
+import target_pb2
+from google.protobuf.json_format import MessageToDict
+from decode_data import parse_frame
+
+# 批量解析unionTargetPB抓包数据
+# 输入文件每行一帧Hex字符串（与“解析PB”页签粘贴的格式一致，空行忽略），
+# 按块分发到进程池中并行解析，输出顺序与输入顺序保持一致。
+
+
+class DecodeStats:
+    """
+    批量解析的汇总统计，可在各个工作进程之间合并。
+    """
+    def __init__(self):
+        self.frames = 0
+        self.failed = 0
+        self.messages = 0
+        self.targets = 0
+        self.min_targets = None
+        self.max_targets = 0
+        self.type_counts = Counter()
+        self.status_counts = Counter()
+        self.min_last_tm = None
+        self.max_last_tm = None
+
+    def add_message(self, message):
+        """累加一条解析成功的消息（TargetProtoList 或 TargetProto）。"""
+        targets = message.list if isinstance(message, target_pb2.TargetProtoList) else [message]
+        count = len(targets)
+        self.messages += 1
+        self.targets += count
+        self.max_targets = max(self.max_targets, count)
+        self.min_targets = count if self.min_targets is None else min(self.min_targets, count)
+
+        for target in targets:
+            self.type_counts[target.eTargetType] += 1
+            self.status_counts[target.status] += 1
+            if target.lastTm:
+                if self.min_last_tm is None or target.lastTm < self.min_last_tm:
+                    self.min_last_tm = target.lastTm
+                if self.max_last_tm is None or target.lastTm > self.max_last_tm:
+                    self.max_last_tm = target.lastTm
+
+    def merge(self, other):
+        """合并另一个分块的统计结果。"""
+        self.frames += other.frames
+        self.failed += other.failed
+        self.messages += other.messages
+        self.targets += other.targets
+        self.max_targets = max(self.max_targets, other.max_targets)
+        if other.min_targets is not None:
+            self.min_targets = other.min_targets if self.min_targets is None else min(self.min_targets, other.min_targets)
+        self.type_counts.update(other.type_counts)
+        self.status_counts.update(other.status_counts)
+        if other.min_last_tm is not None:
+            self.min_last_tm = other.min_last_tm if self.min_last_tm is None else min(self.min_last_tm, other.min_last_tm)
+        if other.max_last_tm is not None:
+            self.max_last_tm = other.max_last_tm if self.max_last_tm is None else max(self.max_last_tm, other.max_last_tm)
+
+    def to_dict(self):
+        """转换为便于输出的字典，目标类型和数据状态使用枚举名称。"""
+        spread_ms = None
+        if self.min_last_tm is not None and self.max_last_tm is not None:
+            spread_ms = self.max_last_tm - self.min_last_tm
+        return {
+            "frames": self.frames,
+            "failed": self.failed,
+            "messages": self.messages,
+            "targets": self.targets,
+            "targets_per_message": {
+                "min": self.min_targets or 0,
+                "max": self.max_targets,
+                "avg": round(self.targets / self.messages, 3) if self.messages else 0.0,
+            },
+            "eTargetType_counts": {_enum_name(target_pb2.TargetType, k): v for k, v in sorted(self.type_counts.items())},
+            "status_counts": {_enum_name(target_pb2.CurStatusProto, k): v for k, v in sorted(self.status_counts.items())},
+            "lastTm": {
+                "min": self.min_last_tm,
+                "max": self.max_last_tm,
+                "spread_ms": spread_ms,
+            },
+        }
+
+
+def _enum_name(enum_type, value):
+    """枚举值转名称，未知值原样转为字符串。"""
+    try:
+        return enum_type.Name(value)
+    except ValueError:
+        return str(value)
+
+
+def _decode_chunk(task):
+    """
+    工作进程入口：解析一个分块内的所有帧。
+    :param task: (分块序号, Hex行列表, 是否输出JSON)
+    :return: (分块序号, JSON行列表, DecodeStats)
+    """
+    chunk_index, lines, with_json = task
+    stats = DecodeStats()
+    json_lines = []
+    for offset, line in enumerate(lines):
+        stats.frames += 1
+        try:
+            message = parse_frame(bytes.fromhex("".join(line.split())))
+        except ValueError:
+            message = None
+        if message is None:
+            stats.failed += 1
+            if with_json:
+                json_lines.append(json.dumps({"error": "decode_failed", "chunk": chunk_index, "offset": offset}))
+            continue
+        stats.add_message(message)
+        if with_json:
+            json_lines.append(json.dumps(MessageToDict(message, preserving_proto_field_name=True), ensure_ascii=False, separators=(',', ':')))
+    return chunk_index, json_lines, stats
+
+
+def _iter_chunks(input_path, chunk_size, with_json):
+    """逐块读取输入文件，避免一次性将百万级抓包加载进内存。"""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        hex_lines = (line for line in f if line.strip())
+        chunk_index = 0
+        while True:
+            lines = list(islice(hex_lines, chunk_size))
+            if not lines:
+                return
+            yield chunk_index, lines, with_json
+            chunk_index += 1
+
+
+def decode_bulk(input_path, output_path=None, workers=None, chunk_size=2000, progress_callback=None):
+    """
+    使用进程池批量解析抓包文件。
+    :param input_path: 输入文件路径，每行一帧Hex字符串。
+    :param output_path: JSON Lines 输出路径，为 None 时只统计不输出。
+    :param workers: 进程数，默认等于CPU核数。
+    :param chunk_size: 每个分块包含的帧数。
+    :param progress_callback: 可选回调，参数为已处理帧数。
+    :return: DecodeStats 汇总统计。
+    """
+    workers = workers or os.cpu_count() or 1
+    with_json = output_path is not None
+    total = DecodeStats()
+    out_file = open(output_path, 'w', encoding='utf-8') if with_json else None
+    try:
+        with Pool(processes=workers) as pool:
+            # 每次最多向进程池提交 workers*4 个分块，保持内存占用平稳；imap 保证结果按提交顺序返回
+            chunks = _iter_chunks(input_path, chunk_size, with_json)
+            while True:
+                window = list(islice(chunks, workers * 4))
+                if not window:
+                    break
+                for _, json_lines, stats in pool.imap(_decode_chunk, window):
+                    total.merge(stats)
+                    if out_file:
+                        for json_line in json_lines:
+                            out_file.write(json_line)
+                            out_file.write("\n")
+                    if progress_callback:
+                        progress_callback(total.frames)
+    finally:
+        if out_file:
+            out_file.close()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量并行解析unionTargetPB抓包数据，并输出汇总统计。")
+    parser.add_argument("input", help="抓包文件，每行一帧Hex字符串")
+    parser.add_argument("-o", "--output", help="解析结果输出路径 (JSON Lines)，不指定则只输出统计")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="进程数，默认等于CPU核数")
+    parser.add_argument("-c", "--chunk-size", type=int, default=2000, help="每个分块的帧数")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"错误: 未找到输入文件 '{args.input}'。")
+        return 1
+
+    start = time.perf_counter()
+    stats = decode_bulk(args.input, args.output, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps(stats.to_dict(), ensure_ascii=False, indent=2))
+    rate = stats.frames / elapsed if elapsed > 0 else 0.0
+    print(f"共解析 {stats.frames} 帧 (失败 {stats.failed})，耗时 {elapsed:.2f}s，{rate:.0f} 帧/秒。")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+
+import numpy as np
+
+import target_pb2
+from decode_data import parse_frame
+
+# 将unionTargetPB消息直接展开为列式数组（不经过JSON），便于在内存中过滤、统计和绘制。
+# 重复字段 sources / vecFusionedTargetInfo 采用类似Arrow的 offsets + 子表 方式存储：
+# 第 i 个目标的子记录为 child[offsets[i]:offsets[i+1]]。
+
+# TargetProto 标量字段: (列名, 属性名, dtype)
+TARGET_COLUMNS = (
+    ("id", "id", np.uint64),
+    ("sost", "sost", np.uint32),
+    ("lastTm", "lastTm", np.int64),
+    ("adapterId", "adapterId", np.uint32),
+    ("status", "status", np.int32),
+    ("maxLen", "maxLen", np.uint32),
+    ("minLen", "minLen", np.uint32),
+    ("eTargetType", "eTargetType", np.int32),
+)
+
+# cTargProto 标量字段: (列名, 属性名, dtype)，列名统一加 pos_ 前缀
+POS_COLUMNS = (
+    ("pos_displayId", "displayId", np.uint32),
+    ("pos_mmsi", "mmsi", np.uint32),
+    ("pos_id_r", "id_r", np.uint32),
+    ("pos_state", "state", np.uint32),
+    ("pos_quality", "quality", np.uint32),
+    ("pos_period", "period", np.uint32),
+    ("pos_course", "course", np.float32),
+    ("pos_speed", "speed", np.float32),
+    ("pos_heading", "heading", np.float32),
+    ("pos_len", "len", np.uint32),
+    ("pos_wid", "wid", np.uint32),
+    ("pos_shiptype", "shiptype", np.uint32),
+    ("pos_s_class", "s_class", np.uint32),
+    ("pos_flags", "flags", np.uint32),
+    ("pos_m_mmsi", "m_mmsi", np.uint32),
+    ("pos_vesselName", "vesselName", object),
+    ("pos_vendorId", "vendorId", object),
+    ("pos_callSign", "callSign", object),
+    ("pos_imo", "imo", np.uint32),
+    ("pos_id", "id", np.uint64),
+    ("pos_fleetId", "fleetId", np.uint32),
+    ("pos_comment", "comment", object),
+    ("pos_rec_course", "rec_course", np.float32),
+    ("pos_rec_speed", "rec_speed", np.float32),
+    ("pos_aidtype", "aidtype", np.uint32),
+)
+
+# FusionedTargetInfo 子表字段
+FUSION_COLUMNS = (
+    ("ullUniqueId", np.uint64),
+    ("uiStationId", np.uint32),
+    ("latitude", np.float64),
+    ("longitude", np.float64),
+    ("uiStationType", np.uint32),
+    ("ullPosUpdateTime", np.int64),
+)
+
+# uiStationType 与回放数据中 stationType 字符串的对应关系
+STATION_TYPE_NAMES = {65: "AIS", 82: "RADAR", 66: "BDS"}
+
+
+class TargetColumns:
+    """
+    列式存储的一批目标数据。
+    - columns: 目标级别的列，每列长度等于目标数
+    - latitude/longitude 单独成列（来自 pos.geoPtn）
+    - message_index: 每个目标所在的消息序号
+    - sources_offsets / source_* / source_ids_offsets / source_ids: sources 子表
+    - fusion_offsets / fusion: vecFusionedTargetInfo 子表
+    """
+    def __init__(self, columns, sources_offsets, source_provider, source_type,
+                 source_ids_offsets, source_ids, fusion_offsets, fusion):
+        self.columns = columns
+        self.sources_offsets = sources_offsets
+        self.source_provider = source_provider
+        self.source_type = source_type
+        self.source_ids_offsets = source_ids_offsets
+        self.source_ids = source_ids
+        self.fusion_offsets = fusion_offsets
+        self.fusion = fusion
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def sources_of(self, index):
+        """返回第 index 个目标的 sources 列表: [(provider, type, [ids...]), ...]"""
+        result = []
+        for s in range(self.sources_offsets[index], self.sources_offsets[index + 1]):
+            ids = self.source_ids[self.source_ids_offsets[s]:self.source_ids_offsets[s + 1]]
+            result.append((self.source_provider[s], self.source_type[s], list(ids)))
+        return result
+
+    def fusion_of(self, index):
+        """返回第 index 个目标的 vecFusionedTargetInfo 子表切片（列名 -> 数组）。"""
+        start, end = self.fusion_offsets[index], self.fusion_offsets[index + 1]
+        return {name: values[start:end] for name, values in self.fusion.items()}
+
+    def filter(self, mask):
+        """
+        按布尔掩码或下标数组筛选目标，子表随之重新切分。
+        例: cols.filter((cols["eTargetType"] == 7) & (cols["lastTm"] > t0))
+        """
+        indices = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask, dtype=np.int64)
+        columns = {name: values[indices] for name, values in self.columns.items()}
+
+        source_index = _gather_ranges(self.sources_offsets, indices)
+        sources_offsets = _offsets_from_counts(np.diff(self.sources_offsets)[indices])
+        source_ids_index = _gather_ranges(self.source_ids_offsets, source_index)
+        source_ids_offsets = _offsets_from_counts(np.diff(self.source_ids_offsets)[source_index])
+
+        fusion_index = _gather_ranges(self.fusion_offsets, indices)
+        fusion_offsets = _offsets_from_counts(np.diff(self.fusion_offsets)[indices])
+
+        return TargetColumns(
+            columns, sources_offsets,
+            self.source_provider[source_index], self.source_type[source_index],
+            source_ids_offsets, self.source_ids[source_ids_index],
+            fusion_offsets, {name: values[fusion_index] for name, values in self.fusion.items()},
+        )
+
+    def to_playback_points(self):
+        """
+        按目标ID分组，转换为与数据库查询结果相同结构的轨迹点字典，
+        可直接放入回放缓存用于预览绘制和轨迹发送。
+        :return: {target_id: [point, ...]}，每条轨迹按 lastTm 排序。
+        """
+        order = np.lexsort((self.columns["lastTm"], self.columns["id"]))
+        tracks = {}
+        for i in order:
+            target_id = int(self.columns["id"][i])
+            last_tm = int(self.columns["lastTm"][i])
+            sources = [{"provider": p, "type": t, "ids": ids} for p, t, ids in self.sources_of(i)]
+            fusion = self.fusion_of(i)
+            fusion_targets = [
+                {
+                    "targetId": int(fusion["ullUniqueId"][k]),
+                    "stationId": int(fusion["uiStationId"][k]),
+                    "stationType": STATION_TYPE_NAMES.get(int(fusion["uiStationType"][k]), ""),
+                    "updateTime": int(fusion["ullPosUpdateTime"][k]),
+                }
+                for k in range(len(fusion["ullUniqueId"]))
+            ]
+            tracks.setdefault(target_id, []).append({
+                "id": str(target_id),
+                "mmsi": int(self.columns["pos_mmsi"][i]),
+                "vesselName": self.columns["pos_vesselName"][i],
+                "lastTm": last_tm,
+                "lastDT": datetime.datetime.fromtimestamp(last_tm / 1000).strftime('%Y-%m-%d %H:%M:%S'),
+                "longitude": float(self.columns["longitude"][i]),
+                "latitude": float(self.columns["latitude"][i]),
+                "speed": float(self.columns["pos_speed"][i]),
+                "course": float(self.columns["pos_course"][i]),
+                "heading": float(self.columns["pos_heading"][i]),
+                "len": int(self.columns["pos_len"][i]),
+                "maxLen": int(self.columns["maxLen"][i]),
+                "idR": int(self.columns["pos_id_r"][i]),
+                "shipType": int(self.columns["pos_shiptype"][i]),
+                "state": int(self.columns["pos_state"][i]),
+                "aidType": int(self.columns["pos_aidtype"][i]),
+                "status": int(self.columns["status"][i]),
+                "targetType": _target_type_name(int(self.columns["eTargetType"][i])),
+                "adapterId": int(self.columns["adapterId"][i]),
+                "sources": json.dumps(sources, ensure_ascii=False) if sources else None,
+                "fusionTargets": json.dumps(fusion_targets) if fusion_targets else None,
+            })
+        return tracks
+
+
+def _target_type_name(value):
+    try:
+        return target_pb2.TargetType.Name(value)
+    except ValueError:
+        return None
+
+
+def _offsets_from_counts(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _gather_ranges(offsets, indices):
+    """将若干 [offsets[i], offsets[i+1]) 区间拼接成一个下标数组。"""
+    starts = offsets[:-1][indices]
+    counts = offsets[1:][indices] - starts
+    total = int(counts.sum()) if len(counts) else 0
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    # 每个元素的下标 = 所在区间的起点 + 区间内偏移
+    run_starts = np.repeat(starts - _offsets_from_counts(counts)[:-1], counts)
+    return run_starts + np.arange(total, dtype=np.int64)
+
+
+def messages_to_columns(messages):
+    """
+    将一组已解析的消息（TargetProtoList 或 TargetProto）展开为 TargetColumns。
+    """
+    values = {name: [] for name, _, _ in TARGET_COLUMNS + POS_COLUMNS}
+    latitude, longitude, message_index = [], [], []
+    source_counts, source_provider, source_type, source_id_counts, source_ids = [], [], [], [], []
+    fusion_counts = []
+    fusion = {name: [] for name, _ in FUSION_COLUMNS}
+
+    target_fields = [(values[name], attr) for name, attr, _ in TARGET_COLUMNS]
+    pos_fields = [(values[name], attr) for name, attr, _ in POS_COLUMNS]
+
+    for msg_no, message in enumerate(messages):
+        targets = message.list if isinstance(message, target_pb2.TargetProtoList) else (message,)
+        for target in targets:
+            for column, attr in target_fields:
+                column.append(getattr(target, attr))
+            pos = target.pos
+            for column, attr in pos_fields:
+                column.append(getattr(pos, attr))
+            latitude.append(pos.geoPtn.latitude)
+            longitude.append(pos.geoPtn.longitude)
+            message_index.append(msg_no)
+
+            source_counts.append(len(target.sources))
+            for source in target.sources:
+                source_provider.append(source.provider)
+                source_type.append(source.type)
+                source_id_counts.append(len(source.ids))
+                source_ids.extend(source.ids)
+
+            fusion_counts.append(len(target.vecFusionedTargetInfo))
+            for info in target.vecFusionedTargetInfo:
+                fusion["ullUniqueId"].append(info.ullUniqueId)
+                fusion["uiStationId"].append(info.uiStationId)
+                fusion["latitude"].append(info.oPos.latitude)
+                fusion["longitude"].append(info.oPos.longitude)
+                fusion["uiStationType"].append(info.uiStationType)
+                fusion["ullPosUpdateTime"].append(info.ullPosUpdateTime)
+
+    columns = {name: np.array(values[name], dtype=dtype) for name, _, dtype in TARGET_COLUMNS + POS_COLUMNS}
+    columns["latitude"] = np.array(latitude, dtype=np.float64)
+    columns["longitude"] = np.array(longitude, dtype=np.float64)
+    columns["message_index"] = np.array(message_index, dtype=np.int64)
+
+    return TargetColumns(
+        columns,
+        _offsets_from_counts(np.array(source_counts, dtype=np.int64)),
+        np.array(source_provider, dtype=object),
+        np.array(source_type, dtype=object),
+        _offsets_from_counts(np.array(source_id_counts, dtype=np.int64)),
+        np.array(source_ids, dtype=object),
+        _offsets_from_counts(np.array(fusion_counts, dtype=np.int64)),
+        {name: np.array(fusion[name], dtype=dtype) for name, dtype in FUSION_COLUMNS},
+    )
+
+
+def decode_frames_to_columns(frames):
+    """
+    解析一组原始帧（bytes，可为压缩数据）并直接展开为列。无法解析的帧会被跳过。
+    :return: (TargetColumns, 失败帧数)
+    """
+    messages = []
+    failed = 0
+    for frame in frames:
+        message = parse_frame(frame)
+        if message is None:
+            failed += 1
+        else:
+            messages.append(message)
+    return messages_to_columns(messages), failed
+
+
+def decode_hex_file_to_columns(path):
+    """读取每行一帧Hex字符串的抓包文件并展开为列。"""
+    frames = []
+    failed = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            cleaned = "".join(line.split())
+            if not cleaned:
+                continue
+            try:
+                frames.append(bytes.fromhex(cleaned))
+            except ValueError:
+                failed += 1
+    columns, decode_failed = decode_frames_to_columns(frames)
+    return columns, failed + decode_failed
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+import os
+from types import MappingProxyType
+
+# config.json 的加载、校验与查找索引。
+# 发送路径中需要的 列表->值 映射在加载时一次性构建为只读字典，发送时只做 O(1) 查找。
+
+DEFAULT_CONFIG_PATH = 'config.json'
+
+# 配置文件缺失或无效时使用的安全默认值
+DEFAULT_CONFIG = {
+    "kafka": {
+        "bootstrap_servers": "localhost:9092",
+        "topic": "fusion_target_topic",
+        "ais_static_topic": "ais_static_topic"
+    },
+    "starrocks": {
+        "host": "localhost", "port": 9030, "user": "root", "password": "", "database": "ods"
+    },
+    "ui_options": {
+        "eTargetType": {"OTHERS": 14},
+        "shiptype": [{"name": "其他", "code": 99, "name_en": "Other"}],
+        "sost": {"正常": 1}, "dataStatus": {"new": 0, "update": 1, "delete": 2},
+        "province": [{"name": "未选择", "name_en": "Unknown", "adapterId": 0}],
+        "eTargetType_mapping": []
+    },
+    "random_generation": {
+        "id": {"prefix": "11", "length": 20},
+        "mmsi": {"prefix": "", "length": 9},
+        "bds": {"prefix": "", "length": 9}
+    }
+}
+
+
+class ConfigError(ValueError):
+    """配置文件结构不符合要求。"""
+
+
+def _require(condition, message):
+    if not condition:
+        raise ConfigError(message)
+
+
+def _require_list_of_dicts(items, section, keys):
+    _require(isinstance(items, list), f"'ui_options.{section}' 必须是列表。")
+    for i, item in enumerate(items):
+        _require(isinstance(item, dict), f"'ui_options.{section}[{i}]' 必须是对象。")
+        for key in keys:
+            _require(key in item, f"'ui_options.{section}[{i}]' 缺少字段 '{key}'。")
+
+
+def validate_config(config):
+    """
+    校验配置结构，不符合要求时抛出 ConfigError。
+    只检查程序实际依赖的字段，允许存在额外字段。
+    """
+    _require(isinstance(config, dict), "配置文件顶层必须是对象。")
+    for section in ("kafka", "starrocks", "ui_options", "random_generation"):
+        _require(isinstance(config.get(section), dict), f"缺少配置节 '{section}'。")
+
+    kafka = config["kafka"]
+    for key in ("bootstrap_servers", "topic"):
+        _require(isinstance(kafka.get(key), str) and kafka.get(key), f"'kafka.{key}' 必须是非空字符串。")
+
+    ui_options = config["ui_options"]
+    for section in ("eTargetType", "sost", "dataStatus"):
+        _require(isinstance(ui_options.get(section), dict), f"'ui_options.{section}' 必须是对象。")
+    _require_list_of_dicts(ui_options.get("shiptype"), "shiptype", ("name", "code", "name_en"))
+    _require_list_of_dicts(ui_options.get("province", []), "province", ("name", "name_en", "adapterId"))
+    _require_list_of_dicts(ui_options.get("eTargetType_mapping", []), "eTargetType_mapping",
+                           ("ui_class", "ui_state", "eTargetType"))
+
+
+class ConfigIndex:
+    """
+    由配置构建的只读查找索引。
+    - etarget_type:              (界面类型, 目标状态) -> eTargetType，重复规则以第一条为准（与原线性查找一致）
+    - adapter_id_by_name_en:     省份英文名 -> adapterId
+    - province_name_en_by_id:    adapterId -> 省份英文名
+    - shiptype_name_en_by_code:  船舶类型代码 -> 英文名
+    """
+    def __init__(self, config):
+        ui_options = config["ui_options"]
+
+        etarget_type = {}
+        for rule in ui_options.get("eTargetType_mapping", []):
+            etarget_type.setdefault((rule["ui_class"], rule["ui_state"]), rule["eTargetType"])
+
+        adapter_id_by_name_en = {}
+        province_name_en_by_id = {}
+        for item in ui_options.get("province", []):
+            adapter_id_by_name_en.setdefault(item["name_en"], item["adapterId"])
+            province_name_en_by_id.setdefault(item["adapterId"], item["name_en"])
+
+        shiptype_name_en_by_code = {}
+        for item in ui_options["shiptype"]:
+            shiptype_name_en_by_code.setdefault(item["code"], item["name_en"])
+
+        self.etarget_type = MappingProxyType(etarget_type)
+        self.adapter_id_by_name_en = MappingProxyType(adapter_id_by_name_en)
+        self.province_name_en_by_id = MappingProxyType(province_name_en_by_id)
+        self.shiptype_name_en_by_code = MappingProxyType(shiptype_name_en_by_code)
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """
+    读取并校验配置文件。
+    :return: (配置字典, ConfigIndex)
+    :raises: FileNotFoundError / json.JSONDecodeError / ConfigError
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    validate_config(config)
+    return config, ConfigIndex(config)
+
+
+def default_config():
+    """返回默认配置的副本及其索引。"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    return config, ConfigIndex(config)
+
+
+class ConfigWatcher:
+    """
+    记录配置文件的修改时间，文件变化后重新加载。
+    新文件无效时保留原有配置。
+    """
+    def __init__(self, path=DEFAULT_CONFIG_PATH):
+        self.path = path
+        self.mtime = self._current_mtime()
+
+    def _current_mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def reload_if_changed(self):
+        """
+        :return: 文件有变化且重新加载成功时返回 (配置字典, ConfigIndex)，否则返回 None。
+        :raises: 文件有变化但内容无效时抛出 json.JSONDecodeError / ConfigError
+        """
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self.mtime:
+            return None
+        self.mtime = mtime
+        return load_config(self.path)
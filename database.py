@@ -1,17 +1,313 @@
 # -*- coding: utf-8 -*-
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
+import hashlib
+import heapq
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text, bindparam
+from sqlalchemy.exc import SQLAlchemyError, DBAPIError
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 批量查询时每条SQL最多包含的查询条目数
+BULK_MAX_REQUESTS = 500
+
+# 估算缓存结果大小时最多抽样的行数
+CACHE_SIZE_SAMPLE_ROWS = 256
+
+# 预览查询附加的辅助列，返回结果前去掉
+PREVIEW_COLUMNS = ("preview_rn", "preview_rn_desc", "preview_total")
+
+
+def split_time_range(start_time, end_time, max_hours):
+    """
+    将 [start_time, end_time] 切分为长度不超过 max_hours 小时的子区间。
+    :return: [(子区间开始, 子区间结束, 是否为最后一段), ...]，前面各段为左闭右开，最后一段为闭区间
+    """
+    start = datetime.strptime(start_time, DT_FORMAT)
+    end = datetime.strptime(end_time, DT_FORMAT)
+    step = timedelta(hours=max_hours)
+    ranges = []
+    while start + step < end:
+        ranges.append((start.strftime(DT_FORMAT), (start + step).strftime(DT_FORMAT), False))
+        start += step
+    ranges.append((start.strftime(DT_FORMAT), end.strftime(DT_FORMAT), True))
+    return ranges
+
+
+class QueryCache:
+    """
+    查询结果缓存，键为规范化SQL与参数的指纹，按LRU淘汰，总大小(估算)不超过 max_bytes。
+    时间范围已完全成为历史的结果永久有效；结束时间尚未过去（数据可能还在写入）的结果在 ttl 秒后过期。
+    可在多个线程中使用。
+    """
+    def __init__(self, max_bytes, ttl, open_grace):
+        """
+        :param max_bytes: 缓存总大小上限(字节)
+        :param ttl: 未结束时间范围的结果有效期(秒)
+        :param open_grace: 结束时间距当前不足该秒数时仍视为未结束（考虑入库延迟）
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.open_grace = open_grace
+        self._entries = OrderedDict()  # {指纹: (结果行列表, 大小, 过期时间或None)}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def fingerprint(query_str, params):
+        normalized_sql = re.sub(r"\s+", " ", query_str.strip())
+        normalized_params = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(f"{normalized_sql}|{normalized_params}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _estimate_size(rows):
+        """在结果中均匀抽样最多 CACHE_SIZE_SAMPLE_ROWS 行求和后按行数放大，后面的行含较长JSON时也能计入。"""
+        if not rows:
+            return 64
+        step = max(1, len(rows) // CACHE_SIZE_SAMPLE_ROWS)
+        sample = rows[::step]
+        sample_bytes = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in sample)
+        return 64 + int(sample_bytes * len(rows) / len(sample))
+
+    def _expires_at(self, end_time):
+        if end_time is None:
+            return time.time() + self.ttl
+        try:
+            end_ts = time.mktime(_as_datetime(end_time).timetuple())
+        except ValueError:
+            return time.time() + self.ttl
+        return time.time() + self.ttl if end_ts > time.time() - self.open_grace else None
+
+    def get(self, key):
+        """:return: 缓存的结果行列表（副本），未命中或已过期时返回 None。"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, key, rows, end_time=None):
+        """:param end_time: 查询的结束时间，决定结果是否会过期"""
+        size = self._estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (list(rows), size, self._expires_at(end_time))
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        rows, size, expires_at = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def _statement(query_str, params):
+    """构建可执行语句，列表类型的参数展开为 IN 列表。"""
+    expanding = [bindparam(name, expanding=True) for name, value in params.items() if isinstance(value, (list, tuple))]
+    return text(query_str).bindparams(*expanding) if expanding else text(query_str)
+
+
+def _time_conditions(start_time, end_time, end_inclusive, params):
+    if not (start_time and end_time):
+        return []
+    params['start_time'] = start_time
+    params['end_time'] = end_time
+    return ["lastDT >= :start_time", "lastDT <= :end_time" if end_inclusive else "lastDT < :end_time"]
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value)[:19], DT_FORMAT)
+
+
+def build_trajectory_query(table_name, criteria=None, start_time=None, end_time=None, end_inclusive=True,
+                           order_by=True):
+    """
+    构建轨迹查询SQL。
+    - 时间条件写成 lastDT 上的范围谓词，便于按 lastDT 分区裁剪
+    - MMSI 和 ID 同时提供时拆成两个等值查询 UNION ALL，替代 (mmsi = :mmsi OR id = :id)，
+      每个分支都可以按分桶列裁剪；第二个分支排除已被第一个分支命中的行，结果不重复
+    :param end_inclusive: False 时结束时间为开区间，用于切分后的子区间
+    :param order_by: False 时不附加 ORDER BY，用作子查询
+    :return: (SQL, 参数字典)，没有任何查询条件时返回 (None, {})
+    """
+    params = {}
+    common_conditions = []
+    id_branches = []
+
+    if criteria:
+        mmsi = criteria.get('mmsi')
+        target_id = criteria.get('id')
+        province = criteria.get('province')
+
+        if mmsi:
+            id_branches.append("mmsi = :mmsi")
+            params['mmsi'] = mmsi
+        if target_id:
+            if mmsi:
+                id_branches.append("id = :id AND (mmsi IS NULL OR mmsi <> :mmsi)")
+            else:
+                id_branches.append("id = :id")
+            params['id'] = target_id
+
+        if province:
+            common_conditions.append("province = :province")
+            params['province'] = province
+
+    common_conditions.extend(_time_conditions(start_time, end_time, end_inclusive, params))
+
+    if not id_branches and not common_conditions:
+        return None, {}
+
+    branches = [[condition] + common_conditions for condition in id_branches] or [common_conditions]
+    selects = [f"SELECT * FROM {table_name} WHERE {' AND '.join(conditions)}" for conditions in branches]
+    # UNION ALL 之后的 ORDER BY 作用于整个结果集
+    query_str = " UNION ALL ".join(selects)
+    return (f"{query_str} ORDER BY lastTm" if order_by else query_str), params
+
+
+def build_preview_query(base_query, params, max_points, mode='nth', start_time=None, end_time=None):
+    """
+    在基础查询外包装服务端抽稀，只返回约 max_points 个点，并始终保留第一个和最后一个点。
+    - mode='nth':  按行号均匀抽取
+    - mode='time': 按 lastTm 等分为 max_points 个时间桶，每个桶取第一个点（需要 start_time/end_time）
+    结果附带 preview_total 列，即抽稀前的总点数。
+    :return: (SQL, 参数字典)
+    """
+    params = dict(params)
+    params['preview_points'] = int(max_points)
+    if mode == 'time' and start_time and end_time:
+        start_ms = int(time.mktime(_as_datetime(start_time).timetuple()) * 1000)
+        end_ms = int(time.mktime(_as_datetime(end_time).timetuple()) * 1000)
+        params['preview_start_ms'] = start_ms
+        params['preview_bucket_ms'] = max(1, (end_ms - start_ms) // int(max_points))
+        inner = (
+            "SELECT t.*, "
+            "ROW_NUMBER() OVER (PARTITION BY FLOOR((lastTm - :preview_start_ms) / :preview_bucket_ms) "
+            "ORDER BY lastTm) AS preview_rn, "
+            "ROW_NUMBER() OVER (ORDER BY lastTm DESC) AS preview_rn_desc, "
+            f"COUNT(*) OVER () AS preview_total FROM ({base_query}) t"
+        )
+        condition = "preview_rn = 1 OR preview_rn_desc = 1"
+    else:
+        inner = (
+            "SELECT t.*, ROW_NUMBER() OVER (ORDER BY lastTm) AS preview_rn, "
+            f"COUNT(*) OVER () AS preview_total FROM ({base_query}) t"
+        )
+        # 第 rn 行所在的桶号 floor((rn-1)*M/N) 比上一行大时保留，共约 M 行
+        condition = (
+            "preview_rn = 1 OR preview_rn = preview_total OR "
+            "FLOOR((preview_rn - 1) * :preview_points / preview_total) > "
+            "FLOOR((preview_rn - 2) * :preview_points / preview_total)"
+        )
+    return f"SELECT * FROM ({inner}) s WHERE {condition} ORDER BY lastTm", params
+
+
+def build_bulk_trajectory_query(table_name, mmsis, ids, province=None, start_time=None, end_time=None,
+                                end_inclusive=True):
+    """
+    构建多个目标的批量轨迹查询：MMSI 与 ID 分别使用 IN 列表，结构与 build_trajectory_query 一致。
+    :return: (SQL, 参数字典)，列表参数需通过 _statement 展开
+    """
+    params = {}
+    common_conditions = []
+    if province:
+        common_conditions.append("province = :province")
+        params['province'] = province
+    common_conditions.extend(_time_conditions(start_time, end_time, end_inclusive, params))
+
+    id_branches = []
+    if mmsis:
+        id_branches.append("mmsi IN :mmsis")
+        params['mmsis'] = list(mmsis)
+    if ids:
+        id_branches.append("id IN :ids AND (mmsi IS NULL OR mmsi NOT IN :mmsis)" if mmsis else "id IN :ids")
+        params['ids'] = list(ids)
+
+    selects = [f"SELECT * FROM {table_name} WHERE {' AND '.join([condition] + common_conditions)}"
+               for condition in id_branches]
+    return " UNION ALL ".join(selects) + " ORDER BY lastTm", params
+
+
+def group_bulk_requests(requests):
+    """
+    将批量查询条目按省份分组，同一省份内时间窗口有重叠的条目合并为一组，每组用一条SQL查询。
+    :param requests: {键: {'mmsi', 'id', 'province', 'start_time', 'end_time'}}
+    :return: [(省份, 开始时间, 结束时间, [键, ...]), ...]
+    """
+    by_province = {}
+    for key, request in requests.items():
+        by_province.setdefault(request.get('province'), []).append(key)
+
+    groups = []
+    for province, keys in by_province.items():
+        keys.sort(key=lambda k: requests[k]['start_time'])
+        current = None
+        for key in keys:
+            start, end = requests[key]['start_time'], requests[key]['end_time']
+            if current and start <= current[2] and len(current[3]) < BULK_MAX_REQUESTS:
+                current[2] = max(current[2], end)
+                current[3].append(key)
+            else:
+                current = [province, start, end, [key]]
+                groups.append(current)
+    return [tuple(group) for group in groups]
 
 class Database:
     """
     用于处理与StarRocks数据库所有交互的类。
+    每次查询从连接池借出独立连接（pool_pre_ping 检测失效连接），可在多个线程中并发使用；
+    连接断开时按退避间隔自动重连，数据库重启后无需重启程序。
     """
     def __init__(self, db_config):
         """
-        初始化数据库连接。
-        :param db_config: 包含 'host', 'port', 'user', 'password', 'database' 的字典。
+        初始化数据库连接池（不立即连接）。
+        :param db_config: 包含 'host', 'port', 'user', 'password', 'database' 的字典，
+                          可选 'pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'connect_timeout',
+                          'max_retries', 'retry_backoff'。
         """
         if not db_config:
             raise ValueError("数据库配置不能为空。")
@@ -24,27 +320,83 @@ class Database:
             f"/{db_config.get('database')}"
         )
         print(f"--- 数据库连接调试信息 ---\nURL: {self.db_url}\n--------------------------")
-        self.engine = create_engine(self.db_url, pool_size=5, pool_recycle=3600, echo=False)
-        self.Session = sessionmaker(bind=self.engine)
-        self.session = None
+        # 时间跨度超过 split_hours 小时的查询切分为子区间并行执行，0 表示不切分
+        self.split_hours = float(db_config.get('split_hours', 0) or 0)
+        self.parallel_queries = int(db_config.get('parallel_queries', 4) or 1)
+        # 为 True 时在执行查询前输出 EXPLAIN COSTS 中的分区与基数信息
+        self.explain_queries = bool(db_config.get('explain_queries', False))
+        # 连接断开后的重试次数与首次重试间隔(秒)，之后每次翻倍
+        self.max_retries = int(db_config.get('max_retries', 2))
+        self.retry_backoff = float(db_config.get('retry_backoff', 0.5))
+
+        self.engine = create_engine(
+            self.db_url,
+            pool_size=int(db_config.get('pool_size', 5)),
+            max_overflow=int(db_config.get('max_overflow', 5)),
+            pool_timeout=float(db_config.get('pool_timeout', 30)),
+            pool_recycle=int(db_config.get('pool_recycle', 3600)),
+            pool_pre_ping=True,
+            connect_args={"connect_timeout": int(db_config.get('connect_timeout', 5))},
+            echo=False
+        )
         self.is_connected = False
 
+        # 查询结果缓存，cache_max_mb 为 0 时不缓存
+        cache_max_mb = float(db_config.get('cache_max_mb', 256))
+        self.query_cache = QueryCache(
+            max_bytes=int(cache_max_mb * 1024 * 1024),
+            ttl=float(db_config.get('cache_ttl', 30)),
+            open_grace=float(db_config.get('cache_open_grace', 300))
+        ) if cache_max_mb > 0 else None
+
+    def _run(self, work, retries=None):
+        """
+        从连接池借出一个连接执行 work(conn)。
+        建立连接失败或执行中连接失效时，释放连接池并按退避间隔重试；其余SQL错误直接抛出。
+        :param retries: 重试次数，默认在连接正常时为 max_retries，已断开时为 0
+        :return: work 的返回值
+        :raises: SQLAlchemyError
+        """
+        if retries is None:
+            # 已知处于断开状态时只尝试一次，避免每次查询都在界面线程中长时间等待
+            retries = self.max_retries if self.is_connected else 0
+        delay = self.retry_backoff
+        for attempt in range(retries + 1):
+            try:
+                conn = self.engine.connect()
+            except DBAPIError as e:
+                error = e
+            else:
+                try:
+                    result = work(conn)
+                    self.is_connected = True
+                    return result
+                except DBAPIError as e:
+                    if not e.connection_invalidated:
+                        raise
+                    error = e
+                finally:
+                    conn.close()
+            self.is_connected = False
+            if attempt >= retries:
+                raise error
+            print(f"数据库连接异常，{delay:.1f} 秒后重试 ({attempt + 1}/{retries}): {error}")
+            self.engine.dispose()
+            time.sleep(delay)
+            delay *= 2
+
     def connect(self):
         """
-        建立并测试数据库连接。
+        测试数据库连接（不重试）。
         :return: 如果连接成功则返回 True，否则返回 False。
         """
         try:
-            self.session = self.Session()
             # 执行一个简单的查询来验证连接
-            self.session.execute(text("SELECT 1"))
+            self._run(lambda conn: conn.execute(text("SELECT 1")), retries=0)
             print("数据库连接成功。")
-            self.is_connected = True
             return True
         except SQLAlchemyError as e:
             print(f"数据库连接失败: {e}")
-            self.session = None
-            self.is_connected = False
             return False
 
     def query_trajectories(self, criteria=None, start_time=None, end_time=None):
@@ -55,61 +407,163 @@ class Database:
         :param end_time: 结束时间 (YYYY-MM-DD HH:MM:SS)
         :return: 查询结果列表，如果出错则返回 None。
         """
-        if not self.is_connected:
-            if not self.connect():
-                return None # 返回None表示连接失败
+        table_name = self.db_config.get('table', 'dwd_extended_trajectory') # 从配置获取表名
+        query_str, params = build_trajectory_query(table_name, criteria, start_time, end_time)
+        if not query_str:
+            print("警告: 查询条件为空，不执行查询。")
+            return []
 
         try:
-            params = {}
-            query_conditions = []
-            table_name = self.db_config.get('table', 'dwd_extended_trajectory') # 从配置获取表名
-
-            if criteria:
-                mmsi = criteria.get('mmsi')
-                target_id = criteria.get('id')
-                province = criteria.get('province')
-
-                # 构建MMSI和ID的组合查询
-                id_conditions = []
-                if mmsi:
-                    id_conditions.append("mmsi = :mmsi")
-                    params['mmsi'] = mmsi
-                if target_id:
-                    id_conditions.append("id = :id")
-                    params['id'] = target_id
-                
-                if id_conditions:
-                    query_conditions.append(f"({' OR '.join(id_conditions)})")
-
-                if province:
-                    query_conditions.append("province = :province")
-                    params['province'] = province
-            
-            if start_time and end_time:
-                query_conditions.append("lastDT BETWEEN :start_time AND :end_time")
-                params['start_time'] = start_time
-                params['end_time'] = end_time
+            if self.split_hours > 0 and start_time and end_time:
+                sub_ranges = split_time_range(start_time, end_time, self.split_hours)
+                if len(sub_ranges) > 1:
+                    return self._query_sub_ranges(
+                        lambda sub_start, sub_end, is_last: build_trajectory_query(
+                            table_name, criteria, sub_start, sub_end, end_inclusive=is_last),
+                        sub_ranges)
 
-            if not query_conditions:
-                print("警告: 查询条件为空，不执行查询。")
-                return []
-
-            query_str = f"SELECT * FROM {table_name} WHERE {' AND '.join(query_conditions)} ORDER BY lastTm"
-            
             print(f"执行查询: {query_str} with params {params}")
-            result = self.session.execute(text(query_str), params).fetchall()
-            return result
+            return self._fetch_all(query_str, params)
 
         except SQLAlchemyError as e:
             print(f"数据库查询错误: {e}")
             return None # 返回None表示查询失败
 
+    def query_trajectory_preview(self, criteria=None, start_time=None, end_time=None, max_points=1000, mode='nth'):
+        """
+        查询用于预览绘制的抽稀轨迹，条件与 query_trajectories 相同。
+        :param max_points: 返回点数上限（约数），通常按预览区宽度确定
+        :param mode: 'nth' 按行号均匀抽取，'time' 按时间桶抽取
+        :return: (轨迹点字典列表, 抽稀前总点数)，如果出错则返回 None。
+        """
+
+        table_name = self.db_config.get('table', 'dwd_extended_trajectory')
+        base_query, params = build_trajectory_query(table_name, criteria, start_time, end_time, order_by=False)
+        if not base_query:
+            print("警告: 查询条件为空，不执行查询。")
+            return [], 0
+        query_str, params = build_preview_query(base_query, params, max_points, mode, start_time, end_time)
+
+        try:
+            print(f"执行预览查询: {query_str} with params {params}")
+            rows = self._fetch_all(query_str, params)
+        except SQLAlchemyError as e:
+            print(f"数据库查询错误: {e}")
+            return None
+
+        total = rows[0].preview_total if rows else 0
+        points = []
+        for row in rows:
+            point = row._asdict()
+            for column in PREVIEW_COLUMNS:
+                point.pop(column, None)
+            points.append(point)
+        return points, total
+
+    def query_trajectories_bulk(self, requests):
+        """
+        一次性查询多个目标的轨迹，并按键拆分结果。
+        省份相同且时间窗口重叠的条目合并为一条 IN 列表查询，通常只需要一次往返。
+        :param requests: {键: {'mmsi', 'id', 'province', 'start_time', 'end_time'}}，mmsi 与 id 至少有一个
+        :return: {键: [按 lastTm 排序的结果行, ...]}，如果出错则返回 None。
+        """
+
+        table_name = self.db_config.get('table', 'dwd_extended_trajectory')
+        results = {key: [] for key in requests}
+        try:
+            for province, start_time, end_time, keys in group_bulk_requests(requests):
+                by_mmsi, by_id = {}, {}
+                windows = {}
+                for key in keys:
+                    request = requests[key]
+                    if request.get('mmsi'):
+                        by_mmsi.setdefault(str(request['mmsi']), []).append(key)
+                    if request.get('id'):
+                        by_id.setdefault(str(request['id']), []).append(key)
+                    windows[key] = (_as_datetime(request['start_time']), _as_datetime(request['end_time']))
+
+                build = lambda sub_start, sub_end, is_last: build_bulk_trajectory_query(
+                    table_name, list(by_mmsi), list(by_id), province, sub_start, sub_end, end_inclusive=is_last)
+                sub_ranges = split_time_range(start_time, end_time, self.split_hours) if self.split_hours > 0 else []
+                print(f"执行批量查询: {len(keys)} 个目标，时间范围 {start_time} ~ {end_time}")
+                if len(sub_ranges) > 1:
+                    rows = self._query_sub_ranges(build, sub_ranges)
+                else:
+                    rows = self._fetch_all(*build(start_time, end_time, True))
+
+                # 按 MMSI / ID 和各自的时间窗口把结果行分配回各条目
+                for row in rows:
+                    candidates = by_mmsi.get(str(row.mmsi), []) + by_id.get(str(row.id), [])
+                    if not candidates:
+                        continue
+                    row_dt = _as_datetime(row.lastDT)
+                    for key in dict.fromkeys(candidates):
+                        window_start, window_end = windows[key]
+                        if window_start <= row_dt <= window_end:
+                            results[key].append(row)
+            return results
+
+        except SQLAlchemyError as e:
+            print(f"数据库查询错误: {e}")
+            return None
+
+    def _query_sub_ranges(self, build_query, sub_ranges):
+        """
+        各子区间使用连接池中的独立连接并行查询，结果按 lastTm 归并。
+        每个子区间的结果已按 lastTm 排序，归并后与单条查询的顺序一致。
+        :param build_query: build_query(子区间开始, 子区间结束, 是否为最后一段) -> (SQL, 参数字典)
+        """
+        def run(sub_range):
+            return self._fetch_all(*build_query(*sub_range))
+
+        print(f"执行分段查询: {len(sub_ranges)} 个子区间 (每段最长 {self.split_hours} 小时，并发 {self.parallel_queries})")
+        with ThreadPoolExecutor(max_workers=min(self.parallel_queries, len(sub_ranges))) as executor:
+            results = list(executor.map(run, sub_ranges))
+        return list(heapq.merge(*results, key=lambda row: row.lastTm))
+
+    def _fetch_all(self, query_str, params):
+        """
+        在连接池中的连接上执行查询并返回全部结果行（按配置先输出执行计划）。
+        结果按SQL与参数缓存，参数中的 end_time 决定缓存是否过期。
+        """
+        key = None
+        if self.query_cache is not None:
+            key = QueryCache.fingerprint(query_str, params)
+            rows = self.query_cache.get(key)
+            if rows is not None:
+                print(f"查询缓存命中: {len(rows)} 行")
+                return rows
+
+        def work(conn):
+            if self.explain_queries:
+                self._log_explain(conn, query_str, params)
+            return conn.execute(_statement(query_str, params), params).fetchall()
+        rows = self._run(work)
+
+        if key is not None:
+            self.query_cache.put(key, rows, params.get('end_time'))
+        return rows
+
+    def cache_stats(self):
+        """:return: 查询缓存的统计信息字典，未启用缓存时返回 None。"""
+        return self.query_cache.stats() if self.query_cache is not None else None
+
+    def _log_explain(self, conn, query_str, params):
+        """输出 EXPLAIN COSTS 中的分区裁剪与基数估计，失败时不影响查询。"""
+        try:
+            plan = conn.execute(_statement(f"EXPLAIN COSTS {query_str}", params), params).fetchall()
+        except SQLAlchemyError as e:
+            print(f"EXPLAIN 执行失败: {e}")
+            return
+        lines = [str(row[0]).strip() for row in plan]
+        summary = [line for line in lines if 'partitions=' in line or 'cardinality' in line or 'tabletRatio' in line]
+        print("查询计划 (EXPLAIN COSTS):\n  " + "\n  ".join(summary or lines[:20]))
+
     def close(self):
         """
-        关闭数据库会话。
+        关闭连接池中的所有连接。
         """
-        if self.session:
-            self.session.close()
-            self.is_connected = False
-            print("数据库会话已关闭。")
+        self.engine.dispose()
+        self.is_connected = False
+        print("数据库连接池已关闭。")
 
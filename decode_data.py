@@ -6,6 +6,57 @@ import binascii
 
 # 解码pb里发送的数据
 
+def _decompress(byte_data, output_log):
+    """
+    依次尝试 zlib / raw deflate 解压，都失败时原样返回。
+    """
+    try:
+        data = zlib.decompress(byte_data)
+        output_log.append("成功使用zlib解压。")
+        return data
+    except zlib.error:
+        try:
+            data = zlib.decompress(byte_data, -15)
+            output_log.append("成功使用 raw deflate 解压。")
+            return data
+        except zlib.error:
+            output_log.append("zlib解压失败，将作为未压缩数据尝试直接解析。")
+            return byte_data
+
+
+def _parse_message(data_to_parse):
+    """
+    先按 TargetProtoList 解析，失败时再按单个 TargetProto 解析。
+    :return: 解析成功的消息对象，失败返回 None。
+    """
+    try:
+        proto_list = target_pb2.TargetProtoList()
+        proto_list.ParseFromString(data_to_parse)
+        if proto_list.list:
+            return proto_list
+    except Exception:
+        try:
+            proto_single = target_pb2.TargetProto()
+            proto_single.ParseFromString(data_to_parse)
+            if proto_single.ByteSize() > 0:
+                return proto_single
+        except Exception:
+            pass # Both failed, handled by caller
+    return None
+
+
+def parse_frame(byte_data):
+    """
+    将一帧原始字节（可能经过压缩）解析为Protobuf消息，不做JSON转换。
+    供批量解析等只需要消息对象的场景使用。
+    :return: TargetProtoList / TargetProto，无法解析时返回 None。
+    """
+    data_to_parse = _decompress(byte_data, [])
+    if not data_to_parse:
+        return None
+    return _parse_message(data_to_parse)
+
+
 def decode_data(hex_string):
     """
     Decodes a protobuf-serialized hex string.
@@ -19,35 +70,12 @@ def decode_data(hex_string):
             return False, "输入为空。"
         byte_data = bytes.fromhex(cleaned_hex)
 
-        data_to_parse = None
-        try:
-            data_to_parse = zlib.decompress(byte_data)
-            output_log.append("成功使用zlib解压。")
-        except zlib.error:
-            try:
-                data_to_parse = zlib.decompress(byte_data, -15)
-                output_log.append("成功使用 raw deflate 解压。")
-            except zlib.error:
-                output_log.append("zlib解压失败，将作为未压缩数据尝试直接解析。")
-                data_to_parse = byte_data
+        data_to_parse = _decompress(byte_data, output_log)
 
         if not data_to_parse:
             return False, "\n".join(output_log) + "\n错误: 解码或解压后数据为空。"
 
-        parsed_message = None
-        try:
-            proto_list = target_pb2.TargetProtoList()
-            proto_list.ParseFromString(data_to_parse)
-            if proto_list.list:
-                parsed_message = proto_list
-        except Exception:
-            try:
-                proto_single = target_pb2.TargetProto()
-                proto_single.ParseFromString(data_to_parse)
-                if proto_single.ByteSize() > 0:
-                    parsed_message = proto_single
-            except Exception:
-                pass # Both failed, handled below
+        parsed_message = _parse_message(data_to_parse)
 
         if not parsed_message:
             output_log.append("错误: 无法将数据解析为任何已知的Protobuf消息类型。")
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import random
+import string
+
+from json_payloads import AIS_STATIC_KEYS, ais_static_record, encode_ais_record, iter_ais_exts_batches
+
+# 船队AIS静态信息批量广播。
+# 船队名单来自CSV文件或按种子生成；每艘船的静态信息只编码一次，
+# 广播时把一个周期内的发送时刻均匀错开，每次定时器触发只发送到期的船，并打包成多船的 AisExts 消息。
+
+# AIS A类船舶静态与航次数据(消息5)的标准播发间隔为6分钟
+DEFAULT_INTERVAL_SECONDS = 360
+DEFAULT_BATCH_SIZE = 100
+# 低于Kafka生产者默认的 max.request.size (1MB)
+DEFAULT_MAX_MESSAGE_BYTES = 900000
+
+# CSV表头别名 -> AisExts 字段（表头也可以直接使用 AisExts 字段名）
+CSV_ALIASES = {
+    "mmsi": "MMSI", "vessel_name": "Vessel Name", "name": "Vessel Name", "ship_class": "Ship Class",
+    "class": "Ship Class", "nationality": "Nationality", "imo": "IMO", "call_sign": "Call_Sign",
+    "callsign": "Call_Sign", "length": "Length", "width": "Wide", "wide": "Wide", "draught": "Draught",
+    "ship_type": "Ship Type", "shiptype": "Ship Type", "destination": "Destination", "eta": "etaTime",
+    "a": "A (to Bow)", "b": "B (to Stern)", "c": "C (to Port)", "d": "C (to Starboard)",
+}
+
+GENERATED_DESTINATIONS = ("QINGDAO", "YANTAI", "WEIHAI", "DALIAN", "TIANJIN", "SHANGHAI", "NINGBO", "RIZHAO")
+
+
+def _column_key(header):
+    header = header.strip()
+    if header in AIS_STATIC_KEYS:
+        return header
+    return CSV_ALIASES.get(header.lower().replace(" ", "_"))
+
+
+def _fill_dimensions(values, rng):
+    """缺少船首/船尾/左右舷距离时，按船长船宽随机拆分（与静态信息页签一致），船长船宽未知时保持为空。"""
+    for size_key, first_key, second_key in (("Length", "A (to Bow)", "B (to Stern)"),
+                                            ("Wide", "C (to Port)", "C (to Starboard)")):
+        if values.get(first_key) or values.get(second_key):
+            continue
+        try:
+            size = int(float(values.get(size_key) or ""))
+        except ValueError:
+            continue
+        first = rng.randint(0, max(0, size))
+        values[first_key], values[second_key] = str(first), str(size - first)
+
+
+def load_roster_csv(path, seed=0):
+    """
+    读取船队名单CSV（UTF-8，可带BOM）。必须有MMSI列，其余列可选。
+    :return: (AisExts 记录列表, 跳过的行号列表)
+    """
+    rng = random.Random(seed)
+    records = []
+    skipped = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        columns = {header: _column_key(header) for header in reader.fieldnames or []}
+        if "MMSI" not in columns.values():
+            raise ValueError(f"CSV文件缺少MMSI列，表头为: {reader.fieldnames}")
+        for line_number, row in enumerate(reader, start=2):
+            values = {key: (row[header] or "").strip() for header, key in columns.items() if key}
+            if not values.get("MMSI", "").isdigit():
+                skipped.append(line_number)
+                continue
+            values.setdefault("LengthRealTime", values.get("Length", ""))
+            _fill_dimensions(values, rng)
+            records.append(ais_static_record(values))
+    return records, skipped
+
+
+def generate_roster(count, seed=0, mmsi_start=412000000, ship_types=("Cargo",), nationality="CN"):
+    """按种子生成 count 艘船的静态信息，相同参数生成的名单相同。"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        length = rng.randint(20, 300)
+        width = max(4, int(length / rng.uniform(5.5, 7.5)))
+        values = {
+            "MMSI": str(mmsi_start + i),
+            "Vessel Name": f"SIMU{i:05d}",
+            "Ship Class": rng.choice(("A", "B")),
+            "Nationality": nationality,
+            "IMO": str(rng.randint(1000000, 9999999)),
+            "Call_Sign": "B" + "".join(rng.choice(string.ascii_uppercase) for _ in range(4)),
+            "LengthRealTime": str(float(length)),
+            "Length": str(float(length)),
+            "Wide": str(float(width)),
+            "Draught": f"{rng.uniform(2.0, min(20.0, length / 12.0 + 2.0)):.1f}",
+            "Ship Type": rng.choice(ship_types),
+            "Destination": rng.choice(GENERATED_DESTINATIONS),
+            "etaTime": "",
+        }
+        _fill_dimensions(values, rng)
+        records.append(ais_static_record(values))
+    return records
+
+
+class StaticBroadcastSchedule:
+    """
+    在 interval_seconds 内把 N 艘船的发送时刻均匀错开：第 i 艘在每个周期的 i * interval / N 秒发送。
+    due_messages(now) 返回从上次调用到 now 之间到期的船打包成的消息；
+    定时器延迟时会补发，但最多补一个完整周期。
+    :param records: AisExts 记录列表
+    :param max_bytes: 每条消息的字节数上限
+    :param shuffle_seed: 不为 None 时打乱发送顺序，避免按MMSI顺序发送
+    """
+    def __init__(self, records, start_time, interval_seconds=DEFAULT_INTERVAL_SECONDS,
+                 batch_size=DEFAULT_BATCH_SIZE, max_bytes=None, shuffle_seed=None):
+        if not records:
+            raise ValueError("船队名单为空。")
+        if interval_seconds <= 0 or batch_size <= 0:
+            raise ValueError("广播周期和每条消息的船舶数必须大于0。")
+        fragments = [encode_ais_record(record) for record in records]
+        if shuffle_seed is not None:
+            random.Random(shuffle_seed).shuffle(fragments)
+        self.fragments = fragments
+        self.start_time = start_time
+        self.interval_seconds = float(interval_seconds)
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.position = 0  # 调度位置：已到期的船次（跨周期累计，含跳过的船次）
+        self.sent = 0  # 实际发送的船次
+        self.messages = 0
+        self.skipped = 0  # 延迟过大时放弃补发的船次
+
+    @property
+    def vessel_count(self):
+        return len(self.fragments)
+
+    @property
+    def cycle(self):
+        """实际发送完成的整轮数"""
+        return self.sent // len(self.fragments)
+
+    @property
+    def vessels_per_second(self):
+        return len(self.fragments) / self.interval_seconds
+
+    def due_messages(self, now):
+        """:return: [(消息bytes, 船舶数), ...]"""
+        count = len(self.fragments)
+        due = int((now - self.start_time) * count / self.interval_seconds) + 1
+        if due - self.position > count:
+            self.skipped += due - count - self.position
+            self.position = due - count
+        fragments = [self.fragments[i % count] for i in range(self.position, due)]
+        self.position = max(self.position, due)
+        self.sent += len(fragments)
+        messages = list(iter_ais_exts_batches(fragments, self.batch_size, self.max_bytes))
+        self.messages += len(messages)
+        return messages
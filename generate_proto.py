@@ -1,9 +1,24 @@
 # -*- coding: utf-8 -*-
 
+import argparse
+import importlib
 import os
 import subprocess
 import sys
 
+# 唯一的Protobuf绑定模块由 target.proto 生成为 target_pb2.py。
+# 历史上由 UnionTarget.proto 生成的旧模块字段不全 (缺少 eTargetType / sources / aidtype)，
+# 构建时会被清理，避免被误导入。
+STALE_MODULES = ['gen_target.py', 'UnionTarget_pb2.py']
+
+# 生成结果中必须存在的字段: (消息名, 字段名)
+REQUIRED_FIELDS = [
+    ('TargetProto', 'eTargetType'),
+    ('TargetProto', 'sources'),
+    ('TargetProto', 'vecFusionedTargetInfo'),
+    ('cTargProto', 'aidtype'),
+]
+
 def generate_proto_files():
     """
     使用 grpc_tools.protoc 工具，将 .proto 文件编译成 Python 代码。
@@ -41,6 +56,8 @@ def generate_proto_files():
         )
         
         print(f"成功生成: {output_file}")
+        remove_stale_modules()
+        verify_generated_module()
         
         # 如果 protoc 有任何输出，也打印出来
         if result.stdout:
@@ -59,6 +76,44 @@ def generate_proto_files():
         print(e.stderr)
         sys.exit(1)
 
+def remove_stale_modules():
+    """删除旧的、与 target.proto 不一致的生成模块。"""
+    for stale_file in STALE_MODULES:
+        if os.path.exists(stale_file):
+            os.remove(stale_file)
+            print(f"已删除过期的生成模块: {stale_file}")
+
+
+def verify_generated_module():
+    """
+    导入新生成的 target_pb2，确认关键字段存在，并检查 protobuf 运行时实现。
+    """
+    sys.path.insert(0, os.getcwd())
+    target_pb2 = importlib.import_module('target_pb2')
+    importlib.reload(target_pb2)
+
+    missing = []
+    for message_name, field_name in REQUIRED_FIELDS:
+        descriptor = getattr(target_pb2, message_name).DESCRIPTOR
+        if field_name not in descriptor.fields_by_name:
+            missing.append(f"{message_name}.{field_name}")
+    if missing:
+        print(f"错误: 生成的 target_pb2.py 缺少字段: {', '.join(missing)}")
+        sys.exit(1)
+    print("target_pb2.py 字段校验通过。")
+
+    from pb_backend import check_protobuf_backend
+    check_protobuf_backend()
+
+
 if __name__ == '__main__':
-    # 当该脚本被直接执行时，调用生成函数
-    generate_proto_files()
+    parser = argparse.ArgumentParser(description="由 target.proto 生成唯一的 target_pb2.py 并进行校验。")
+    parser.add_argument('--check', action='store_true', help="不重新生成，只校验现有模块与 protobuf 运行时实现")
+    args = parser.parse_args()
+
+    if args.check:
+        remove_stale_modules()
+        verify_generated_module()
+    else:
+        # 当该脚本被直接执行时，调用生成函数
+        generate_proto_files()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import json
+from json.encoder import encode_basestring
+
+# AIS静态信息 / BDS位置 JSON 消息的紧凑编码。
+# - 发送统一使用紧凑格式（无缩进、无空格），缩进格式只用于日志显示
+# - JsonTemplate 预先编码好键和不变的值，每次只格式化变化的字段
+# - AIS静态信息按船预先编码为片段，批量消息的 AisExts 数组直接拼接片段，广播周期内不再重复编码
+
+# 与“静态信息”页签发送内容一致的字段顺序
+AIS_STATIC_KEYS = (
+    "MMSI", "Vessel Name", "Ship Class", "Nationality", "IMO", "Call_Sign",
+    "LengthRealTime", "Length", "Wide", "Draught", "Ship Type", "Destination", "etaTime",
+    "A (to Bow)", "B (to Stern)", "C (to Port)", "C (to Starboard)", "extInfo",
+)
+
+BDS_KEYS = (
+    "altitude", "communicate", "course", "disassemble", "distress", "jobType",
+    "latitude", "longitude", "online", "power", "provider", "province",
+    "shipLength", "shipName", "source", "speed", "status", "terminal", "tilt", "utc",
+)
+# BDS 消息中每次发送都会变化的字段，顺序即 render() 的参数顺序
+BDS_DYNAMIC_KEYS = ("course", "latitude", "longitude", "speed", "utc")
+
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_compact(obj):
+    """紧凑格式编码为字符串（中文不转义）。"""
+    return _compact_encoder.encode(obj)
+
+
+def pretty_json(data):
+    """仅用于显示：把对象或已编码的JSON(str/bytes)格式化为缩进2格的字符串。"""
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    if isinstance(data, str):
+        data = json.loads(data)
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def _encode_value(value):
+    """单个值的编码，常见类型不经过通用编码器。"""
+    value_type = type(value)
+    if value_type is float:
+        # 有限值 value - value == 0；nan/inf 与json模块一致由编码器输出 NaN/Infinity
+        return float.__repr__(value) if value - value == 0.0 else _compact_encoder.encode(value)
+    if value_type is str:
+        return encode_basestring(value)
+    if value_type is int:
+        return int.__repr__(value)
+    return _compact_encoder.encode(value)
+
+
+class JsonTemplate:
+    """
+    字段顺序固定的JSON对象模板。不变字段在构造时编码，render() 只编码变化的字段。
+    :param keys: 全部字段，按输出顺序
+    :param static_values: {字段: 值}，不变字段
+    :param dynamic_keys: 变化的字段，render() 按此顺序接收值
+    """
+    def __init__(self, keys, static_values, dynamic_keys):
+        missing = [key for key in keys if key not in static_values and key not in dynamic_keys]
+        if missing:
+            raise ValueError(f"模板字段缺少取值: {missing}")
+        self.keys = tuple(keys)
+        self.dynamic_keys = tuple(dynamic_keys)
+        # 各动态字段在输出中的位置按 keys 的顺序，render() 的参数按 dynamic_keys 的顺序
+        self._order = [self.dynamic_keys.index(key) for key in self.keys if key in self.dynamic_keys]
+        members = []
+        for key in self.keys:
+            if key in self.dynamic_keys:
+                members.append(encode_basestring(key) + ":%s")
+            else:
+                members.append(encode_basestring(key) + ":" + encode_compact(static_values[key]).replace("%", "%%"))
+        self._format = "{" + ",".join(members) + "}"
+
+    def render(self, *dynamic_values):
+        """:return: 紧凑格式的JSON字符串"""
+        encoded = [_encode_value(dynamic_values[i]) for i in self._order]
+        return self._format % tuple(encoded)
+
+    def render_bytes(self, *dynamic_values):
+        return self.render(*dynamic_values).encode('utf-8')
+
+
+def bds_template(province, provider, ship_length, ship_name, terminal):
+    """
+    BDS位置消息模板，render(course, latitude, longitude, speed, utc)。
+    不变字段与实时目标页签的BDS消息一致。
+    """
+    static_values = {
+        "altitude": 0, "communicate": 0, "disassemble": 0, "distress": 0, "jobType": "",
+        "online": 0, "power": 0, "provider": provider, "province": province,
+        "shipLength": ship_length, "shipName": ship_name,
+        "source": 2, "status": 0, "terminal": terminal, "tilt": 0,
+    }
+    return JsonTemplate(BDS_KEYS, static_values, BDS_DYNAMIC_KEYS)
+
+
+def ais_static_record(values):
+    """
+    按 AIS_STATIC_KEYS 的顺序构造一条AIS静态信息，缺少的字段为空字符串（extInfo 为 None）。
+    :param values: {字段: 值}
+    """
+    return {key: values.get(key, None if key == "extInfo" else "") for key in AIS_STATIC_KEYS}
+
+
+def encode_ais_record(record):
+    """把一条AIS静态信息编码为 AisExts 数组中的一个片段，可重复用于多次发送。"""
+    return encode_compact(record)
+
+
+def encode_ais_exts(fragments):
+    """:param fragments: encode_ais_record 的结果列表  :return: {"AisExts": [...]} 消息(bytes)"""
+    return ('{"AisExts":[' + ",".join(fragments) + "]}").encode('utf-8')
+
+
+def iter_ais_exts_batches(fragments, batch_size, max_bytes=None):
+    """
+    把多条AIS静态信息片段分批组装为 AisExts 消息。
+    :param batch_size: 每条消息最多包含的船舶数
+    :param max_bytes: 每条消息的字节数上限（如Kafka的 max.request.size），单条超过上限时仍单独成一条消息
+    :return: 依次产生 (消息bytes, 船舶数)
+    """
+    batch = []
+    batch_bytes = 0
+    overhead = len('{"AisExts":[]}')
+    for fragment in fragments:
+        fragment_bytes = len(fragment.encode('utf-8')) + 1
+        if batch and (len(batch) >= batch_size or
+                      (max_bytes and overhead + batch_bytes + fragment_bytes > max_bytes)):
+            yield encode_ais_exts(batch), len(batch)
+            batch, batch_bytes = [], 0
+        batch.append(fragment)
+        batch_bytes += fragment_bytes
+    if batch:
+        yield encode_ais_exts(batch), len(batch)
@@ -1,8 +1,10 @@
 import json
+import threading
 from kafka import KafkaProducer
 from kafka.errors import NoBrokersAvailable
 import logging
 import time
+from profiler import profiled
 
 # 配置一个基础的日志记录器，以防没有回调时，日志信息能输出到控制台
 logging.basicConfig(level=logging.INFO)
@@ -58,6 +60,7 @@ class KProducer:
             self._log(f"连接 Kafka 时发生未知错误: {e}")
             self.producer = None
 
+    @profiled("kafka.send_message")
     def send_message(self, topic, message_bytes):
         """
         向指定的Kafka topic发送单条消息。
@@ -97,3 +100,88 @@ class KProducer:
             self.producer.flush()  # 等待所有未���送的消息完成发送
             self.producer.close()
             self._log("Kafka 生产者已关闭。")
+
+
+class FileSink:
+    """
+    与 KProducer 接口一致的本地文件“生产者”，用于没有Kafka环境时的联调和测试。
+    每条消息写为一行JSON: {"topic": ..., "ts": 毫秒时间戳, "value": Hex字符串}，
+    可被 kafka_tap.FileRecordSource 实时读取。
+    """
+    def __init__(self, file_path, log_callback=None):
+        self.file_path = file_path
+        self.log_callback = log_callback
+        self.producer = None
+        self._lock = threading.Lock()
+        self._log(f"文件 Sink 已初始化: {self.file_path}")
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+            logger.info(f"[{timestamp}] {message}")
+
+    def connect(self):
+        try:
+            self.producer = open(self.file_path, 'a', encoding='utf-8')
+            self._log(f"已打开文件 Sink: {self.file_path}")
+        except OSError as e:
+            self._log(f"错误: 无法打开文件 Sink '{self.file_path}': {e}")
+            self.producer = None
+
+    @profiled("kafka.send_message")
+    def send_message(self, topic, message_bytes):
+        if not self.producer:
+            self._log("错误: 文件 Sink 未打开，无法发送消息。")
+            return False
+        record = {"topic": topic, "ts": int(time.time() * 1000), "value": message_bytes.hex()}
+        try:
+            with self._lock:
+                self.producer.write(json.dumps(record) + "\n")
+                self.producer.flush()
+            self._log(f"消息已写入文件 Sink (Topic '{topic}', {len(message_bytes)} 字节)")
+            return True
+        except OSError as e:
+            self._log(f"写入文件 Sink 失败: {e}")
+            return False
+
+    def close(self):
+        if self.producer:
+            self.producer.close()
+            self.producer = None
+            self._log("文件 Sink 已关闭。")
+
+
+class NullSink:
+    """
+    与 KProducer 接口一致、丢弃所有消息的“生产者”，只统计条数和字节数。
+    用于压测和定时精度测试，排除网络与磁盘写入的影响。
+    """
+    def __init__(self, log_callback=None):
+        self.log_callback = log_callback
+        self.producer = None
+        self.messages = 0
+        self.bytes = 0
+        self._log("空 Sink 已初始化，消息将被丢弃。")
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+            logger.info(f"[{timestamp}] {message}")
+
+    def connect(self):
+        self.producer = True
+
+    @profiled("kafka.send_message")
+    def send_message(self, topic, message_bytes):
+        self.messages += 1
+        self.bytes += len(message_bytes)
+        return True
+
+    def close(self):
+        if self.producer:
+            self.producer = None
+            self._log(f"空 Sink 已关闭，共丢弃 {self.messages} 条消息 ({self.bytes} 字节)。")
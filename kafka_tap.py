@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import target_pb2
+from decode_data import parse_frame
+
+# 实时监听 unionTargetPb / AIS静态 / BDS 等Topic，在后台线程中增量解析，
+# 维护每个目标的最新状态，并根据 lastTm 与到达时间计算端到端延迟。
+# 数据源既可以是真实的Kafka，也可以是 kafka_producer.FileSink 写出的本地文件，便于离线联调。
+
+
+class KafkaRecordSource:
+    """
+    基于 KafkaConsumer 的数据源，只读取启动之后的新消息。
+    """
+    def __init__(self, bootstrap_servers, topics):
+        self.bootstrap_servers = bootstrap_servers
+        self.topics = [t for t in topics if t]
+        self.consumer = None
+
+    def open(self):
+        from kafka import KafkaConsumer
+        self.consumer = KafkaConsumer(
+            *self.topics,
+            bootstrap_servers=self.bootstrap_servers,
+            auto_offset_reset='latest',
+            enable_auto_commit=False,
+            group_id=None,
+            consumer_timeout_ms=500
+        )
+
+    def poll(self):
+        """返回 [(topic, value_bytes, arrival_ms), ...]，没有新消息时返回空列表。"""
+        records = []
+        batches = self.consumer.poll(timeout_ms=500)
+        arrival_ms = int(time.time() * 1000)
+        for partition, messages in batches.items():
+            for message in messages:
+                records.append((message.topic, message.value, arrival_ms))
+        return records
+
+    def close(self):
+        if self.consumer:
+            self.consumer.close()
+            self.consumer = None
+
+
+class FileRecordSource:
+    """
+    读取 FileSink 写出的 JSON Lines 文件，行为类似 tail -f。
+    :param from_start: True 时从文件开头读取（回放已有记录），否则只读取新追加的内容。
+    """
+    def __init__(self, file_path, topics=None, from_start=False):
+        self.file_path = file_path
+        self.topics = set(t for t in (topics or []) if t)
+        self.from_start = from_start
+        self._file = None
+        self._pending = ""
+
+    def open(self):
+        # 文件可能尚未被写入方创建
+        if not os.path.exists(self.file_path):
+            open(self.file_path, 'a', encoding='utf-8').close()
+        self._file = open(self.file_path, 'r', encoding='utf-8')
+        if not self.from_start:
+            self._file.seek(0, os.SEEK_END)
+
+    def poll(self):
+        chunk = self._file.read()
+        if not chunk:
+            time.sleep(0.2)
+            return []
+        arrival_ms = int(time.time() * 1000)
+        data = self._pending + chunk
+        lines = data.split("\n")
+        # 最后一段可能是尚未写完的半行，留到下次拼接
+        self._pending = lines.pop()
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                topic = record["topic"]
+                if self.topics and topic not in self.topics:
+                    continue
+                records.append((topic, bytes.fromhex(record["value"]), arrival_ms))
+            except (ValueError, KeyError):
+                continue
+        return records
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class TopicTap(threading.Thread):
+    """
+    后台监听线程。按Topic区分三类消息：
+    - pb_topic:         unionTargetPb，按目标ID更新最新状态并统计延迟
+    - ais_static_topic: AIS静态信息JSON，按MMSI补充船名等静态字段
+    - bds_topic:        BDS位置JSON，按终端号更新最新状态
+    UI线程通过 snapshot() 以自己的刷新频率读取结果，解析与显示互不阻塞。
+    """
+    def __init__(self, source, pb_topic, ais_static_topic=None, bds_topic=None, latency_window=2000):
+        super().__init__(daemon=True)
+        self.source = source
+        self.pb_topic = pb_topic
+        self.ais_static_topic = ais_static_topic
+        self.bds_topic = bds_topic
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.latest = {}          # {目标键: 状态字典}
+        self.static_by_mmsi = {}  # {mmsi: 静态信息字典}
+        self.topic_counts = {}
+        self.decode_errors = 0
+        self.latencies = deque(maxlen=latency_window)
+        self.error = None
+        self.started_at = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        self.started_at = time.time()
+        try:
+            self.source.open()
+        except Exception as e:
+            self.error = f"打开数据源失败: {e}"
+            return
+        try:
+            while not self._stop_event.is_set():
+                for topic, value, arrival_ms in self.source.poll():
+                    self._handle_record(topic, value, arrival_ms)
+        except Exception as e:
+            self.error = f"监听过程中发生错误: {e}"
+        finally:
+            self.source.close()
+
+    def _handle_record(self, topic, value, arrival_ms):
+        with self._lock:
+            self.topic_counts[topic] = self.topic_counts.get(topic, 0) + 1
+        if topic == self.pb_topic:
+            self._handle_pb(value, arrival_ms)
+        elif topic == self.ais_static_topic:
+            self._handle_ais_static(value)
+        elif topic == self.bds_topic:
+            self._handle_bds(value, arrival_ms)
+
+    def _handle_pb(self, value, arrival_ms):
+        message = parse_frame(value)
+        if message is None:
+            with self._lock:
+                self.decode_errors += 1
+            return
+        targets = message.list if isinstance(message, target_pb2.TargetProtoList) else (message,)
+        with self._lock:
+            for target in targets:
+                pos = target.pos
+                latency_ms = arrival_ms - target.lastTm if target.lastTm else None
+                if latency_ms is not None:
+                    self.latencies.append(latency_ms)
+                key = ("PB", target.id)
+                state = self.latest.get(key)
+                updates = state["updates"] + 1 if state else 1
+                static = self.static_by_mmsi.get(str(pos.mmsi)) if pos.mmsi else None
+                self.latest[key] = {
+                    "topic": self.pb_topic,
+                    "id": target.id,
+                    "mmsi": pos.mmsi,
+                    "vesselName": pos.vesselName or (static or {}).get("Vessel Name", ""),
+                    "eTargetType": target.eTargetType,
+                    "status": target.status,
+                    "longitude": pos.geoPtn.longitude,
+                    "latitude": pos.geoPtn.latitude,
+                    "speed": pos.speed,
+                    "course": pos.course,
+                    "lastTm": target.lastTm,
+                    "arrival_ms": arrival_ms,
+                    "latency_ms": latency_ms,
+                    "updates": updates,
+                }
+
+    def _handle_ais_static(self, value):
+        try:
+            payload = json.loads(value.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            with self._lock:
+                self.decode_errors += 1
+            return
+        with self._lock:
+            for entry in payload.get("AisExts", []):
+                mmsi = str(entry.get("MMSI", ""))
+                if mmsi:
+                    self.static_by_mmsi[mmsi] = entry
+
+    def _handle_bds(self, value, arrival_ms):
+        try:
+            payload = json.loads(value.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            with self._lock:
+                self.decode_errors += 1
+            return
+        records = payload if isinstance(payload, list) else [payload]
+        with self._lock:
+            for record in records:
+                key = ("BDS", record.get("terminal"))
+                state = self.latest.get(key)
+                # BDS消息只有秒级的本地时间字符串 utc，延迟精度为秒
+                last_tm = None
+                try:
+                    last_tm = int(time.mktime(time.strptime(record.get("utc", ""), "%Y-%m-%d %H:%M:%S")) * 1000)
+                except (ValueError, TypeError):
+                    pass
+                latency_ms = arrival_ms - last_tm if last_tm else None
+                if latency_ms is not None:
+                    self.latencies.append(latency_ms)
+                self.latest[key] = {
+                    "topic": self.bds_topic,
+                    "id": record.get("terminal"),
+                    "mmsi": 0,
+                    "vesselName": record.get("shipName", ""),
+                    "eTargetType": None,
+                    "status": record.get("status"),
+                    "longitude": record.get("longitude", 0.0),
+                    "latitude": record.get("latitude", 0.0),
+                    "speed": record.get("speed", 0.0),
+                    "course": record.get("course", 0.0),
+                    "lastTm": last_tm,
+                    "arrival_ms": arrival_ms,
+                    "latency_ms": latency_ms,
+                    "updates": state["updates"] + 1 if state else 1,
+                }
+
+    def snapshot(self, max_rows=500):
+        """
+        返回当前状态的快照，供UI定时刷新。
+        :return: (按到达时间倒序的目标状态列表, 统计信息字典)
+        """
+        with self._lock:
+            rows = sorted(self.latest.values(), key=lambda r: r["arrival_ms"], reverse=True)[:max_rows]
+            rows = [dict(r) for r in rows]
+            latencies = sorted(self.latencies)
+            stats = {
+                "targets": len(self.latest),
+                "topic_counts": dict(self.topic_counts),
+                "decode_errors": self.decode_errors,
+                "error": self.error,
+            }
+        stats["latency_p50"] = _percentile(latencies, 50)
+        stats["latency_p95"] = _percentile(latencies, 95)
+        stats["latency_max"] = latencies[-1] if latencies else None
+        elapsed = time.time() - self.started_at if self.started_at else 0
+        stats["rate"] = sum(stats["topic_counts"].values()) / elapsed if elapsed > 0 else 0.0
+        return rows, stats
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(percent / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -2,6 +2,90 @@
 
 import math
 
+import numpy as np
+
+# 地球平均半径，单位：米
+EARTH_RADIUS_METERS = 6371000
+# 1节 ≈ 0.514444 米/秒
+KNOTS_TO_MPS = 0.514444
+
+
+def destination_points(lat, lon, course_degrees, distance_meters):
+    """
+    从起点沿初始航向 course_degrees 走大圆航线 distance_meters 米后的位置（公式同 calculate_next_point）。
+    参数可以是 numpy 数组或标量，按 numpy 规则广播。
+
+    :return: (新的纬度数组, 新的经度数组)，单位度
+    """
+    angular_distance = np.asarray(distance_meters, dtype=np.float64) / EARTH_RADIUS_METERS
+    course_rad = np.radians(course_degrees)
+    lat_rad = np.radians(lat)
+    sin_lat = np.sin(lat_rad)
+    cos_lat = np.cos(lat_rad)
+    sin_ad = np.sin(angular_distance)
+    cos_ad = np.cos(angular_distance)
+
+    new_lat_rad = np.arcsin(sin_lat * cos_ad + cos_lat * sin_ad * np.cos(course_rad))
+    new_lon_rad = np.radians(lon) + np.arctan2(
+        np.sin(course_rad) * sin_ad * cos_lat,
+        cos_ad - sin_lat * np.sin(new_lat_rad)
+    )
+    return np.degrees(new_lat_rad), np.degrees(new_lon_rad)
+
+
+def offset_points(lat, lon, east_meters, north_meters):
+    """在局部切平面上按东向、北向偏移（米）移动起点，适用于几十公里以内的偏移。"""
+    east = np.asarray(east_meters, dtype=np.float64)
+    north = np.asarray(north_meters, dtype=np.float64)
+    return destination_points(lat, lon, np.degrees(np.arctan2(east, north)), np.hypot(east, north))
+
+
+def great_circle_distance(lat1, lon1, lat2, lon2):
+    """两点间的大圆距离（米，haversine 公式），支持 numpy 数组。"""
+    lat1_rad, lat2_rad = np.radians(lat1), np.radians(lat2)
+    half_dlat = (lat2_rad - lat1_rad) / 2.0
+    half_dlon = np.radians(np.asarray(lon2, dtype=np.float64) - lon1) / 2.0
+    h = np.sin(half_dlat) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(half_dlon) ** 2
+    return 2.0 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def initial_bearing(lat1, lon1, lat2, lon2):
+    """从点1到点2大圆航线的初始航向（度, 0-360），支持 numpy 数组。"""
+    lat1_rad, lat2_rad = np.radians(lat1), np.radians(lat2)
+    dlon = np.radians(np.asarray(lon2, dtype=np.float64) - lon1)
+    y = np.sin(dlon) * np.cos(lat2_rad)
+    x = np.cos(lat1_rad) * np.sin(lat2_rad) - np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(dlon)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def advance_positions(lat, lon, speed_knots, course_degrees, time_interval_seconds):
+    """
+    LocationCalculator.calculate_next_point 的数组版本，一次推算多个目标（匀速）。
+
+    :return: (新的纬度数组, 新的经度数组)，单位度
+    """
+    distance_meters = np.asarray(speed_knots, dtype=np.float64) * KNOTS_TO_MPS * time_interval_seconds
+    return destination_points(lat, lon, course_degrees, distance_meters)
+
+
+def constant_accel_travel(speed_knots, accel_knots_per_min, seconds):
+    """
+    匀加速运动的解析解：航速按 accel 线性变化，减速到0后停止，不会倒退。
+    参数可以是 numpy 数组或标量。
+
+    :param accel_knots_per_min: 航速变化率（节/分），负数为减速
+    :return: (航程(米), 末速度(节))
+    """
+    speed = np.asarray(speed_knots, dtype=np.float64)
+    accel = np.asarray(accel_knots_per_min, dtype=np.float64) / 60.0
+    seconds = np.asarray(seconds, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stop_seconds = np.where(accel < 0, -speed / accel, np.inf)
+    moving = np.minimum(seconds, stop_seconds)
+    distance_meters = (speed * moving + 0.5 * accel * moving * moving) * KNOTS_TO_MPS
+    return distance_meters, np.maximum(speed + accel * seconds, 0.0)
+
+
 class LocationCalculator:
     """
     根据起点、速度、航向和时间计算下一个经纬度坐标。
@@ -4,6 +4,7 @@ import sys
 import traceback
 from PyQt5.QtWidgets import QApplication
 from main_window import MainWindow
+from pb_backend import check_protobuf_backend
 
 
 def main():
@@ -18,6 +19,9 @@ def main():
 
     sys.excepthook = exception_hook
 
+    # 检查 protobuf 是否使用C实现，纯python实现时给出实测序列化速率的警告
+    check_protobuf_backend()
+
     try:
         app = QApplication(sys.argv)
 
@@ -13,9 +13,9 @@ from PyQt5.QtWidgets import (
     QComboBox, QCheckBox, QTabWidget, QTableWidget, QTableWidgetItem,
     QHeaderView, QGraphicsView, QGraphicsScene, QDateTimeEdit, QGraphicsEllipseItem, QApplication,
     QRadioButton, QMessageBox, QButtonGroup, QInputDialog, QGraphicsSimpleTextItem, QGraphicsItem,
-    QDialog
+    QDialog, QFileDialog, QProgressBar, QTableView, QAbstractItemView
 )
-from PyQt5.QtCore import pyqtSlot, QTimer, Qt, QDateTime, pyqtSignal
+from PyQt5.QtCore import pyqtSlot, QTimer, Qt, QDateTime, pyqtSignal, QFileSystemWatcher
 from PyQt5.QtGui import QIcon, QCursor, QPen, QBrush, QColor, QPainter, QPainterPath, QFont
 
 
@@ -23,11 +23,31 @@ import zlib
 import binascii
 import datetime
 import decimal
-from kafka_producer import KProducer
+from kafka_producer import KProducer, FileSink, NullSink
+from kafka_tap import TopicTap, KafkaRecordSource, FileRecordSource
 import target_pb2
 from database import Database
-from location_calculator import LocationCalculator
+from simulation_model import SimulationModel
 from decode_data import decode_data
+from target_builder import RealtimeTargetTemplate, parse_source_ids
+from playback_prep import PlaybackPrepWorker, PlaybackStream, build_playback_target
+from config_loader import load_config, default_config, ConfigWatcher, ConfigError, DEFAULT_CONFIG_PATH
+from columnar_decode import decode_hex_file_to_columns
+from profiler import profiler, profiled, format_summary, DEFAULT_TRACE_PATH
+from json_payloads import bds_template, encode_ais_exts, encode_ais_record, pretty_json
+from fleet_static import (load_roster_csv, generate_roster, StaticBroadcastSchedule,
+                          DEFAULT_INTERVAL_SECONDS, DEFAULT_BATCH_SIZE, DEFAULT_MAX_MESSAGE_BYTES)
+from bds_fleet import BdsFleet, BDS_FLEET_CLASSES, DEFAULT_RATE as DEFAULT_BDS_FLEET_RATE
+from target_table import TargetStore, TargetTableModel
+from scenario_cache import ScenarioCache, ScenarioCompileWorker, ScenarioPlayer, default_cache_dir
+
+
+# 信息源键 -> 界面控件名前缀
+SOURCE_CHECKBOX_PREFIX = {"ais": "aisSource", "radar": "radarSource", "bds": "bdSource"}
+# 实时目标运动状态的界面刷新间隔（毫秒），与发送频率无关
+SIMULATION_DISPLAY_INTERVAL_MS = 500
+# 多目标表位置等列的最小刷新间隔（秒），与发送节拍无关
+MULTI_TARGET_REFRESH_SECONDS = 0.5
 
 
 def json_serial(obj):
@@ -102,6 +122,10 @@ class MainWindow(QWidget):
         self.setWindowTitle("Simu Kafka Sender")
 
         self.source_unchecked_timestamps = {}
+        # 实时目标的消息模板，界面静态字段变化时失效
+        self._realtime_template = None
+        self._realtime_template_class = None
+        self._bds_template = None  # BDS位置JSON的模板，失效条件与上面相同
 
         # --- 回放模块状态 ---
         self.playback_query_cache = {} # {row_index: {"params": {...}, "points": [...]}}
@@ -110,8 +134,11 @@ class MainWindow(QWidget):
         self.playback_send_inputs = {}
         # self.playback_sending_timer = QTimer(self)
         # self.playback_sending_timer.timeout.connect(self.send_playback_manual_data)
-        self.trajectory_sending_queue = []
-        self.trajectory_sending_index = 0
+        # 回放发送数据：后台准备线程，以及对各条轨迹按时间多路归并的发送流(PlaybackStream)
+        self.playback_prep_worker = None
+        self.playback_stream = None
+        self.playback_paused_at = None  # 暂停时刻(ms)，未暂停时为 None
+        self.playback_logged_cycle = 0  # 已输出“开始第 N 轮”日志的轮次
         self.trajectory_sending_timer = QTimer(self)
         self.trajectory_sending_timer.setTimerType(Qt.PreciseTimer) # 使用高精度定时器
         self.trajectory_sending_timer.timeout.connect(self.process_trajectory_queue_v4)
@@ -127,15 +154,17 @@ class MainWindow(QWidget):
         self.playback_lat_offset = 0.0
 
         # 加载外部配置
+        self.config_index = None
         self.config = self.load_config()
+        self._watch_config_file()
         self.trajectory_data = {} # 用于存储查到的轨迹数据
         self.playback_timer = QTimer(self) # 回放专用定时器
         self.playback_timer.timeout.connect(self.send_playback_data)
         self.playback_targets = []
         self.current_playback_index = 0
 
-        # 新增：位置计算器实例
-        self.location_calculator = None
+        # 实时目标的运动状态（SimulationModel），开始发送时由界面初始化，界面只显示
+        self.simulation = None
 
         # 创建一个定时器，用于周期性地发送数据
         self.sending_timer = QTimer(self)
@@ -149,7 +178,12 @@ class MainWindow(QWidget):
         self.association_state = "stopped"  # "sending", "paused", "terminated_associated", "stopped"
         self.keep_trend_combo = None # UI控件将在init_ui中创建
 
-        # 模拟计算定时器
+        # 解析PB页签的实时监听
+        self.topic_tap = None
+        self.tap_refresh_timer = QTimer(self)
+        self.tap_refresh_timer.timeout.connect(self.refresh_tap_table)
+
+        # 运动状态的界面刷新定时器（位置在发送和刷新时按需计算）
         self.simulation_timer = QTimer(self)
         self.simulation_timer.timeout.connect(self.update_simulation)
 
@@ -160,10 +194,34 @@ class MainWindow(QWidget):
         self.static_paste_input = None
         self.static_frequency_input = None
         self.static_start_pause_btn = None
+        # 船队静态信息批量广播
+        self.fleet_static_records = []
+        self.fleet_static_schedule = None
+        self.fleet_static_timer = QTimer(self)
+        self.fleet_static_timer.timeout.connect(self.send_fleet_static_batch)
+        # BDS船队位置流
+        self.bds_fleet = None
+        self.bds_fleet_timer = QTimer(self)
+        self.bds_fleet_timer.setTimerType(Qt.PreciseTimer)
+        self.bds_fleet_timer.timeout.connect(self.send_bds_fleet_batch)
+        # 预编译的合成场景
+        self.scenario_player = None
+        self.scenario_compile_worker = None
+        self.scenario_timer = QTimer(self)
+        self.scenario_timer.setTimerType(Qt.PreciseTimer)
+        self.scenario_timer.timeout.connect(self.send_scenario_frame)
+        # 多目标表：所有目标共用一个调度定时器，表格显示按 MULTI_TARGET_REFRESH_SECONDS 节流
+        self.multi_target_store = TargetStore()
+        self.multi_target_model = TargetTableModel(self.multi_target_store, self)
+        self.multi_target_timer = QTimer(self)
+        self.multi_target_timer.setTimerType(Qt.PreciseTimer)
+        self.multi_target_timer.timeout.connect(self.tick_multi_targets)
+        self._multi_target_refreshed = 0.0
         self.static_terminate_btn = None
         self.static_data_status_checkbox = None
         self.static_log_group = None
         self.static_log_display = None
+        self.log_display = None  # 在 init_ui 中创建，之前的日志只能丢弃
 
         # 新增：用于控制默认模式下首次发送状态的标志
         self.is_first_send = True
@@ -174,24 +232,35 @@ class MainWindow(QWidget):
         self.default_lineedit_style = ""
         self.load_and_extract_styles()
 
-        # 初始化数据库连接
+        # 初始化UI界面，确保所有UI控件都已创建
+        self.db = None
+        self.init_ui()
+        self._apply_profiling_config()
+
+        # 初始化数据库连接（在UI之后，失败信息才能写入日志区）
         try:
             self.db = Database(self.config.get('starrocks'))
             if not self.db.connect():
-                self.log_message("错误: 应用启动时数据库连接失败。")
+                self.log_message("错误: 应用启动时数据库连接失败，查询时将自动重连。")
         except ValueError as e:
             self.log_message(f"错误: {e}")
             self.db = None
 
-        # 初始化UI界面，确保所有UI控件都已创建
-        self.init_ui()
         self.adjustSize()
 
         # 初始化Kafka生产者，并将UI的日志函数作为回调传进去
-        self.kafka_producer = KProducer(
-            bootstrap_servers=self.config['kafka']['bootstrap_servers'],
-            log_callback=self.log_message
-        )
+        # 配置了 kafka.file_sink 时改为写本地文件，便于在没有Kafka的环境下联调；
+        # kafka.null_sink 为 true 时丢弃所有消息，用于压测
+        file_sink_path = self.config['kafka'].get('file_sink')
+        if self.config['kafka'].get('null_sink'):
+            self.kafka_producer = NullSink(log_callback=self.log_message)
+        elif file_sink_path:
+            self.kafka_producer = FileSink(file_sink_path, log_callback=self.log_message)
+        else:
+            self.kafka_producer = KProducer(
+                bootstrap_servers=self.config['kafka']['bootstrap_servers'],
+                log_callback=self.log_message
+            )
         # 在UI准备好之后再连接Kafka
         self.kafka_producer.connect()
 
@@ -214,38 +283,92 @@ class MainWindow(QWidget):
             self.log_message(f"加载样式时出错: {e}")
 
     def load_config(self):
-        """从 config.json 加载配置。如果失败则返回默认配置。"""
+        """从 config.json 加载并校验配置，同时构建查找索引。如果失败则返回默认配置。"""
         try:
-            with open('config.json', 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
-                print("配置文件 'config.json' 加载成功。")
-                return config_data
+            config_data, self.config_index = load_config(DEFAULT_CONFIG_PATH)
+            print("配置文件 'config.json' 加载成功。")
+            return config_data
         except FileNotFoundError:
             print("错误: 配置文件 'config.json' 未找到。将使用默认设置。")
         except json.JSONDecodeError:
             print("错误: 配置文件 'config.json' 格式无效。将使用默认设置。")
+        except ConfigError as e:
+            print(f"错误: 配置文件 'config.json' 校验失败: {e} 将使用默认设置。")
 
         # 返回一个安全的默认值
-        return {
-            "kafka": {
-                "bootstrap_servers": "localhost:9092",
-                "topic": "fusion_target_topic",
-                "ais_static_topic": "ais_static_topic"
-            },
-            "starrocks": {
-                "host": "localhost", "port": 9030, "user": "root", "password": "", "database": "ods"
-            },
-            "ui_options": {
-                "eTargetType": {"OTHERS": 14}, "shiptype": {"其他": 99},
-                "sost": {"正常": 1}, "dataStatus": {"new": 0, "update": 1, "delete": 2},
-                "province": {"未选择": 0}
-            },
-            "random_generation": {
-                "id": {"prefix": "11", "length": 20},
-                "mmsi": {"prefix": "", "length": 9},
-                "bds": {"prefix": "", "length": 9}
-            }
-        }
+        config_data, self.config_index = default_config()
+        return config_data
+
+    def _watch_config_file(self):
+        """监听 config.json，文件变化后自动重新加载（去抖 300ms，编辑器保存时可能触发多次）"""
+        self.config_watcher = ConfigWatcher(DEFAULT_CONFIG_PATH)
+        self.config_file_watcher = QFileSystemWatcher(self)
+        if os.path.exists(DEFAULT_CONFIG_PATH):
+            self.config_file_watcher.addPath(DEFAULT_CONFIG_PATH)
+        self.config_reload_timer = QTimer(self)
+        self.config_reload_timer.setSingleShot(True)
+        self.config_reload_timer.timeout.connect(self.reload_config_if_changed)
+        self.config_file_watcher.fileChanged.connect(lambda path: self.config_reload_timer.start(300))
+
+    def reload_config_if_changed(self):
+        """
+        热加载配置：更新配置字典和查找索引，下拉框等已创建的控件保持不变。
+        新配置无效时保留原有配置。
+        """
+        # 部分编辑器以“删除+重命名”的方式保存，需要重新加入监听
+        if DEFAULT_CONFIG_PATH not in self.config_file_watcher.files() and os.path.exists(DEFAULT_CONFIG_PATH):
+            self.config_file_watcher.addPath(DEFAULT_CONFIG_PATH)
+        try:
+            reloaded = self.config_watcher.reload_if_changed()
+        except (json.JSONDecodeError, ConfigError) as e:
+            self.log_message(f"错误: config.json 已修改但无效，继续使用原配置: {e}")
+            return
+        if reloaded is None:
+            return
+        self.config, self.config_index = reloaded
+        self._invalidate_realtime_template()
+        self._apply_profiling_config()
+        self.log_message("config.json 已重新加载。")
+
+    def _apply_profiling_config(self):
+        """按 config.json 的 profiling.enabled 开关性能剖析（python profiler.py on/off 通过热加载生效）。"""
+        profiling = self.config.get('profiling', {})
+        enabled = bool(profiling.get('enabled', False))
+        if enabled == profiler.enabled:
+            return
+        self.profiling_checkbox.setChecked(enabled)
+        if not enabled and len(profiler):
+            # 由配置关闭时没有机会手动导出，直接写到配置的路径
+            self._write_profiling_trace(profiling.get('trace_path', DEFAULT_TRACE_PATH))
+
+    def toggle_profiling(self, checked):
+        profiling = self.config.get('profiling', {})
+        if checked:
+            profiler.clear()
+            profiler.enable(profiling.get('capacity'))
+            self.log_message(f"性能剖析已打开，最多保留 {profiler.capacity} 条阶段记录。")
+            return
+        profiler.disable()
+        self.log_message(f"性能剖析已关闭，共记录 {len(profiler)} 条阶段记录。")
+
+    def export_profiling_trace(self):
+        if not len(profiler):
+            self.log_message("信息: 没有性能剖析记录可导出。")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出Trace",
+                                              self.config.get('profiling', {}).get('trace_path', DEFAULT_TRACE_PATH),
+                                              "Chrome Trace (*.json)")
+        if path:
+            self._write_profiling_trace(path)
+
+    def _write_profiling_trace(self, path):
+        try:
+            count = profiler.dump_chrome_trace(path)
+        except OSError as e:
+            self.log_message(f"错误: 写入Trace失败: {e}")
+            return
+        self.log_message(f"已导出 {count} 条阶段记录到 {path}（可在 chrome://tracing 或 Perfetto 中打开）。\n"
+                         + format_summary(profiler.summary(), limit=8))
 
     def init_ui(self):
         """
@@ -304,9 +427,12 @@ class MainWindow(QWidget):
         left_v_layout.addWidget(self.create_target_info_group())
         # 创建并添加信息源模块
         left_v_layout.addWidget(self.create_source_input_group())
+        self._connect_template_invalidation()
         # 创建并添加目标关联模块
         left_v_layout.addWidget(self.create_association_group())
-        left_v_layout.addStretch(1)
+        self._connect_simulation_inputs()
+        # 多目标表
+        left_v_layout.addWidget(self.create_multi_target_group(), stretch=1)
 
         # --- 添加初始化按钮 ---
         init_button_layout = QHBoxLayout()
@@ -322,6 +448,8 @@ class MainWindow(QWidget):
         # --- 右侧布局 (包含控制操作和日志) ---
         right_v_layout = QVBoxLayout()
         right_v_layout.addWidget(self.create_control_group())
+        right_v_layout.addWidget(self.create_bds_fleet_group())
+        right_v_layout.addWidget(self.create_scenario_group())
 
         # 将日志区移动到右侧
         self.log_group = QGroupBox("发送日志")
@@ -334,6 +462,18 @@ class MainWindow(QWidget):
         self.log_display.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
         log_layout.addWidget(self.log_display)
+
+        # 性能剖析开关：记录发送各阶段耗时，导出为 Chrome trace
+        profiling_layout = QHBoxLayout()
+        self.profiling_checkbox = QCheckBox("性能剖析")
+        self.profiling_checkbox.toggled.connect(self.toggle_profiling)
+        self.profiling_export_btn = QPushButton("导出Trace")
+        self.profiling_export_btn.clicked.connect(self.export_profiling_trace)
+        profiling_layout.addWidget(self.profiling_checkbox)
+        profiling_layout.addStretch(1)
+        profiling_layout.addWidget(self.profiling_export_btn)
+        log_layout.addLayout(profiling_layout)
+
         self.log_group.setLayout(log_layout)
         self.log_group.toggled.connect(self.log_display.setVisible)
 
@@ -366,6 +506,7 @@ class MainWindow(QWidget):
 
         # 创建并添加AIS静态信息模块
         left_v_layout.addWidget(self.create_ais_static_info_group_static())
+        left_v_layout.addWidget(self.create_fleet_static_group())
         left_v_layout.addStretch(1)
 
         # --- 右侧布局 (包含控制操作和日志) ---
@@ -445,20 +586,27 @@ class MainWindow(QWidget):
         row_control_layout = QHBoxLayout()
         self.show_timestamp_checkbox = QCheckBox("显示时间点")
         self.show_timestamp_checkbox.stateChanged.connect(self.draw_trajectories)
+        # 勾选时预览只查询抽稀后的点，完整轨迹在发送时再查询
+        self.preview_downsample_checkbox = QCheckBox("抽稀预览")
+        self.preview_downsample_checkbox.setChecked(True)
         add_row_btn = QPushButton("添加查询行")
         add_row_btn.clicked.connect(self.add_playback_query_row)
         remove_row_btn = QPushButton("删除选中行")
         remove_row_btn.clicked.connect(self.remove_selected_playback_row)
         save_as_btn = QPushButton("保存")
         save_as_btn.clicked.connect(self.handle_save_as_button)
+        import_pb_btn = QPushButton("导入PB抓包")
+        import_pb_btn.clicked.connect(self.handle_import_pb_capture)
 
         row_control_layout.addStretch()
         # 1. “显示时间勾选框”在“添加查询行”前
         row_control_layout.addWidget(self.show_timestamp_checkbox)
+        row_control_layout.addWidget(self.preview_downsample_checkbox)
         row_control_layout.addWidget(add_row_btn)
         # 2. “保存”在“删除选中行”后
         row_control_layout.addWidget(remove_row_btn)
         row_control_layout.addWidget(save_as_btn)
+        row_control_layout.addWidget(import_pb_btn)
         table_layout.addLayout(row_control_layout)
 
         table_group.setLayout(table_layout)
@@ -538,6 +686,34 @@ class MainWindow(QWidget):
         button_layout.addWidget(self.playback_stop_send_btn)
         sending_layout.addLayout(button_layout, 4, 0, 1, 2)
 
+        self.playback_prep_progress = QProgressBar()
+        self.playback_prep_progress.setFormat("准备中 %p%")
+        self.playback_prep_progress.setVisible(False)
+        sending_layout.addWidget(self.playback_prep_progress, 5, 0, 1, 2)
+
+        # 暂停/继续、循环发送与按原始时间跳转
+        self.playback_pause_btn = QPushButton("暂停")
+        self.playback_pause_btn.setEnabled(False)
+        self.playback_pause_btn.clicked.connect(self.handle_playback_pause_resume)
+        self.playback_loop_checkbox = QCheckBox("循环发送")
+        self.playback_loop_checkbox.toggled.connect(self.handle_playback_loop_toggled)
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(self.playback_pause_btn)
+        control_layout.addWidget(self.playback_loop_checkbox)
+        sending_layout.addLayout(control_layout, 6, 0, 1, 2)
+
+        self.playback_seek_edit = QDateTimeEdit()
+        self.playback_seek_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.playback_seek_edit.setEnabled(False)
+        self.playback_seek_btn = QPushButton("跳转")
+        self.playback_seek_btn.setEnabled(False)
+        self.playback_seek_btn.clicked.connect(self.handle_playback_seek)
+        seek_layout = QHBoxLayout()
+        seek_layout.addWidget(self.playback_seek_edit)
+        seek_layout.addWidget(self.playback_seek_btn)
+        sending_layout.addWidget(QLabel("跳转到:"), 7, 0, Qt.AlignRight)
+        sending_layout.addLayout(seek_layout, 7, 1)
+
         sending_group.setLayout(sending_layout)
 
         right_panel_layout = QVBoxLayout()
@@ -601,6 +777,140 @@ class MainWindow(QWidget):
         output_group.setLayout(output_layout)
         main_layout.addWidget(output_group, 2) # 占据2/3空间
 
+        main_layout.addWidget(self.create_tap_group(), 2)
+
+    def create_tap_group(self):
+        """创建“实时监听”模块：后台消费Topic并按目标显示最新状态"""
+        group_box = QGroupBox("实时监听")
+        v_layout = QVBoxLayout()
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("数据源:"))
+        self.tap_source_combo = QComboBox()
+        self.tap_source_combo.addItem("Kafka", "kafka")
+        self.tap_source_combo.addItem("本地文件", "file")
+        control_layout.addWidget(self.tap_source_combo)
+        self.tap_file_input = QLineEdit(self.config['kafka'].get('file_sink', ''))
+        self.tap_file_input.setPlaceholderText("本地文件路径 (FileSink 输出)")
+        control_layout.addWidget(self.tap_file_input, 1)
+        control_layout.addWidget(QLabel("刷新间隔(秒):"))
+        self.tap_refresh_input = QLineEdit("1")
+        self.tap_refresh_input.setFixedWidth(40)
+        control_layout.addWidget(self.tap_refresh_input)
+        self.tap_start_btn = QPushButton("开始监听")
+        self.tap_start_btn.clicked.connect(self.start_topic_tap)
+        self.tap_stop_btn = QPushButton("停止监听")
+        self.tap_stop_btn.clicked.connect(self.stop_topic_tap)
+        self.tap_stop_btn.setEnabled(False)
+        control_layout.addWidget(self.tap_start_btn)
+        control_layout.addWidget(self.tap_stop_btn)
+        v_layout.addLayout(control_layout)
+
+        self.tap_stats_label = QLabel("未监听")
+        v_layout.addWidget(self.tap_stats_label)
+
+        self.tap_table = QTableWidget()
+        self.tap_table.setColumnCount(11)
+        self.tap_table.setHorizontalHeaderLabels([
+            "Topic", "目标ID", "MMSI", "船名", "目标类型", "经度", "纬度",
+            "航速", "航向", "延迟(ms)", "更新次数"
+        ])
+        self.tap_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tap_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        v_layout.addWidget(self.tap_table)
+
+        group_box.setLayout(v_layout)
+        return group_box
+
+    def start_topic_tap(self):
+        """启动后台监听线程"""
+        if self.topic_tap and self.topic_tap.is_alive():
+            return
+
+        kafka_config = self.config['kafka']
+        topics = [kafka_config.get('topic'), kafka_config.get('ais_static_topic'), kafka_config.get('bds_topic')]
+        if self.tap_source_combo.currentData() == "file":
+            file_path = self.tap_file_input.text().strip()
+            if not file_path:
+                self._log_tap_message("错误: 请填写监听的本地文件路径。")
+                return
+            source = FileRecordSource(file_path, topics)
+        else:
+            source = KafkaRecordSource(kafka_config['bootstrap_servers'], topics)
+
+        try:
+            refresh_ms = int(float(self.tap_refresh_input.text()) * 1000)
+            if refresh_ms <= 0: raise ValueError
+        except (ValueError, TypeError):
+            refresh_ms = 1000
+            self.tap_refresh_input.setText("1")
+
+        self.topic_tap = TopicTap(source, kafka_config.get('topic'),
+                                  kafka_config.get('ais_static_topic'), kafka_config.get('bds_topic'))
+        self.topic_tap.start()
+        self.tap_refresh_timer.start(refresh_ms)
+        self.tap_start_btn.setEnabled(False)
+        self.tap_stop_btn.setEnabled(True)
+        self.tap_source_combo.setEnabled(False)
+        self._log_tap_message(f"已开始监听 ({self.tap_source_combo.currentText()})。")
+
+    def _log_tap_message(self, message):
+        """实时监听的启停和错误信息写入“解析PB”页签的输出区，该页签不使用主日志区。"""
+        timestamp = time.strftime("%H:%M:%S", time.localtime())
+        self.pb_output_text.append(f"[{timestamp}] {message}")
+
+    def stop_topic_tap(self):
+        """停止后台监听线程，保留表格中最后一次的结果"""
+        self.tap_refresh_timer.stop()
+        if self.topic_tap:
+            self.refresh_tap_table()
+            self.topic_tap.stop()
+            self.topic_tap.join(timeout=2)
+            self.topic_tap = None
+        self.tap_start_btn.setEnabled(True)
+        self.tap_stop_btn.setEnabled(False)
+        self.tap_source_combo.setEnabled(True)
+        self._log_tap_message("已停止监听。")
+
+    def refresh_tap_table(self):
+        """按刷新间隔把监听线程的快照写入表格（限频，避免高流量时阻塞UI）"""
+        if not self.topic_tap:
+            return
+        rows, stats = self.topic_tap.snapshot()
+
+        if stats["error"]:
+            self._log_tap_message(f"错误: {stats['error']}")
+            self.stop_topic_tap()
+            return
+
+        def fmt_latency(value):
+            return "-" if value is None else str(value)
+
+        counts = ", ".join(f"{topic}: {count}" for topic, count in stats["topic_counts"].items()) or "无"
+        self.tap_stats_label.setText(
+            f"目标数: {stats['targets']}  消息速率: {stats['rate']:.1f} 条/秒  解析失败: {stats['decode_errors']}  "
+            f"延迟 P50/P95/最大: {fmt_latency(stats['latency_p50'])}/{fmt_latency(stats['latency_p95'])}/"
+            f"{fmt_latency(stats['latency_max'])} ms  [{counts}]"
+        )
+
+        self.tap_table.setUpdatesEnabled(False)
+        self.tap_table.setRowCount(len(rows))
+        for i, r in enumerate(rows):
+            target_type = r["eTargetType"]
+            if target_type is not None:
+                try:
+                    target_type = target_pb2.TargetType.Name(target_type)
+                except ValueError:
+                    pass
+            values = [
+                r["topic"], r["id"], r["mmsi"] or "", r["vesselName"], "" if target_type is None else target_type,
+                f"{r['longitude']:.6f}", f"{r['latitude']:.6f}", f"{r['speed']:.1f}", f"{r['course']:.1f}",
+                fmt_latency(r["latency_ms"]), r["updates"]
+            ]
+            for col, value in enumerate(values):
+                self.tap_table.setItem(i, col, QTableWidgetItem(str(value)))
+        self.tap_table.setUpdatesEnabled(True)
+
     def handle_copy_pb_result(self):
         """复制PB解析结果到剪贴板"""
         clipboard = QApplication.clipboard()
@@ -1073,7 +1383,653 @@ class MainWindow(QWidget):
         group_box.setLayout(v_layout)
         return group_box
 
-    
+    def create_fleet_static_group(self):
+        """船队静态信息批量广播：加载或生成船队名单，按AIS播发间隔错开发送。"""
+        group_box = QGroupBox("船队批量广播")
+        v_layout = QVBoxLayout()
+
+        roster_layout = QHBoxLayout()
+        roster_layout.addWidget(QLabel("船队名单:"))
+        self.fleet_roster_label = QLabel("未加载")
+        roster_layout.addWidget(self.fleet_roster_label, 1)
+        load_csv_btn = QPushButton("加载CSV...")
+        load_csv_btn.clicked.connect(self.load_fleet_roster_csv)
+        roster_layout.addWidget(load_csv_btn)
+        v_layout.addLayout(roster_layout)
+
+        generate_layout = QHBoxLayout()
+        generate_layout.addWidget(QLabel("生成数量"))
+        self.fleet_count_input = QLineEdit("1000")
+        self.fleet_count_input.setFixedWidth(70)
+        generate_layout.addWidget(self.fleet_count_input)
+        generate_layout.addWidget(QLabel("起始MMSI"))
+        self.fleet_mmsi_start_input = QLineEdit("412000000")
+        self.fleet_mmsi_start_input.setFixedWidth(90)
+        generate_layout.addWidget(self.fleet_mmsi_start_input)
+        generate_layout.addWidget(QLabel("种子"))
+        self.fleet_seed_input = QLineEdit("0")
+        self.fleet_seed_input.setFixedWidth(50)
+        generate_layout.addWidget(self.fleet_seed_input)
+        generate_btn = QPushButton("生成船队")
+        generate_btn.clicked.connect(self.generate_fleet_roster)
+        generate_layout.addWidget(generate_btn)
+        generate_layout.addStretch()
+        v_layout.addLayout(generate_layout)
+
+        interval_layout = QHBoxLayout()
+        interval_layout.addWidget(QLabel("广播周期（秒）"))
+        self.fleet_interval_input = QLineEdit(str(DEFAULT_INTERVAL_SECONDS))
+        self.fleet_interval_input.setFixedWidth(60)
+        interval_layout.addWidget(self.fleet_interval_input)
+        interval_layout.addWidget(QLabel("每条消息船数"))
+        self.fleet_batch_input = QLineEdit(str(DEFAULT_BATCH_SIZE))
+        self.fleet_batch_input.setFixedWidth(60)
+        interval_layout.addWidget(self.fleet_batch_input)
+        interval_layout.addStretch()
+        v_layout.addLayout(interval_layout)
+
+        button_layout = QHBoxLayout()
+        self.fleet_start_btn = QPushButton("开始广播")
+        self.fleet_start_btn.clicked.connect(self.start_fleet_static_broadcast)
+        self.fleet_stop_btn = QPushButton("停止广播")
+        self.fleet_stop_btn.clicked.connect(self.stop_fleet_static_broadcast)
+        self.fleet_stop_btn.setEnabled(False)
+        self.fleet_status_label = QLabel("")
+        button_layout.addWidget(self.fleet_start_btn)
+        button_layout.addWidget(self.fleet_stop_btn)
+        button_layout.addWidget(self.fleet_status_label, 1)
+        v_layout.addLayout(button_layout)
+
+        group_box.setLayout(v_layout)
+        return group_box
+
+    # ===================================================================
+    # 船队批量广播 - 逻辑
+    # ===================================================================
+
+    def _set_fleet_roster(self, records, source):
+        self.fleet_static_records = records
+        self.fleet_roster_label.setText(f"{source}，共 {len(records)} 艘")
+
+    def load_fleet_roster_csv(self):
+        logger = lambda msg: self.log_message(msg, 'static')
+        path, _ = QFileDialog.getOpenFileName(self, "加载船队名单", "", "CSV 文件 (*.csv);;所有文件 (*)")
+        if not path:
+            return
+        try:
+            records, skipped = load_roster_csv(path)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            logger(f"错误: 读取船队名单失败: {e}")
+            return
+        if skipped:
+            preview = ", ".join(str(line) for line in skipped[:10])
+            logger(f"警告: {len(skipped)} 行缺少有效MMSI，已跳过（行号: {preview}{' ...' if len(skipped) > 10 else ''}）。")
+        self._set_fleet_roster(records, os.path.basename(path))
+        logger(f"已加载船队名单 {path}，共 {len(records)} 艘。")
+
+    def generate_fleet_roster(self):
+        logger = lambda msg: self.log_message(msg, 'static')
+        try:
+            count = int(self.fleet_count_input.text())
+            mmsi_start = int(self.fleet_mmsi_start_input.text())
+            seed = int(self.fleet_seed_input.text())
+            if count <= 0:
+                raise ValueError
+        except ValueError:
+            logger("错误: 生成数量、起始MMSI和种子必须是整数，数量大于0。")
+            return
+        ship_types = [item['name_en'] for item in self.config['ui_options']['shiptype']] or ["Other"]
+        records = generate_roster(count, seed=seed, mmsi_start=mmsi_start, ship_types=ship_types)
+        self._set_fleet_roster(records, f"生成(种子 {seed})")
+        logger(f"已生成 {count} 艘船的静态信息，MMSI {mmsi_start} - {mmsi_start + count - 1}。")
+
+    def start_fleet_static_broadcast(self):
+        logger = lambda msg: self.log_message(msg, 'static')
+        static_topic = self.config['kafka'].get('ais_static_topic')
+        if not static_topic:
+            logger("警告: 在 config.json 中未找到 'ais_static_topic'。")
+            return
+        if not self.fleet_static_records:
+            logger("错误: 请先加载或生成船队名单。")
+            return
+        try:
+            interval = float(self.fleet_interval_input.text())
+            batch_size = int(self.fleet_batch_input.text())
+            seed = int(self.fleet_seed_input.text() or 0)
+            self.fleet_static_schedule = StaticBroadcastSchedule(
+                self.fleet_static_records, time.monotonic(), interval, batch_size,
+                max_bytes=DEFAULT_MAX_MESSAGE_BYTES, shuffle_seed=seed)
+        except ValueError as e:
+            logger(f"错误: 广播参数无效: {e}")
+            return
+
+        schedule = self.fleet_static_schedule
+        self.fleet_start_btn.setEnabled(False)
+        self.fleet_stop_btn.setEnabled(True)
+        logger(f"开始广播 {schedule.vessel_count} 艘船的静态信息，周期 {interval:g} 秒，"
+               f"约 {schedule.vessels_per_second:.1f} 艘/秒，每条消息最多 {batch_size} 艘。")
+        self.send_fleet_static_batch()
+        self.fleet_static_timer.start(1000)
+
+    def send_fleet_static_batch(self):
+        """发送到期的船（多船 AisExts 消息），不逐条输出日志。"""
+        schedule = self.fleet_static_schedule
+        if schedule is None:
+            return
+        static_topic = self.config['kafka'].get('ais_static_topic')
+        cycle = schedule.cycle
+        skipped = schedule.skipped
+        for message, vessel_count in schedule.due_messages(time.monotonic()):
+            self.kafka_producer.send_message(static_topic, message)
+        if schedule.skipped != skipped:
+            self.log_message(f"警告: 发送落后超过一个周期，跳过 {schedule.skipped - skipped} 船次。", 'static')
+        if schedule.cycle != cycle:
+            self.log_message(f"第 {cycle + 1} 轮广播完成，累计 {schedule.sent} 船次 / {schedule.messages} 条消息。", 'static')
+        self.fleet_status_label.setText(f"第 {schedule.cycle + 1} 轮，已发送 {schedule.sent} 船次 / {schedule.messages} 条消息"
+                                        + (f"，跳过 {schedule.skipped} 船次" if schedule.skipped else ""))
+
+    def stop_fleet_static_broadcast(self):
+        self.fleet_static_timer.stop()
+        schedule = self.fleet_static_schedule
+        self.fleet_static_schedule = None
+        self.fleet_start_btn.setEnabled(True)
+        self.fleet_stop_btn.setEnabled(False)
+        if schedule is not None:
+            self.log_message(f"船队广播已停止，共发送 {schedule.sent} 船次 / {schedule.messages} 条消息。", 'static')
+
+    def create_bds_fleet_group(self):
+        """BDS船队：以当前经纬度为中心生成多个独立运动的北斗终端，按总速率发送位置。"""
+        group_box = QGroupBox("BDS船队")
+        v_layout = QVBoxLayout()
+
+        class_layout = QHBoxLayout()
+        class_layout.addWidget(QLabel("目标类型"))
+        self.bds_fleet_class_combo = QComboBox()
+        for class_name in BDS_FLEET_CLASSES:
+            if class_name in self.config['ui_options']['eTargetType']:
+                self.bds_fleet_class_combo.addItem(class_name)
+        class_layout.addWidget(self.bds_fleet_class_combo, 1)
+        v_layout.addLayout(class_layout)
+
+        param_layout = QHBoxLayout()
+        param_layout.addWidget(QLabel("终端数"))
+        self.bds_fleet_count_input = QLineEdit("1000")
+        self.bds_fleet_count_input.setFixedWidth(60)
+        param_layout.addWidget(self.bds_fleet_count_input)
+        param_layout.addWidget(QLabel("总速率（条/秒）"))
+        self.bds_fleet_rate_input = QLineEdit(str(DEFAULT_BDS_FLEET_RATE))
+        self.bds_fleet_rate_input.setFixedWidth(50)
+        param_layout.addWidget(self.bds_fleet_rate_input)
+        param_layout.addWidget(QLabel("种子"))
+        self.bds_fleet_seed_input = QLineEdit("0")
+        self.bds_fleet_seed_input.setFixedWidth(40)
+        param_layout.addWidget(self.bds_fleet_seed_input)
+        param_layout.addStretch()
+        v_layout.addLayout(param_layout)
+
+        button_layout = QHBoxLayout()
+        self.bds_fleet_start_btn = QPushButton("开始发送")
+        self.bds_fleet_start_btn.clicked.connect(self.start_bds_fleet)
+        self.bds_fleet_stop_btn = QPushButton("停止")
+        self.bds_fleet_stop_btn.clicked.connect(self.stop_bds_fleet)
+        self.bds_fleet_stop_btn.setEnabled(False)
+        button_layout.addWidget(self.bds_fleet_start_btn)
+        button_layout.addWidget(self.bds_fleet_stop_btn)
+        v_layout.addLayout(button_layout)
+        self.bds_fleet_status_label = QLabel("")
+        self.bds_fleet_status_label.setWordWrap(True)
+        v_layout.addWidget(self.bds_fleet_status_label)
+
+        group_box.setLayout(v_layout)
+        return group_box
+
+    def create_scenario_group(self):
+        """合成场景：发送前把场景文件编译为内存映射缓存（场景未修改时复用），发送时只按帧读取并序列化。"""
+        group_box = QGroupBox("合成场景")
+        v_layout = QVBoxLayout()
+
+        file_layout = QHBoxLayout()
+        self.scenario_path_input = QLineEdit()
+        self.scenario_path_input.setPlaceholderText("场景文件(JSON)")
+        file_layout.addWidget(self.scenario_path_input, 1)
+        browse_btn = QPushButton("选择...")
+        browse_btn.clicked.connect(self.browse_scenario_file)
+        file_layout.addWidget(browse_btn)
+        v_layout.addLayout(file_layout)
+
+        button_layout = QHBoxLayout()
+        self.scenario_loop_checkbox = QCheckBox("循环")
+        button_layout.addWidget(self.scenario_loop_checkbox)
+        button_layout.addStretch()
+        self.scenario_compile_btn = QPushButton("编译")
+        self.scenario_compile_btn.clicked.connect(lambda: self.compile_scenario_file(force=True))
+        self.scenario_start_btn = QPushButton("开始发送")
+        self.scenario_start_btn.clicked.connect(self.start_scenario)
+        self.scenario_stop_btn = QPushButton("停止")
+        self.scenario_stop_btn.clicked.connect(self.stop_scenario)
+        self.scenario_stop_btn.setEnabled(False)
+        button_layout.addWidget(self.scenario_compile_btn)
+        button_layout.addWidget(self.scenario_start_btn)
+        button_layout.addWidget(self.scenario_stop_btn)
+        v_layout.addLayout(button_layout)
+        self.scenario_status_label = QLabel("")
+        self.scenario_status_label.setWordWrap(True)
+        v_layout.addWidget(self.scenario_status_label)
+
+        group_box.setLayout(v_layout)
+        return group_box
+
+    def create_multi_target_group(self):
+        """多目标表：把目标信息区的当前目标加入表格，多个目标同时模拟和发送。"""
+        group_box = QGroupBox("多目标")
+        v_layout = QVBoxLayout()
+
+        self.multi_target_view = QTableView()
+        self.multi_target_view.setModel(self.multi_target_model)
+        self.multi_target_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.multi_target_view.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self.multi_target_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.multi_target_view.setMinimumHeight(150)
+        v_layout.addWidget(self.multi_target_view)
+
+        button_layout = QHBoxLayout()
+        add_btn = QPushButton("加入当前目标")
+        add_btn.setToolTip("以目标信息区的内容新增一行；ID、MMSI、北斗号为空或与表中重复时随机生成。\n"
+                           "发送周期取自“发送频率”，加速度取自“目标关联”的均加速/均减速。")
+        add_btn.clicked.connect(self.add_multi_target)
+        button_layout.addWidget(add_btn)
+        for text, handler in (("开始", self.start_multi_targets), ("暂停", self.pause_multi_targets),
+                              ("终止", self.terminate_multi_targets), ("删除", self.remove_multi_targets)):
+            btn = QPushButton(text)
+            btn.setToolTip("作用于选中的目标，未选择时作用于全部目标")
+            btn.clicked.connect(handler)
+            button_layout.addWidget(btn)
+        self.multi_target_status_label = QLabel("")
+        button_layout.addWidget(self.multi_target_status_label, 1)
+        v_layout.addLayout(button_layout)
+
+        group_box.setLayout(v_layout)
+        return group_box
+
+    # ===================================================================
+    # 多目标表 - 逻辑
+    # ===================================================================
+
+    def _random_config_id(self, field_key):
+        """按 random_generation 规则生成一个随机值（不回写界面）。"""
+        rule = self.config.get('random_generation', {}).get(field_key, {})
+        prefix = rule.get('prefix', '')
+        length = max(rule.get('length', 9), len(prefix) + 1)
+        return int(prefix + ''.join(str(random.randint(1, 9)) for _ in range(length - len(prefix))))
+
+    def _multi_target_fields_from_form(self):
+        """读取目标信息区的不变字段，返回 TargetStore.add 的 static_fields。"""
+        selected_class = self.inputs['eTargetType'].currentText()
+        existing = self.multi_target_store.static
+
+        def unique_value(field_key, used_key):
+            value = self.get_field_value(field_key, int, 0)
+            used = {fields[used_key] for fields in existing}
+            while value == 0 or value in used:
+                value = self._random_config_id(field_key)
+            return value
+
+        is_ais = "AIS" in selected_class
+        is_bds = "BDS" in selected_class
+        sost = self.inputs['sost'].currentData()
+        adapter_id = self.inputs['province'].currentData() or 0
+        return {
+            "class": selected_class,
+            "id": unique_value("id", "id") if selected_class != "BDS" else 0,
+            "sost": sost,
+            "eTargetType": self.config_index.etarget_type.get((selected_class, sost), 0),
+            "adapterId": adapter_id,
+            "mmsi": unique_value("mmsi", "mmsi") if is_ais else 0,
+            "vesselName": self.get_field_value("vesselName") if is_ais else "",
+            "len": self.get_field_value("len", int, 0),
+            "shiptype": 99 if selected_class == "RADAR" else self.inputs['shiptype'].currentData(),
+            "s_class": self.inputs['eTargetType'].currentData(),
+            "is_radar": "RADAR" in selected_class,
+            "sources": {
+                "ais": parse_source_ids(self.inputs["aisSource"].text()),
+                "radar": parse_source_ids(self.inputs["radarSource"].text()),
+                "bds": parse_source_ids(self.inputs["bdSource"].text()),
+            },
+            "terminal": unique_value("bds", "terminal") if is_bds else 0,
+            "shipName": self.get_field_value("shipName") if is_bds else "",
+            "province": self.config_index.province_name_en_by_id.get(adapter_id, "Unknown"),
+            "provider": self.get_field_value("bdSource", int, 0),
+        }
+
+    def add_multi_target(self):
+        if not self.validate_required_fields():
+            return
+        try:
+            interval = float(self.frequency_input.text())
+            accel = 0.0
+            if self.association_options["decelerate"].isChecked():
+                accel = -float(self.decelerate_input.text())
+            elif self.association_options["accelerate"].isChecked():
+                accel = float(self.accelerate_input.text())
+            row = self.multi_target_model.add_target(
+                self._multi_target_fields_from_form(),
+                latitude=float(self.inputs['latitude'].text()), longitude=float(self.inputs['longitude'].text()),
+                speed=float(self.inputs['speed'].text()), course=float(self.inputs['course'].text()),
+                accel=accel, interval=interval)
+        except (ValueError, TypeError) as e:
+            self.log_message(f"错误: 无法加入多目标表，请检查经纬度、航速、航向、发送频率和加速度 - {e}")
+            return
+        fields = self.multi_target_store.static[row]
+        self.log_message(f"已加入多目标表第 {row + 1} 行: {fields['class']} ID {fields['id'] or '-'} "
+                         f"MMSI {fields['mmsi'] or '-'} 北斗号 {fields['terminal'] or '-'}。")
+        self._update_multi_target_status()
+
+    def _selected_multi_target_rows(self):
+        """选中的行，未选择时为全部行。"""
+        rows = sorted(index.row() for index in self.multi_target_view.selectionModel().selectedRows())
+        return rows or list(range(len(self.multi_target_store)))
+
+    def _update_multi_target_status(self):
+        store = self.multi_target_store
+        self.multi_target_status_label.setText(f"共 {len(store)} 个目标，发送中 {store.active_count()} 个")
+
+    def start_multi_targets(self):
+        rows = self._selected_multi_target_rows()
+        if not rows:
+            self.log_message("多目标表为空，请先加入目标。")
+            return
+        started = self.multi_target_store.start(rows, time.monotonic())
+        static_topic = self.config['kafka'].get('ais_static_topic')
+        if started and static_topic:
+            for message in self.multi_target_store.ais_static_messages(started):
+                self.kafka_producer.send_message(static_topic, message)
+        self.log_message(f"多目标开始发送: {len(rows)} 个目标。")
+        self.tick_multi_targets()
+        if not self.multi_target_timer.isActive():
+            self.multi_target_timer.start(100)
+
+    def pause_multi_targets(self):
+        paused = self.multi_target_store.pause(self._selected_multi_target_rows(), time.monotonic())
+        if paused:
+            self.log_message(f"多目标已暂停: {len(paused)} 个目标。")
+        self._refresh_multi_targets()
+
+    def _send_multi_target_deletes(self, rows):
+        messages = self.multi_target_store.terminate(list(rows), time.monotonic(), time.time())
+        for message in messages:
+            self.kafka_producer.send_message(self.config['kafka']['topic'], message)
+        return messages
+
+    def terminate_multi_targets(self):
+        messages = self._send_multi_target_deletes(self._selected_multi_target_rows())
+        self.log_message(f"多目标已终止，发送了 {len(messages)} 条删除消息。")
+        self._refresh_multi_targets()
+
+    def remove_multi_targets(self):
+        rows = self._selected_multi_target_rows()
+        if not rows:
+            return
+        self._send_multi_target_deletes(rows)
+        self.multi_target_model.remove_targets(rows)
+        self.log_message(f"已从多目标表删除 {len(rows)} 个目标。")
+        self._refresh_multi_targets()
+
+    def _refresh_multi_targets(self):
+        self._multi_target_refreshed = time.monotonic()
+        self.multi_target_model.refresh_rows()
+        self._update_multi_target_status()
+
+    @profiled("multi_target.tick")
+    def tick_multi_targets(self):
+        """共用的调度节拍：推进所有运行中的目标，合并发送到期的目标。"""
+        store = self.multi_target_store
+        now = time.monotonic()
+        pb_messages, bds_messages, rows = store.tick(now, time.time())
+        if pb_messages:
+            topic = self.config['kafka']['topic']
+            for message in pb_messages:
+                self.kafka_producer.send_message(topic, message)
+        if bds_messages:
+            bds_topic = self.config['kafka'].get('bds_topic')
+            if bds_topic:
+                for message in bds_messages:
+                    self.kafka_producer.send_message(bds_topic, message)
+        if store.active_count() == 0:
+            self.multi_target_timer.stop()
+            self._refresh_multi_targets()
+        elif now - self._multi_target_refreshed >= MULTI_TARGET_REFRESH_SECONDS:
+            self._refresh_multi_targets()
+
+    # ===================================================================
+    # BDS船队 - 逻辑
+    # ===================================================================
+
+    def start_bds_fleet(self):
+        """省份、北斗信息源、目标状态以及融合目标的信息源取自目标信息区，中心位置取自当前经纬度。"""
+        bds_topic = self.config['kafka'].get('bds_topic')
+        if not bds_topic:
+            self.log_message("警告: 在 config.json 中未找到 'bds_topic'。")
+            return
+        selected_class = self.bds_fleet_class_combo.currentText()
+        try:
+            count = int(self.bds_fleet_count_input.text())
+            rate = float(self.bds_fleet_rate_input.text())
+            seed = int(self.bds_fleet_seed_input.text() or 0)
+        except ValueError:
+            self.log_message("错误: 终端数、总速率和种子必须是数字。")
+            return
+
+        adapter_id = self.inputs['province'].currentData() or 0
+        sost = self.inputs['sost'].currentData()
+        fields = {
+            "province": self.config_index.province_name_en_by_id.get(adapter_id, "Unknown"),
+            "provider": self.get_field_value("bdSource", int, 0),
+            "adapterId": adapter_id,
+            "sost": sost,
+            "eTargetType": self.config_index.etarget_type.get((selected_class, sost), 0),
+            "s_class": self.config['ui_options']['eTargetType'].get(selected_class, 0),
+            "shiptype": self.inputs['shiptype'].currentData(),
+            "sources": {
+                "ais": parse_source_ids(self.inputs["aisSource"].text()),
+                "radar": parse_source_ids(self.inputs["radarSource"].text()),
+                "bds": parse_source_ids(self.inputs["bdSource"].text()),
+            }
+        }
+        center = (self.get_field_value("latitude", float, 0.0), self.get_field_value("longitude", float, 0.0))
+        try:
+            self.bds_fleet = BdsFleet(count, selected_class, center, fields, self.config.get('random_generation'),
+                                      time.monotonic(), rate=rate, seed=seed)
+        except ValueError as e:
+            self.log_message(f"错误: BDS船队参数无效: {e}")
+            return
+
+        fleet = self.bds_fleet
+        self.bds_fleet_start_btn.setEnabled(False)
+        self.bds_fleet_stop_btn.setEnabled(True)
+        extra = "，同时发送融合目标到 unionTargetPb" if fleet.has_protobuf else ""
+        self.log_message(f"BDS船队开始发送: {count} 个终端（{selected_class}），总速率 {rate:g} 条/秒，"
+                         f"每个终端约 {fleet.report_interval:.1f} 秒上报一次{extra}。")
+        self.send_bds_fleet_batch()
+        self.bds_fleet_timer.start(100)
+
+    def send_bds_fleet_batch(self):
+        """发送到期的终端，不逐条输出日志。"""
+        fleet = self.bds_fleet
+        if fleet is None:
+            return
+        bds_topic = self.config['kafka'].get('bds_topic')
+        topic = self.config['kafka']['topic']
+        cycle = fleet.cycle
+        skipped = fleet.skipped
+        with profiler.span("bds_fleet.build"):
+            bds_messages, pb_messages = fleet.due_messages(time.monotonic(), time.time())
+        for message in bds_messages:
+            self.kafka_producer.send_message(bds_topic, message)
+        for message in pb_messages:
+            self.kafka_producer.send_message(topic, message)
+        if fleet.skipped != skipped:
+            self.log_message(f"警告: BDS船队发送落后超过一轮，跳过 {fleet.skipped - skipped} 终端次。")
+        if fleet.cycle != cycle:
+            self.bds_fleet_status_label.setText(
+                f"第 {fleet.cycle} 轮完成，已发送 {fleet.bds_messages} 条BDS / {fleet.pb_messages} 条Protobuf消息")
+
+    def stop_bds_fleet(self):
+        """停止发送，组合类型为已上报的融合目标发送删除消息。"""
+        self.bds_fleet_timer.stop()
+        fleet = self.bds_fleet
+        self.bds_fleet = None
+        self.bds_fleet_start_btn.setEnabled(True)
+        self.bds_fleet_stop_btn.setEnabled(False)
+        if fleet is None:
+            return
+        delete_messages = fleet.delete_messages(time.time())
+        for message in delete_messages:
+            self.kafka_producer.send_message(self.config['kafka']['topic'], message)
+        self.log_message(f"BDS船队已停止，共发送 {fleet.bds_messages} 条BDS / {fleet.pb_messages} 条Protobuf消息"
+                         + (f"，已发送 {len(delete_messages)} 条删除消息。" if delete_messages else "。"))
+
+    # ===================================================================
+    # 合成场景 - 逻辑
+    # ===================================================================
+
+    def browse_scenario_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "选择场景文件", "", "JSON 文件 (*.json);;所有文件 (*)")
+        if path:
+            self.scenario_path_input.setText(path)
+
+    def compile_scenario_file(self, force=False, start_after=False):
+        """
+        在后台线程中把场景文件编译到同名的 .scenario 目录，场景未修改且 force 为 False 时直接复用已有缓存。
+        编译期间禁用编译和开始按钮，停止按钮可取消编译。
+        :param start_after: 编译完成后开始发送
+        """
+        if self.scenario_compile_worker is not None:
+            return
+        spec_path = self.scenario_path_input.text().strip()
+        if not spec_path:
+            self.log_message("错误: 请先选择场景文件。")
+            return
+        worker = ScenarioCompileWorker(spec_path, default_cache_dir(spec_path), force, self)
+        worker.progress.connect(self._on_scenario_compile_progress)
+        worker.compiled.connect(self._on_scenario_compiled)
+        worker.failed.connect(self._on_scenario_compile_failed)
+        worker.finished.connect(worker.deleteLater)
+        self.scenario_compile_worker = worker
+        self._scenario_start_after_compile = start_after
+        self._scenario_compile_started = time.perf_counter()
+
+        self.scenario_compile_btn.setEnabled(False)
+        self.scenario_start_btn.setEnabled(False)
+        self.scenario_stop_btn.setEnabled(True)
+        self.scenario_status_label.setText("编译中...")
+        worker.start()
+
+    def _on_scenario_compile_progress(self, done, total):
+        if self.sender() is self.scenario_compile_worker:
+            self.scenario_status_label.setText(f"编译中: {done}/{total} 个目标")
+
+    def _on_scenario_compile_failed(self, message):
+        if self.sender() is not self.scenario_compile_worker:
+            return
+        self.scenario_compile_worker = None
+        self.log_message(f"错误: 编译场景失败: {message}")
+        self.scenario_status_label.setText("")
+        self.stop_scenario()
+
+    def _on_scenario_compiled(self, cache_dir, recompiled):
+        if self.sender() is not self.scenario_compile_worker:
+            return  # 已被取消
+        self.scenario_compile_worker = None
+        if recompiled:
+            self.log_message(f"场景编译完成，耗时 {time.perf_counter() - self._scenario_compile_started:.1f}s，"
+                             f"缓存目录 {cache_dir}")
+        self.scenario_status_label.setText(f"缓存: {cache_dir}")
+        if self._scenario_start_after_compile:
+            self._start_scenario_from_cache(cache_dir)
+        else:
+            self.stop_scenario()
+
+    def start_scenario(self):
+        """先编译（场景未修改时复用缓存），完成后开始发送。"""
+        self.compile_scenario_file(start_after=True)
+
+    def _start_scenario_from_cache(self, cache_dir):
+        """场景未指定的省份、目标状态、目标类型、信息源等静态字段取自目标信息区。"""
+        selected_class = self.inputs['eTargetType'].currentText()
+        sost = self.inputs['sost'].currentData()
+        sources = {
+            "ais": parse_source_ids(self.inputs["aisSource"].text()),
+            "radar": parse_source_ids(self.inputs["radarSource"].text()),
+            "bds": parse_source_ids(self.inputs["bdSource"].text()),
+        }
+        defaults = {
+            "adapterId": self.inputs['province'].currentData() or 0,
+            "sost": sost,
+            "eTargetType": self.config_index.etarget_type.get((selected_class, sost), 0),
+            "s_class": self.config['ui_options']['eTargetType'].get(selected_class, 0),
+            "shiptype": self.inputs['shiptype'].currentData(),
+            "is_radar": "RADAR" in selected_class,
+            "sources": {key: ids for key, ids in sources.items() if key.upper() in selected_class},
+        }
+        try:
+            cache = ScenarioCache(cache_dir, defaults)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.log_message(f"错误: 打开场景缓存失败: {e}")
+            self.stop_scenario()
+            return
+
+        self.scenario_player = ScenarioPlayer(cache, time.monotonic(), time.time(),
+                                              loop=self.scenario_loop_checkbox.isChecked())
+        self.scenario_start_btn.setEnabled(False)
+        self.scenario_compile_btn.setEnabled(False)
+        self.scenario_stop_btn.setEnabled(True)
+        self.log_message(f"场景开始发送: {cache.target_count} 个目标，{cache.frame_count} 帧，"
+                         f"间隔 {cache.interval:g} 秒。")
+        self.send_scenario_frame()
+        self.scenario_timer.start(100)
+
+    def send_scenario_frame(self):
+        """发送到期的一帧，不逐条输出日志。"""
+        player = self.scenario_player
+        if player is None:
+            return
+        topic = self.config['kafka']['topic']
+        skipped = player.skipped
+        with profiler.span("scenario.frame"):
+            messages = player.due_messages(time.monotonic())
+        for message in messages:
+            self.kafka_producer.send_message(topic, message)
+        if player.skipped != skipped:
+            self.log_message(f"警告: 场景发送落后，跳过 {player.skipped - skipped} 帧。")
+        if messages:
+            cycle, frame = divmod(player.sent - 1, player.cache.frame_count)
+            self.scenario_status_label.setText(
+                f"第 {cycle + 1} 轮 {frame + 1}/{player.cache.frame_count} 帧，"
+                f"已发送 {player.messages} 条消息")
+        if player.finished:
+            self.stop_scenario()
+
+    def stop_scenario(self):
+        """取消正在进行的编译或停止发送，并在最近发送的位置为全部目标发送删除消息。"""
+        self.scenario_timer.stop()
+        if self.scenario_compile_worker is not None:
+            # 等待当前分块写完，避免随后的编译与它同时写同一个缓存目录
+            self.scenario_compile_worker.cancel()
+            self.scenario_compile_worker.wait()
+            self.scenario_compile_worker = None
+            self.scenario_status_label.setText("")
+        player = self.scenario_player
+        self.scenario_player = None
+        self.scenario_start_btn.setEnabled(True)
+        self.scenario_compile_btn.setEnabled(True)
+        self.scenario_stop_btn.setEnabled(False)
+        if player is None:
+            return
+        delete_messages = player.delete_messages(time.time())
+        for message in delete_messages:
+            self.kafka_producer.send_message(self.config['kafka']['topic'], message)
+        self.log_message(f"场景已停止，共发送 {player.messages} 条消息"
+                         + (f"，已发送 {len(delete_messages)} 条删除消息。" if delete_messages else "。"))
 
     # ===================================================================
     # 通用及实时目标 - 逻辑
@@ -1129,10 +2085,14 @@ class MainWindow(QWidget):
 
     def update_course_from_button(self, angle, inputs_dict):
         inputs_dict["course"].setText(str(angle))
+        if inputs_dict is self.inputs:
+            self._on_motion_field_edited("course", str(angle))
 
     @pyqtSlot()
     def recognize_and_fill(self):
         self._recognize_and_fill_generic(self.paste_input, self.inputs, self.log_message)
+        for field_name in ("speed", "course"):
+            self._on_motion_field_edited(field_name, self.inputs[field_name].text())
 
     @pyqtSlot()
     def clear_inputs(self):
@@ -1154,7 +2114,7 @@ class MainWindow(QWidget):
         self.update_association_timer_display()
 
         self.association_state = "stopped"
-        self.location_calculator = None
+        self.simulation = None
         self.is_first_send = True
         self.start_pause_btn.setText("开始发送")
         self.terminate_btn.setEnabled(False)
@@ -1189,20 +2149,76 @@ class MainWindow(QWidget):
         if lock_course:
             self.inputs["course"].setEnabled(enabled)
 
-    def _initialize_location_calculator(self):
-        """从UI读取参数并初始化位置计算器"""
+    def _association_accel(self):
+        """目标关联的航速变化率（节/分），均减速为负数。"""
+        if self.association_options["decelerate"].isChecked():
+            return -float(self.decelerate_input.text())
+        if self.association_options["accelerate"].isChecked():
+            return float(self.accelerate_input.text())
+        return 0.0
+
+    def _initialize_simulation(self):
+        """从UI读取参数并初始化运动状态"""
         try:
-            start_lat = float(self.inputs['latitude'].text())
-            start_lon = float(self.inputs['longitude'].text())
-            speed = float(self.inputs['speed'].text())
-            course = float(self.inputs['course'].text())
-            self.location_calculator = LocationCalculator(start_lat, start_lon, speed, course)
-            self.log_message("位置计算器已初始化。")
+            self.simulation = SimulationModel(
+                float(self.inputs['latitude'].text()), float(self.inputs['longitude'].text()),
+                float(self.inputs['speed'].text()), float(self.inputs['course'].text()),
+                accel=self._association_accel())
+            self.log_message("运动状态已初始化。")
             return True
         except (ValueError, TypeError):
-            self.log_message("错误: 无法初始化位置计算器。请确保经纬度、速度和航向为有效的数字。")
+            self.log_message("错误: 无法初始化运动状态。请确保经纬度、速度、航向和加/减速度为有效的数字。")
             return False
 
+    def _connect_simulation_inputs(self):
+        """用户修改航速、航向、位置或关联方式时同步到运动状态（程序回填不触发 textEdited）。"""
+        for field_name in ("speed", "course", "latitude", "longitude"):
+            self.inputs[field_name].textEdited.connect(
+                lambda text, name=field_name: self._on_motion_field_edited(name, text))
+        self.motion_button_group.buttonToggled.connect(self._on_association_accel_changed)
+        self.decelerate_input.textEdited.connect(self._on_association_accel_changed)
+        self.accelerate_input.textEdited.connect(self._on_association_accel_changed)
+
+    def _on_motion_field_edited(self, field_name, text):
+        simulation = self.simulation
+        if simulation is None:
+            return
+        # 发送中位置由运动状态推算，界面上的修改会被下一次刷新覆盖（与原先的行为一致）
+        if field_name in ("latitude", "longitude") and simulation.running:
+            return
+        try:
+            simulation.set_params(**{field_name: float(text)})
+        except ValueError:
+            pass
+
+    def _on_association_accel_changed(self, *args):
+        if self.simulation is None:
+            return
+        try:
+            self.simulation.set_params(accel=self._association_accel())
+        except ValueError:
+            pass
+
+    def _refresh_simulation_display(self):
+        """显示运动状态在当前时刻的值。正在编辑的输入框不回填。"""
+        latitude, longitude, speed = self.simulation.state_at()
+        for field_name, text in (("speed", f"{speed:.2f}"),
+                                 ("latitude", f"{latitude:.8f}"),
+                                 ("longitude", f"{longitude:.8f}")):
+            widget = self.inputs[field_name]
+            if not widget.hasFocus():
+                widget.setText(text)
+
+    def _current_motion(self, now):
+        """
+        :param now: 消息时间 time.time()（秒）
+        :return: (经度, 纬度, 航速, 航向)。有运动状态时按 now 解析计算，否则读界面。
+        """
+        if self.simulation is not None:
+            return self.simulation.snapshot(now)
+        return (self.get_field_value("longitude", float, 0.0), self.get_field_value("latitude", float, 0.0),
+                self.get_field_value("speed", float, 0.0), self.get_field_value("course", float, 0.0))
+
     def toggle_sending_state(self):
         """主状态机，处理“开始/暂停/继续”按钮的点击事件"""
         if not self.validate_required_fields():
@@ -1216,8 +2232,10 @@ class MainWindow(QWidget):
     def handle_simple_sending(self):
         """处理不保持运动趋势的发送逻辑（但仍然实时回填）"""
         if self.association_state != "sending":
-            if not self._initialize_location_calculator():
-                return
+            # 暂停后继续时沿用运动状态（暂停期间界面上的修改已同步），位置不变
+            if not (self.association_state == "paused" and self.simulation is not None):
+                if not self._initialize_simulation():
+                    return
             
             self.send_one_time_static_info()
 
@@ -1228,8 +2246,9 @@ class MainWindow(QWidget):
                 self.log_message("错误: 发送频率必须是一个大于0的数字。")
                 return
 
+            self.simulation.start()
             self.send_realtime_target_data()
-            self.simulation_timer.start(1000) # 实时回填
+            self.simulation_timer.start(SIMULATION_DISPLAY_INTERVAL_MS) # 实时回填
             self.sending_timer.start(interval_ms)
             self.log_message(f"发送已开始，频率: {interval_ms/1000}s/次 (实时回填中)。")
             self.start_pause_btn.setText("暂停发送")
@@ -1238,6 +2257,8 @@ class MainWindow(QWidget):
         else:
             self.sending_timer.stop()
             self.simulation_timer.stop() # 暂停时停止回填
+            self.simulation.pause()
+            self._refresh_simulation_display()
             self.log_message("发送已暂停，数据已停止回填。")
             self.start_pause_btn.setText("继续发送")
             self.association_state = "paused"
@@ -1247,11 +2268,12 @@ class MainWindow(QWidget):
         state = self.association_state
 
         if state == "stopped":
-            if not self._initialize_location_calculator():
+            if not self._initialize_simulation():
                 return
             self.send_one_time_static_info()
+            self.simulation.start()
             self.send_realtime_target_data()
-            self.simulation_timer.start(1000)
+            self.simulation_timer.start(SIMULATION_DISPLAY_INTERVAL_MS)
             self.sending_timer.start(int(float(self.frequency_input.text()) * 1000))
             self.association_state = "sending"
             self.start_pause_btn.setText("暂停发送")
@@ -1261,6 +2283,8 @@ class MainWindow(QWidget):
         elif state == "sending":
             self.sending_timer.stop()
             self.simulation_timer.stop()
+            self.simulation.pause()
+            self._refresh_simulation_display()
             self.association_timer.start(1000)
             self.association_state = "paused"
             self.start_pause_btn.setText("继续发送")
@@ -1270,57 +2294,17 @@ class MainWindow(QWidget):
             self.association_timer.stop()
             self.log_message(f"暂停了 {self.association_seconds} 秒。")
 
-            try:
-                # 1. 立即从UI读取当前所有相关值
-                start_lat = float(self.inputs['latitude'].text())
-                start_lon = float(self.inputs['longitude'].text())
-                current_speed = float(self.inputs['speed'].text())
-                current_course = float(self.inputs['course'].text())
-                duration_sec = self.association_seconds
-
-                # 2. 使用当前UI值重新创建一个新的计算器实例，以确保起点正确
-                self.location_calculator = LocationCalculator(start_lat, start_lon, current_speed, current_course)
-
-                # 3. 计算新的最终航速
-                new_speed = current_speed
-                if self.association_options["decelerate"].isChecked():
-                    rate_per_min = float(self.decelerate_input.text())
-                    rate_per_sec = rate_per_min / 60.0
-                    new_speed -= rate_per_sec * duration_sec
-                    new_speed = max(0, new_speed)
-                elif self.association_options["accelerate"].isChecked():
-                    rate_per_min = float(self.accelerate_input.text())
-                    rate_per_sec = rate_per_min / 60.0
-                    new_speed += rate_per_sec * duration_sec
-
-                # 4. 使用平均速度计算位移
-                avg_speed = (current_speed + new_speed) / 2.0
-                self.location_calculator.update_params(speed_knots=avg_speed)
-                new_lat, new_lon = self.location_calculator.calculate_next_point(duration_sec)
-
-                # 5. 重要: 将计算器的速度更新为最终速度，以供后续模拟使用
-                self.location_calculator.update_params(speed_knots=new_speed)
-
-                # 6. 将计算出的最终航速和新位置回填到UI
-                self.inputs['speed'].setText(f"{new_speed:.2f}")
-                self.inputs['latitude'].setText(f"{new_lat:.8f}")
-                self.inputs['longitude'].setText(f"{new_lon:.8f}")
-                self.log_message(f"航速更新至 {new_speed:.2f} 节。位置更新至: {new_lat:.6f}, {new_lon:.6f}")
-
-            except (ValueError, TypeError) as e:
-                self.log_message(f"错误: 恢复发送时更新状态失败 - {e}")
-                # 即使计算失败，也要尝试恢复计时器以避免卡住
-                self.association_state = "sending"
-                self.start_pause_btn.setText("暂停发送")
-                self.simulation_timer.start(1000)
-                self.sending_timer.start(int(float(self.frequency_input.text()) * 1000))
-                return
+            # 暂停期间保持运动趋势：按暂停时长推进（航向、航速取暂停期间最后一次修改的值）
+            simulation = self.simulation
+            simulation.advance(self.association_seconds)
+            simulation.start()
+            self._refresh_simulation_display()
+            self.log_message(f"航速更新至 {simulation.speed:.2f} 节。位置更新至: "
+                             f"{simulation.latitude:.6f}, {simulation.longitude:.6f}")
 
-            # 7. 使用回填后的新数据发送消息
+            # 使用更新后的数据发送消息，然后恢复正常模拟和发送
             self.send_realtime_target_data()
-
-            # 8. 恢复正常模拟和发送
-            self.simulation_timer.start(1000)
+            self.simulation_timer.start(SIMULATION_DISPLAY_INTERVAL_MS)
             self.sending_timer.start(int(float(self.frequency_input.text()) * 1000))
             self.association_seconds = 0
             self.update_association_timer_display()
@@ -1332,48 +2316,17 @@ class MainWindow(QWidget):
             self.association_timer.stop()
             self.log_message(f"终止后等待了 {self.association_seconds} 秒。")
 
-            try:
-                # 1. 从UI读取当前值，包括可能已修改的航向
-                start_lat = float(self.inputs['latitude'].text())
-                start_lon = float(self.inputs['longitude'].text())
-                current_speed = float(self.inputs['speed'].text())
-                current_course = float(self.inputs['course'].text()) # 读取最新的航向
-                duration_sec = self.association_seconds
-
-                # 2. 使用这些值重新创建计算器
-                self.location_calculator = LocationCalculator(start_lat, start_lon, current_speed, current_course)
-
-                # 3. 计算新航速
-                new_speed = current_speed
-                if self.association_options["decelerate"].isChecked():
-                    rate_per_min = float(self.decelerate_input.text())
-                    rate_per_sec = rate_per_min / 60.0
-                    new_speed -= rate_per_sec * duration_sec
-                    new_speed = max(0, new_speed)
-                elif self.association_options["accelerate"].isChecked():
-                    rate_per_min = float(self.accelerate_input.text())
-                    rate_per_sec = rate_per_min / 60.0
-                    new_speed += rate_per_sec * duration_sec
-
-                # 4. 计算新位置
-                avg_speed = (current_speed + new_speed) / 2.0
-                self.location_calculator.update_params(speed_knots=avg_speed)
-                new_lat, new_lon = self.location_calculator.calculate_next_point(duration_sec)
-                self.location_calculator.update_params(speed_knots=new_speed)
-
-                # 5. 回填UI
-                self.inputs['speed'].setText(f"{new_speed:.2f}")
-                self.inputs['latitude'].setText(f"{new_lat:.8f}")
-                self.inputs['longitude'].setText(f"{new_lon:.8f}")
-                self.log_message(f"根据等待时长和当前输入，状态已更新。")
-
-            except (ValueError, TypeError) as e:
-                self.log_message(f"错误: 从关联状态恢复时计算失败 - {e}")
-
-            # 6. 解除所有锁定，恢复正常发送
+            # 按等待时长推进，航向取等待期间修改后的值
+            simulation = self.simulation
+            simulation.advance(self.association_seconds)
+            simulation.start()
+            self._refresh_simulation_display()
+            self.log_message(f"根据等待时长和当前输入，状态已更新。")
+
+            # 解除所有锁定，恢复正常发送
             self.set_motion_fields_enabled(True)
             self.send_realtime_target_data()
-            self.simulation_timer.start(1000)
+            self.simulation_timer.start(SIMULATION_DISPLAY_INTERVAL_MS)
             self.sending_timer.start(int(float(self.frequency_input.text()) * 1000))
             self.association_seconds = 0
             self.update_association_timer_display()
@@ -1388,6 +2341,9 @@ class MainWindow(QWidget):
         self.simulation_timer.stop()
         self.association_timer.stop()
         self.is_first_send = True
+        if self.simulation is not None:
+            self.simulation.pause()
+            self._refresh_simulation_display()
 
         self.log_message("发送终止消息 (delete)...")
         selected_class = self.inputs['eTargetType'].currentText()
@@ -1408,7 +2364,7 @@ class MainWindow(QWidget):
                 return
 
         self.association_state = "stopped"
-        self.location_calculator = None
+        self.simulation = None
         self.association_seconds = 0
         self.update_association_timer_display()
         self.start_pause_btn.setText("开始发送")
@@ -1429,6 +2385,7 @@ class MainWindow(QWidget):
             # Also reset the state if it was in a waiting-for-association state
             if self.association_state == "terminated_associated":
                 self.association_state = "stopped"
+                self.simulation = None
                 self.start_pause_btn.setText("开始发送")
                 self.terminate_btn.setEnabled(False)
                 self.set_motion_fields_enabled(True)
@@ -1446,42 +2403,16 @@ class MainWindow(QWidget):
         self.association_time_label.setText(f"时长: <font color='#3498db'>{self.association_seconds}</font> 秒")
 
     def update_simulation(self):
-        """根据关联模式，实时计算并更新UI上的速度和位置"""
-        if not self.location_calculator:
+        """定时回填：显示运动状态在当前时刻的值，位置计算不依赖回填的频率。"""
+        if self.simulation is None:
             self.simulation_timer.stop()
             return
-
-        try:
-            current_speed = float(self.inputs['speed'].text())
-            current_course = float(self.inputs['course'].text())
-            self.location_calculator.update_params(speed_knots=current_speed, course_degrees=current_course)
-
-            new_speed = current_speed
-            if self.association_options["decelerate"].isChecked():
-                rate_per_min = float(self.decelerate_input.text())
-                rate_per_sec = rate_per_min / 60.0
-                new_speed -= rate_per_sec
-                new_speed = max(0, new_speed)
-            elif self.association_options["accelerate"].isChecked():
-                rate_per_min = float(self.accelerate_input.text())
-                rate_per_sec = rate_per_min / 60.0
-                new_speed += rate_per_sec
-
-            self.location_calculator.update_params(speed_knots=new_speed, course_degrees=current_course)
-
-            new_lat, new_lon = self.location_calculator.calculate_next_point(1.0)
-
-            self.inputs['speed'].setText(f"{new_speed:.2f}")
-            self.inputs['latitude'].setText(f"{new_lat:.8f}")
-            self.inputs['longitude'].setText(f"{new_lon:.8f}")
-
-        except (ValueError, TypeError) as e:
-            self.log_message(f"错误: 模拟计算失败 - {e}")
-            self.simulation_timer.stop()
+        self._refresh_simulation_display()
 
     def toggle_data_status_lock(self, is_checked):
         self._toggle_data_status_lock_generic(is_checked, self.inputs["dataStatus"])
 
+    @profiled("read_widget")
     def get_field_value(self, field_name, value_type=str, default_value=None):
         """安全地从控件获取值并进行类型转换。"""
         if default_value is None:
@@ -1513,12 +2444,11 @@ class MainWindow(QWidget):
                 ais_info = {
                     "MMSI": mmsi, "Vessel Name": self.get_field_value("vesselName")
                 }
-                json_payload = {"AisExts": [ais_info]}
-                json_data = json.dumps(json_payload, ensure_ascii=False, indent=2)
-                self.log_message("构造的单次静态 JSON 消息内容:\n" + json_data)
+                json_data = encode_ais_exts([encode_ais_record(ais_info)])
+                self.log_message("构造的单次静态 JSON 消息内容:\n" + pretty_json({"AisExts": [ais_info]}))
                 static_topic = self.config['kafka'].get('ais_static_topic')
                 if static_topic:
-                    self.kafka_producer.send_message(static_topic, json_data.encode('utf-8'))
+                    self.kafka_producer.send_message(static_topic, json_data)
                     self.log_message(f"已向 Topic '{static_topic}' 发送单次静态 JSON 消息。")
                 else:
                     self.log_message("警告: 在 config.json 中未找到 'ais_static_topic'。")
@@ -1527,6 +2457,7 @@ class MainWindow(QWidget):
         except Exception as e:
             self.log_message(f"发送单次静态信息过程中发生错误: {e}")
 
+    @profiled("send_realtime_target_data")
     def send_realtime_target_data(self):
         """
         核心调度函数：读取UI上的当前值，并根据目标类型调用相应的发送函数。
@@ -1550,47 +2481,38 @@ class MainWindow(QWidget):
         except Exception as e:
             self.log_message(f"发送过程中发生严重错误: {e}")
 
-    def _send_protobuf_data(self, selected_class, override_status=None):
-        """构建并发送Protobuf消息到unionTargetPb。"""
-        target_list = target_pb2.TargetProtoList()
-        target = target_list.list.add()
+    def _invalidate_realtime_template(self, *args):
+        """静态字段被修改后丢弃已缓存的消息模板，下次发送时重新构建。"""
+        self._realtime_template = None
+        self._bds_template = None
+
+    def _connect_template_invalidation(self):
+        """将所有会影响消息静态部分的控件连接到模板失效处理。位置、航速、航向、数据状态每次发送都会重新读取，无需连接。"""
+        for field_name in ["eTargetType", "id", "mmsi", "vesselName", "len", "shiptype", "sost", "province",
+                           "radarSource", "aisSource", "bdSource", "bds", "shipName"]:
+            widget = self.inputs[field_name]
+            if isinstance(widget, QLineEdit):
+                widget.textChanged.connect(self._invalidate_realtime_template)
+            elif isinstance(widget, QComboBox):
+                widget.currentIndexChanged.connect(self._invalidate_realtime_template)
 
+    def _build_realtime_template(self, selected_class):
+        """
+        从界面读取静态字段并构建消息模板。
+        需要回写界面的操作（随机ID/MMSI、清空无关字段、雷达船型）先于读取执行，
+        它们触发的失效信号发生在模板赋值之前，不会使新模板失效。
+        """
         selected_state = self.inputs['sost'].currentData()
-        eTargetType_val = 0
-        if 'eTargetType_mapping' in self.config['ui_options']:
-            for rule in self.config['ui_options']['eTargetType_mapping']:
-                if rule['ui_class'] == selected_class and rule['ui_state'] == selected_state:
-                    eTargetType_val = rule['eTargetType']
-                    break
+        eTargetType_val = self.config_index.etarget_type.get((selected_class, selected_state), 0)
+
         # 没有输入id时执行会默认生成一个
-        target.id = self.get_field_value("id", int, 0)
-        if (target.id == 0) & (selected_class != "BDS"):
+        if (self.get_field_value("id", int, 0) == 0) & (selected_class != "BDS"):
             self._generate_random_value("id", "ID", self.inputs, self.log_message)
-            target.id = self.get_field_value("id", int, 0)
-
-        target.lastTm = int(time.time() * 1000)
-        target.sost = self.inputs['sost'].currentData()
-        target.eTargetType = eTargetType_val
-        target.adapterId = self.inputs['province'].currentData()
-        if override_status is not None:
-            target.status = override_status
-        elif self.data_status_checkbox.isChecked():
-            target.status = 1 if self.is_first_send else 2
-        else:
-            target.status = self.inputs['dataStatus'].currentData()
-
-        pos_info = target.pos
-        pos_info.id = target.id
 
         if "AIS" in selected_class:
-            pos_info.mmsi = self.get_field_value("mmsi", int, 0)
-            if (pos_info.mmsi == 0) and ("AIS" in selected_class):
+            if self.get_field_value("mmsi", int, 0) == 0:
                 self._generate_random_value("mmsi", "MMSI", self.inputs, self.log_message)
-                pos_info.mmsi = self.get_field_value("mmsi", int, 0)
-            pos_info.vesselName = self.get_field_value("vesselName")
         else:
-            pos_info.mmsi = 0
-            pos_info.vesselName = ""
             self.inputs['mmsi'].clear()
             self.inputs['vesselName'].clear()
 
@@ -1598,120 +2520,78 @@ class MainWindow(QWidget):
             self.inputs['bds'].clear()
             self.inputs['shipName'].clear()
 
-        pos_info.speed = self.get_field_value("speed", float, 0.0)
-        pos_info.course = self.get_field_value("course", float, 0.0)
-        pos_info.len = self.get_field_value("len", int, 0)
-        pos_info.shiptype = self.inputs['shiptype'].currentData()
-        pos_info.geoPtn.longitude = self.get_field_value("longitude", float, 0.0)
-        pos_info.geoPtn.latitude = self.get_field_value("latitude", float, 0.0)
-        target.maxLen = pos_info.len
-        pos_info.displayId = int(target.id) % 100000
-        if "RADAR" in selected_class:
-            pos_info.id_r = 18
-        pos_info.state = target.sost
-        pos_info.quality = 100
-        pos_info.period = 10
-        pos_info.heading = pos_info.course
-        pos_info.s_class = self.inputs['eTargetType'].currentData()
-        pos_info.m_mmsi = pos_info.mmsi
-        pos_info.aidtype = 1
-        target.adapterId = self.inputs['province'].currentData()
-
-        # --- AIS Source Logic ---
-        ais_source_text = self.inputs["aisSource"].text().strip()
-        if ais_source_text:
-            source = target.sources.add()
-            source.provider = "HLX"
-            source.type = "AIS"
-            ais_ids = [id.strip() for id in ais_source_text.split(',') if id.strip()]
-
-            is_checked = self.inputs["aisSource_checkbox"].isChecked()
-            current_time = target.lastTm
-            update_time = current_time
-
-            if is_checked:
-                if "ais" in self.source_unchecked_timestamps:
-                    del self.source_unchecked_timestamps["ais"]
-            else:
-                if "ais" not in self.source_unchecked_timestamps:
-                    self.source_unchecked_timestamps["ais"] = current_time
-                update_time = self.source_unchecked_timestamps["ais"]
-
-            for ais_id in ais_ids:
-                source.ids.append(ais_id)
-                info = target.vecFusionedTargetInfo.add()
-                info.uiStationType = 65
-                info.ullPosUpdateTime = update_time
-                info.ullUniqueId = target.id
-                info.uiStationId = int(ais_id)
-
-        # --- Radar Source Logic ---
-        radar_source_text = self.inputs["radarSource"].text().strip()
-        if radar_source_text:
-            source = target.sources.add()
-            source.provider = "HLX"
-            source.type = "RADAR"
-            radar_ids = [id.strip() for id in radar_source_text.split(',') if id.strip()]
-
-            is_checked = self.inputs["radarSource_checkbox"].isChecked()
-            current_time = target.lastTm
-            update_time = current_time
-
-            if is_checked:
-                if "radar" in self.source_unchecked_timestamps:
-                    del self.source_unchecked_timestamps["radar"]
-            else:
-                if "radar" not in self.source_unchecked_timestamps:
-                    self.source_unchecked_timestamps["radar"] = current_time
-                update_time = self.source_unchecked_timestamps["radar"]
-
-            for radar_id in radar_ids:
-                source.ids.append(radar_id)
-                info = target.vecFusionedTargetInfo.add()
-                info.uiStationType = 82
-                info.ullPosUpdateTime = update_time
-                info.ullUniqueId = target.id
-                info.uiStationId = int(radar_id)
-
-        # --- BDS Source Logic ---
-        bd_source_text = self.inputs["bdSource"].text().strip()
-        if bd_source_text:
-            source = target.sources.add()
-            source.provider = "HLX"
-            source.type = "BDS"
-            bd_ids = [id.strip() for id in bd_source_text.split(',') if id.strip()]
-
-            is_checked = self.inputs["bdSource_checkbox"].isChecked()
-            current_time = target.lastTm
-            update_time = current_time
-
-            if is_checked:
-                if "bds" in self.source_unchecked_timestamps:
-                    del self.source_unchecked_timestamps["bds"]
-            else:
-                if "bds" not in self.source_unchecked_timestamps:
-                    self.source_unchecked_timestamps["bds"] = current_time
-                update_time = self.source_unchecked_timestamps["bds"]
-
-            for bd_id in bd_ids:
-                source.ids.append(bd_id)
-                info = target.vecFusionedTargetInfo.add()
-                info.uiStationType = 66  # Assuming 66 for BDS
-                info.ullPosUpdateTime = update_time
-                info.ullUniqueId = target.id
-                info.uiStationId = int(bd_id)
-
+        shiptype = self.inputs['shiptype'].currentData()
         if "RADAR" == selected_class:
-            pos_info.shiptype = 99
+            shiptype = 99
             # 更新船舶类型UI回显为“其他”
             shiptype_combo = self.inputs['shiptype']
             other_index = shiptype_combo.findText("其他")
             if other_index != -1:
                 shiptype_combo.setCurrentIndex(other_index)
 
+        is_ais = "AIS" in selected_class
+        static_fields = {
+            "id": self.get_field_value("id", int, 0),
+            "sost": self.inputs['sost'].currentData(),
+            "eTargetType": eTargetType_val,
+            "adapterId": self.inputs['province'].currentData() or 0,
+            "mmsi": self.get_field_value("mmsi", int, 0) if is_ais else 0,
+            "vesselName": self.get_field_value("vesselName") if is_ais else "",
+            "len": self.get_field_value("len", int, 0),
+            "shiptype": shiptype,
+            "s_class": self.inputs['eTargetType'].currentData(),
+            "is_radar": "RADAR" in selected_class,
+            "sources": {
+                "ais": parse_source_ids(self.inputs["aisSource"].text()),
+                "radar": parse_source_ids(self.inputs["radarSource"].text()),
+                "bds": parse_source_ids(self.inputs["bdSource"].text()),
+            }
+        }
+        self.log_message("已重新构建 Protobuf 消息模板。")
+        return RealtimeTargetTemplate(static_fields)
+
+    def _source_update_times(self, source_keys, current_time):
+        """
+        计算各信息源的更新时间：勾选时为当前时间；取消勾选后固定为首次取消勾选时的时间。
+        """
+        update_times = {}
+        for key in source_keys:
+            if self.inputs[f"{SOURCE_CHECKBOX_PREFIX[key]}_checkbox"].isChecked():
+                if key in self.source_unchecked_timestamps:
+                    del self.source_unchecked_timestamps[key]
+                update_times[key] = current_time
+            else:
+                if key not in self.source_unchecked_timestamps:
+                    self.source_unchecked_timestamps[key] = current_time
+                update_times[key] = self.source_unchecked_timestamps[key]
+        return update_times
+
+    def _send_protobuf_data(self, selected_class, override_status=None):
+        """构建并发送Protobuf消息到unionTargetPb。静态字段来自缓存的模板，每次只更新动态字段。"""
+        if self._realtime_template is None or self._realtime_template_class != selected_class:
+            template = self._build_realtime_template(selected_class)
+            self._realtime_template = template
+            self._realtime_template_class = selected_class
+        template = self._realtime_template
+
+        with profiler.span("build_message"):
+            last_tm = int(time.time() * 1000)
+            if override_status is not None:
+                status = override_status
+            elif self.data_status_checkbox.isChecked():
+                status = 1 if self.is_first_send else 2
+            else:
+                status = self.inputs['dataStatus'].currentData()
+
+            longitude, latitude, speed, course = self._current_motion(last_tm / 1000.0)
+            target_list = template.render(
+                last_tm, status, longitude=longitude, latitude=latitude, speed=speed, course=course,
+                source_update_times=self._source_update_times(template.source_keys(), last_tm)
+            )
 
-        self.log_message("构造的 Protobuf 消息内容:\n" + str(target).strip())
-        pb_data = target_list.SerializeToString()
+        self.log_message("构造的 Protobuf 消息内容:\n" + str(template.target).strip())
+        with profiler.span("SerializeToString"):
+            pb_data = target_list.SerializeToString()
         topic = self.config['kafka']['topic']
         self.kafka_producer.send_message(topic, pb_data)
         self.log_message(f"已向 Topic '{topic}' 发送 Protobuf 消息。")
@@ -1720,21 +2600,8 @@ class MainWindow(QWidget):
         """构建并发送AIS静态信息JSON。(此功能已被禁用以防止重复发送)"""
         pass
 
-    def _send_bds_json_data(self, selected_class):
-        """构建并发送BDS位置JSON。"""
-        bds_topic = self.config['kafka'].get('bds_topic')
-        if not bds_topic:
-            self.log_message("警告: 在 config.json 中未找到 'bds_topic'。")
-            return
-
-        province_name_en = "Unknown"
-        selected_adapter_id = self.inputs['province'].currentData()
-        province_list = self.config['ui_options'].get('province', [])
-        for province_item in province_list:
-            if province_item['adapterId'] == selected_adapter_id:
-                province_name_en = province_item['name_en']
-                break
-
+    def _build_bds_template(self, selected_class):
+        """从界面读取BDS消息的不变字段并构建模板。回写界面的操作先于读取执行（同 _build_realtime_template）。"""
         terminal= self.get_field_value("bds", int, 0)
         if terminal ==0:
             self._generate_random_value("bds", "BDS", self.inputs, self.log_message)
@@ -1744,26 +2611,37 @@ class MainWindow(QWidget):
             self.inputs['mmsi'].clear()
             self.inputs['vesselName'].clear()
 
-        bds_payload = {
-            "altitude": 0, "communicate": 0,
-            "course": self.get_field_value("course", float, 0.0),
-            "disassemble": 0, "distress": 0, "jobType": "",
-            "latitude": self.get_field_value("latitude", float, 0.0),
-            "longitude": self.get_field_value("longitude", float, 0.0),
-            "online": 0, "power": 0, "provider": self.get_field_value("bdSource", int, 0),
-            "province": province_name_en,
-            "shipLength": self.get_field_value("len", float, 0.0),
-            "shipName": self.get_field_value("shipName"),
-            "source": 2, "speed": self.get_field_value("speed", float, 0.0),
-            "status": 0, "terminal":terminal,
-            "tilt": 0, "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-        }
+        selected_adapter_id = self.inputs['province'].currentData() or 0
+        return bds_template(
+            province=self.config_index.province_name_en_by_id.get(selected_adapter_id, "Unknown"),
+            provider=self.get_field_value("bdSource", int, 0),
+            ship_length=self.get_field_value("len", float, 0.0),
+            ship_name=self.get_field_value("shipName"),
+            terminal=terminal
+        )
 
-        json_data = json.dumps(bds_payload, ensure_ascii=False, indent=2)
-        self.kafka_producer.send_message(bds_topic, json_data.encode('utf-8'))
+    def _send_bds_json_data(self, selected_class):
+        """构建并发送BDS位置JSON。不变字段来自缓存的模板，每次只编码位置、航速、航向和时间。"""
+        bds_topic = self.config['kafka'].get('bds_topic')
+        if not bds_topic:
+            self.log_message("警告: 在 config.json 中未找到 'bds_topic'。")
+            return
+
+        if self._bds_template is None:
+            template = self._build_bds_template(selected_class)
+            self._bds_template = template
+
+        with profiler.span("build_message"):
+            now = time.time()
+            longitude, latitude, speed, course = self._current_motion(now)
+            json_data = self._bds_template.render_bytes(
+                course, latitude, longitude, speed,
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+            )
+        self.kafka_producer.send_message(bds_topic, json_data)
         self.log_message(f"已向 Topic '{bds_topic}' 发送 BDS JSON 消息。")
         if selected_class == "BDS":
-            self.log_message("构造的 BDS JSON 消息内容:\n" + json_data)
+            self.log_message("构造的 BDS JSON 消息内容:\n" + pretty_json(json_data))
 
     # ===================================================================
     # 静态信息 - 逻辑 (DUPLICATED)
@@ -1826,11 +2704,7 @@ class MainWindow(QWidget):
             starboard =get_static_val("shipWidth", int, 0) -port
 
             selected_shiptype_code = self.static_inputs["shiptype"].currentData()
-            shiptype_name_en = "Other" 
-            for shiptype_item in self.config['ui_options']['shiptype']:
-                if shiptype_item['code'] == selected_shiptype_code:
-                    shiptype_name_en = shiptype_item['name_en']
-                    break
+            shiptype_name_en = self.config_index.shiptype_name_en_by_code.get(selected_shiptype_code, "Other")
 
             mmsi_val = get_static_val("mmsi")
             if mmsi_val:
@@ -1854,12 +2728,11 @@ class MainWindow(QWidget):
                     "C (to Starboard)": str(starboard),
                     "extInfo": None
                 }
-                json_payload = {"AisExts": [ais_info]}
-                json_data = json.dumps(json_payload, ensure_ascii=False, indent=2)
-                self.log_message("(静态) 构造的 JSON 消息内容:\n" + json_data, "static")
+                json_data = encode_ais_exts([encode_ais_record(ais_info)])
+                self.log_message("(静态) 构造的 JSON 消息内容:\n" + pretty_json({"AisExts": [ais_info]}), "static")
                 static_topic = self.config['kafka'].get('ais_static_topic')
                 if static_topic:
-                    self.kafka_producer.send_message(static_topic, json_data.encode('utf-8'))
+                    self.kafka_producer.send_message(static_topic, json_data)
                     self.log_message(f"(静态) 已向 Topic '{static_topic}' 发送 JSON 消息。", "static")
                 else:
                     self.log_message("警告: 在 config.json 中未找到 'ais_static_topic'。", "static")
@@ -2001,12 +2874,7 @@ class MainWindow(QWidget):
             target.id = int(point.get('id', 0))
             target.lastTm = int(point.get('lastTm', int(time.time() * 1000)))
             target.sost = int(point.get('sost', 1))
-            eTargetType_val = 0
-            if 'eTargetType_mapping' in self.config['ui_options']:
-                for rule in self.config['ui_options']['eTargetType_mapping']:
-                    if rule['ui_class'] == point.get('eTargetType') and rule['ui_state'] == point.get('state'):
-                        eTargetType_val = rule['eTargetType']
-                        break
+            eTargetType_val = self.config_index.etarget_type.get((point.get('eTargetType'), point.get('state')), 0)
             target.s_class = eTargetType_val
             target.adapterId = int(point.get('adapterId', 0))
             target.status = 2
@@ -2080,10 +2948,18 @@ class MainWindow(QWidget):
             # 由于json的key是字符串，需要转回int
             self.playback_query_cache = {int(k): v for k, v in saved_cache.items()}
 
-            # 3. 使用加载的缓存来重建UI表格
+            # 3. 使用加载的缓存来重建UI表格（建行期间屏蔽 itemChanged，避免逐行触发查询）
             queries = saved_data.get("queries", [])
-            for i, query_params in enumerate(queries):
-                self.add_playback_query_row(params=query_params)
+            self.playback_table.blockSignals(True)
+            try:
+                for i, query_params in enumerate(queries):
+                    self.add_playback_query_row(params=query_params)
+            finally:
+                self.playback_table.blockSignals(False)
+
+            # 4. 勾选但没有缓存数据的行合并为一次批量查询
+            rows_to_query = [row for row, query_params in enumerate(queries) if query_params.get("draw")]
+            self.query_playback_rows(rows_to_query)
 
             self.log_message(f"已加载记录: {self.saved_tracks_combo.currentText()}", "playback")
             self.draw_trajectories() # 加载后自动绘制轨迹
@@ -2184,10 +3060,11 @@ class MainWindow(QWidget):
         - 修正多目标ID问题
         - 修正时长单位为分钟
         - 终止时清空状态
+        - 轨迹点在后台线程中转换为数组，准备完成后再开始发送
         """
         logger = lambda msg: self.log_message(msg, "playback")
 
-        if self.trajectory_sending_timer.isActive():
+        if self.trajectory_sending_timer.isActive() or self.playback_prep_worker is not None:
             self.handle_playback_stop_sending_v4(completed=False)
             logger("已停止之前的发送任务，准备启动新任务...")
             QApplication.processEvents()
@@ -2202,14 +3079,17 @@ class MainWindow(QWidget):
         base_lon_str = self.playback_send_inputs['longitude'].text().strip()
         base_lat_str = self.playback_send_inputs['latitude'].text().strip()
         override_mmsi_str = self.playback_send_inputs['mmsi'].text().strip()
-        # override_bds_str = self.playback_send_inputs['bds'].text().strip()
         use_offset = bool(base_lon_str and base_lat_str)
-        lon_offset, lat_offset = 0.0, 0.0
 
-        # 3. 收集选中的轨迹并初始化UI
-        all_points = []
-        selected_trajectories_data = []
+        try:
+            base_lon = float(base_lon_str) if use_offset else None
+            base_lat = float(base_lat_str) if use_offset else None
+            override_mmsi = int(override_mmsi_str) if override_mmsi_str else None
+        except ValueError as e:
+            logger(f"错误：无法确定计算基准: {e}")
+            return
 
+        # 3. 收集选中的轨迹并初始化UI
         rows_to_send = []
         for row in range(self.playback_table.rowCount()):
             item = self.playback_table.item(row, 0)
@@ -2221,18 +3101,26 @@ class MainWindow(QWidget):
             QMessageBox.information(self, "提示", "没有选择任何有效的轨迹进行发送。")
             return
 
+        # 抽稀预览的行在发送前查询完整轨迹
+        preview_rows = [row for row in rows_to_send if self.playback_query_cache.get(row, {}).get("preview")]
+        if preview_rows:
+            logger(f"{len(preview_rows)} 行为抽稀预览数据，正在查询完整轨迹...")
+            if not self.query_playback_rows(preview_rows, full_resolution=True):
+                logger("错误: 查询完整轨迹失败，已取消发送。")
+                return
+
+        trajectories = []
         for row in rows_to_send:
             cached_data = self.playback_query_cache.get(row)
             if cached_data and cached_data.get("points"):
                 points = cached_data["points"]
-                if not points: continue
-                all_points.extend(points)
-                selected_trajectories_data.append({'row': row, 'points': points})
+                # --- FIX 1: Generate a truly unique ID for each trajectory ---
+                trajectories.append((row, points, self._generate_random_id_internal(logger)))
 
                 self.total_points_per_row[row] = len(points)
                 self.sent_points_per_row[row] = 0
-                first_ts = int(points[0].get('lastTm', 0))
-                last_ts = int(points[-1].get('lastTm', 0))
+                first_ts = int(points[0].get('lastTm') or 0)
+                last_ts = int(points[-1].get('lastTm') or 0)
                 self.first_timestamp_per_row[row] = first_ts
                 # --- FIX 3: Calculate duration in minutes ---
                 self.total_duration_per_row[row] = (last_ts - first_ts) / 60000.0
@@ -2240,226 +3128,181 @@ class MainWindow(QWidget):
                 self.playback_table.setItem(row, 6, QTableWidgetItem(f"0/{self.total_points_per_row[row]}"))
                 self.playback_table.setItem(row, 7, QTableWidgetItem(f"0.00/{self.total_duration_per_row[row]:.2f}"))
 
-        if not selected_trajectories_data:
+        if not trajectories:
             logger("选择的轨迹中没有有效的轨迹点数据。")
             return
 
-        # 4. 计算偏移和时间基准
-        try:
-            first_trajectory_for_location = selected_trajectories_data[0]['points']
-            location_base_point = first_trajectory_for_location[0]
-
-            if use_offset:
-                ui_base_lon, ui_base_lat = float(base_lon_str), float(base_lat_str)
-                db_base_lon = float(location_base_point.get('longitude', 0.0))
-                db_base_lat = float(location_base_point.get('latitude', 0.0))
-                lon_offset, lat_offset = ui_base_lon - db_base_lon, ui_base_lat - db_base_lat
-                logger(f"坐标基准: UI({ui_base_lon}, {ui_base_lat}), DB({db_base_lon}, {db_base_lat})")
-            else:
-                logger("信息: 未提供基准经纬度，将使用原始坐标。")
-
-            all_points.sort(key=lambda p: int(p.get('lastTm', 0)))
-            time_base_point = all_points[0]
-            first_db_timestamp = int(time_base_point.get('lastTm'))
+        if use_offset:
+            logger(f"坐标基准: UI({base_lon}, {base_lat}), "
+                   f"DB({trajectories[0][1][0].get('longitude')}, {trajectories[0][1][0].get('latitude')})")
+        else:
+            logger("信息: 未提供基准经纬度，将使用原始坐标。")
+
+        # 4. 在后台线程中准备发送数据
+        options = {
+            "base_lon": base_lon,
+            "base_lat": base_lat,
+            "override_mmsi": override_mmsi,
+            "province_override": self.playback_send_inputs['province'].currentData() or 0,
+            "adapter_id_by_name_en": self.config_index.adapter_id_by_name_en,
+            "s_class_map": dict(self.config['ui_options']['eTargetType']),
+        }
+        worker = PlaybackPrepWorker(trajectories, options, self)
+        worker.progress.connect(self._on_playback_prep_progress)
+        worker.prepared.connect(self._on_playback_prepared)
+        worker.failed.connect(self._on_playback_prep_failed)
+        worker.finished.connect(worker.deleteLater)
+        self.playback_prep_worker = worker
+
+        self.playback_prep_progress.setValue(0)
+        self.playback_prep_progress.setVisible(True)
+        self.playback_start_send_btn.setEnabled(False)
+        self.playback_stop_send_btn.setEnabled(True)
+        logger(f"正在准备 {sum(len(points) for row, points, target_id in trajectories)} 个轨迹点...")
+        worker.start()
 
-        except (IndexError, ValueError, TypeError) as e:
-            logger(f"错误：无法确定计算基准: {e}")
+    def _on_playback_prep_progress(self, done, total):
+        if self.sender() is not self.playback_prep_worker:
             return
+        self.playback_prep_progress.setValue(int(done * 100 / total) if total else 100)
 
-        # 5. 准备发送队列
-        self.trajectory_sending_queue = []
-        start_send_time = int(time.time() * 1000)
-        mmsi_counter, bds_counter = 0, 0
+    def _on_playback_prep_failed(self, message):
+        if self.sender() is not self.playback_prep_worker:
+            return
+        self.playback_prep_worker = None
+        self.log_message(f"错误：无法确定计算基准: {message}", "playback")
+        self.handle_playback_stop_sending_v4(completed=False)
 
-        ais_traj_ids = {id(traj['points']) for traj in selected_trajectories_data if any(p.get('mmsi') for p in traj['points'])}
-        bds_traj_ids = {id(traj['points']) for traj in selected_trajectories_data if any(p.get('bds') for p in traj['points'])}
+    def _on_playback_prepared(self, prepared):
+        """准备完成：以当前时间为基准换算发送时间并开始发送。"""
+        logger = lambda msg: self.log_message(msg, "playback")
+        if self.sender() is not self.playback_prep_worker:
+            return  # 已被终止或被新的任务替代
+        self.playback_prep_worker = None
+        self.playback_prep_progress.setVisible(False)
+
+        for field, text in prepared.json_errors:
+            logger(f"警告: 解析{field}字段失败: {text}")
+        for track in prepared.tracks:
+            if track.skipped_points:
+                logger(f"警告: 第 {track.row + 1} 行有 {track.skipped_points} 个轨迹点缺少有效时间戳，已跳过。")
+
+        # 5. 启动发送
+        if not prepared.total_points:
+            logger("错误: 准备发送队列失败，队列为空。")
+            self.handle_playback_stop_sending_v4(completed=False)
+            return
 
-        for trajectory_item in selected_trajectories_data:
-            row = trajectory_item['row']
-            trajectory = trajectory_item['points']
-            # --- FIX 1: Generate a truly unique ID for each trajectory ---
-            target_random_id = self._generate_random_id_internal(logger)
+        self.playback_stream = PlaybackStream(prepared, int(time.time() * 1000),
+                                              loop=self.playback_loop_checkbox.isChecked())
+        self.playback_logged_cycle = 0
+        self.playback_paused_at = None
+        self.playback_seek_edit.setDateTimeRange(QDateTime.fromMSecsSinceEpoch(self.playback_stream.first_tm),
+                                                 QDateTime.fromMSecsSinceEpoch(self.playback_stream.last_tm))
+        self.playback_seek_edit.setDateTime(QDateTime.fromMSecsSinceEpoch(self.playback_stream.first_tm))
+        self._set_playback_controls_enabled(True)
+        logger(f"准备发送 {prepared.total_points} 个轨迹点。")
+        self.process_trajectory_queue_v4()
 
-            current_override_mmsi = 0
-            if override_mmsi_str and id(trajectory) in ais_traj_ids:
-                current_override_mmsi = int(override_mmsi_str) + mmsi_counter
-                mmsi_counter += 1
+    def _set_playback_controls_enabled(self, enabled):
+        self.playback_pause_btn.setEnabled(enabled)
+        self.playback_pause_btn.setText("暂停")
+        self.playback_seek_edit.setEnabled(enabled)
+        self.playback_seek_btn.setEnabled(enabled)
 
-            # current_override_bds = 0
-            # if override_bds_str and id(trajectory) in bds_traj_ids:
-            #     current_override_bds = int(override_bds_str) + bds_counter
-            #     bds_counter += 1
+    def _schedule_next_trajectory_point(self):
+        """按下一个点的发送时间与当前时间的差值启动定时器（用于继续和跳转之后）。"""
+        next_item = self.playback_stream.peek()
+        if next_item is None:
+            self.handle_playback_stop_sending_v4(completed=True)
+            return
+        delay = next_item[2] - int(time.time() * 1000)
+        self.trajectory_sending_timer.start(max(0, delay))
 
-            for point in trajectory:
-                try:
-                    # --- FIX: 完整地填充Protobuf对象 (增加None值健壮性) ---
-                    target = target_pb2.TargetProto()
-                    target.id = target_random_id
-                    target.eTargetType = point.get('targetType') or 'TT_R'
-
-                    original_timestamp = int(point.get('lastTm') or 0)
-                    if not original_timestamp:
-                        logger(f"警告: 轨迹点 (ID: {point.get('id')}) 缺少有效时间戳，已跳过。")
-                        continue
-
-                    time_delta = original_timestamp - first_db_timestamp
-                    target.lastTm = start_send_time + time_delta
-
-                    #当前时间：target.lastTm
-                    #差值=开始发送的时间-第一个点的时间。用于后面的信息源里时间+差值
-                    dif = start_send_time-first_db_timestamp
-
-
-                    target.maxLen = int(point.get('maxLen') or 0)
-                    adapter_id = 12  # 默认值
-                    # 优先从界面上获取，界面上没有值就用point轨迹点里的
-                    province_page = self.playback_send_inputs['province'].currentData()
-                    if province_page != 0 :
-                        adapter_id = province_page
-                    else:
-                        # 获取 adapterId 字符串
-                        adapter_id_str = point.get('province')
-                        print("当前 adapterId:",adapter_id_str)
-                        for province_item in self.config['ui_options']['province']:
-                            if province_item['name_en'] == adapter_id_str:
-                                adapter_id = province_item['adapterId']
-                                break
-                    target.adapterId = int(adapter_id)
-                    target.eTargetType =  point.get('targetType') or 'TT_A'
-                    target.sost = int(point.get('state') or 14)
-
-                    # eTargetType_val = 0
-                    # if 'eTargetType_mapping' in self.config['ui_options']:
-                    #     for rule in self.config['ui_options']['eTargetType_mapping']:
-                    #         if rule['ui_class'] == point.get('eTargetType') and rule['ui_state'] == point.get('state'):
-                    #             eTargetType_val = rule['eTargetType']
-                    #             break
-                    # target.s_class = eTargetType_val
-                    target.status = 2 if point.get('status') == 'UNKNOW' else (point.get('status') or 2)
-
-
-
-                    pos_info = target.pos
-                    pos_info.id = target.id
-                    pos_info.mmsi = current_override_mmsi if current_override_mmsi > 0 else int(point.get('mmsi') or 0)
-                    # pos_info.imo = current_override_bds if current_override_bds > 0 else int(point.get('bds') or 0)
-                    pos_info.vesselName = point.get('vesselName') or ''
-                    pos_info.speed = float(point.get('speed') or 0.0)
-                    pos_info.state = int(point.get('state') or 14)
-                    pos_info.course = float(point.get('course') or 0.0)
-                    pos_info.len = int(point.get('len') or 0)
-                    pos_info.id_r = int(point.get('idR') or 0)
-
-
-                    pos_info.shiptype = int(point.get('shipType') or 99)
-
-                    original_lon = float(point.get('longitude') or 0.0)
-                    original_lat = float(point.get('latitude') or 0.0)
-                    pos_info.geoPtn.longitude = original_lon + lon_offset
-                    pos_info.geoPtn.latitude = original_lat + lat_offset
-
-                    pos_info.displayId = int(target.id) % 100000
-                    pos_info.state = int(point.get('state') or 1)
-                    pos_info.quality = 100
-                    pos_info.heading = float(point.get('heading') or 0.0)
-                    s_class = point.get('sClass', '')
-                    pos_info.s_class = self.config['ui_options']['eTargetType'].get(s_class, 0)
-
-
-
-                    pos_info.m_mmsi = pos_info.mmsi
-                    pos_info.aidtype = int(point.get('aidType') or 0)
-                    if hasattr(pos_info, 'adapterId'):
-                        pos_info.adapterId = target.adapterId
-
-                    # 新增：解析和填充 sources 和 fusionTargets
-                    sources_json = point.get('sources')
-                    if sources_json:
-                        try:
-                            sources_data = json.loads(sources_json)
-                            for src_item in sources_data:
-                                source_pb = target.sources.add()
-                                source_pb.provider = src_item.get("provider", "")
-                                source_pb.type = src_item.get("type", "")
-                                if "ids" in src_item and isinstance(src_item["ids"], list):
-                                    for an_id in src_item["ids"]:
-                                        source_pb.ids.append(str(an_id))
-                        except json.JSONDecodeError:
-                            logger(f"警告: 解析sources字段失败 (ID: {target.id}): {sources_json}")
-
-                    fusion_targets_json = point.get('fusionTargets')
-                    if fusion_targets_json:
-                        try:
-                            fusion_targets_data = json.loads(fusion_targets_json)
-                            for ft_item in fusion_targets_data:
-                                ft_pb = target.vecFusionedTargetInfo.add()
-                                ft_pb.ullUniqueId = int(ft_item.get("targetId") or 0)
-                                ft_pb.uiStationId = int(ft_item.get("stationId") or 0)
-                                # 假设 stationType 是字符串，需要映射到枚举或整数
-                                station_type_str = ft_item.get("stationType", "").upper()
-                                if station_type_str == "RADAR":
-                                    ft_pb.uiStationType = 82  # 假设 82 代表 RADAR
-                                elif station_type_str == "AIS":
-                                    ft_pb.uiStationType = 65  # 假设 65 代表 AIS
-                                else:
-                                    ft_pb.uiStationType = 0 # 未知类型
-                                    # dif_time = start_send_time - first_db_timestamp
-                                    # print(dif_time,dif_time)
-                                ft_pb.ullPosUpdateTime = int(ft_item.get("updateTime") or 0) + int(dif)
-                                #print(ft_pb.ullPosUpdateTime)
-                        except json.JSONDecodeError:
-                            logger(f"警告: 解析fusionTargets字段失败 (ID: {target.id}): {fusion_targets_json}")
-
-
-                    self.trajectory_sending_queue.append({'proto': target, 'timestamp': target.lastTm, 'row': row,
-                                                          'original_timestamp': original_timestamp})
-
-                except Exception as e:
-                    logger(f"错误: 准备点 {point.get('id')} 时失\\u5931: {e}")
-
-        # 6. 启动发送
-        if not self.trajectory_sending_queue:
-            logger("错误: 准备发送队列失败，队列为空。")
+    def handle_playback_pause_resume(self):
+        """暂停时保留发送进度；继续时把暂停时长计入时间偏移，后续点保持原有间隔。"""
+        logger = lambda msg: self.log_message(msg, 'playback')
+        if self.playback_stream is None:
+            return
+        now_ms = int(time.time() * 1000)
+        if self.playback_paused_at is None:
+            self.trajectory_sending_timer.stop()
+            self.playback_paused_at = now_ms
+            self.playback_pause_btn.setText("继续")
+            logger(f"轨迹发送已暂停，已发送 {self.playback_stream.sent} 个点。")
+        else:
+            self.playback_stream.time_offset += now_ms - self.playback_paused_at
+            self.playback_paused_at = None
+            self.playback_pause_btn.setText("暂停")
+            logger("轨迹发送已继续。")
+            self._schedule_next_trajectory_point()
+
+    def handle_playback_seek(self):
+        """跳转到指定的原始时间，从不早于该时间的第一个点开始立即发送（暂停状态下保持暂停）。"""
+        logger = lambda msg: self.log_message(msg, 'playback')
+        if self.playback_stream is None:
             return
+        seek_tm = self.playback_seek_edit.dateTime().toMSecsSinceEpoch()
+        now_ms = int(time.time() * 1000)
+        self.trajectory_sending_timer.stop()
+        skipped = self.playback_stream.seek(seek_tm, now_ms)
+        for row, sent in self.playback_stream.sent_by_row.items():
+            self.sent_points_per_row[row] = sent
+            if self.playback_table.item(row, 6):
+                self.playback_table.item(row, 6).setText(f"{sent}/{self.total_points_per_row[row]}")
+        logger(f"已跳转到 {self.playback_seek_edit.dateTime().toString('yyyy-MM-dd HH:mm:ss')}，跳过 {skipped} 个点。")
+        if self.playback_paused_at is not None:
+            self.playback_paused_at = now_ms
+        else:
+            self._schedule_next_trajectory_point()
 
-        self.trajectory_sending_queue.sort(key=lambda item: item['timestamp'])
-        self.trajectory_sending_index = 0
-        logger(f"准备发送 {len(self.trajectory_sending_queue)} 个轨迹点。")
-        self.playback_start_send_btn.setEnabled(False)
-        self.playback_stop_send_btn.setEnabled(True)
-        self.process_trajectory_queue_v4()
+    def handle_playback_loop_toggled(self, checked):
+        if self.playback_stream is not None:
+            self.playback_stream.loop = checked
 
+    @profiled("process_trajectory_queue_v4")
     def process_trajectory_queue_v4(self):
         """
         处理并发送队列中的下一个轨迹点，并设置定时器以发送再下一个。(V4)
         """
-        if self.trajectory_sending_index >= len(self.trajectory_sending_queue):
+        if self.playback_stream is None or self.playback_paused_at is not None:
+            return
+        current_item = self.playback_stream.next()
+        if current_item is None:
             self.handle_playback_stop_sending_v4(completed=True)
             return
+        # peek() 在安排下一次发送时就已进入新一轮，这里与上次输出日志时的轮次比较
+        if self.playback_stream.cycle != self.playback_logged_cycle:
+            self.playback_logged_cycle = self.playback_stream.cycle
+            self.log_message(f"开始第 {self.playback_stream.cycle + 1} 轮循环发送。", "playback")
 
-        current_item = self.trajectory_sending_queue[self.trajectory_sending_index]
-        row = current_item['row']
-
-        target_list = target_pb2.TargetProtoList()
-        target_list.list.add().CopyFrom(current_item['proto'])
-        pb_data = target_list.SerializeToString()
-        topic = self.config['kafka']['topic']
-        self.kafka_producer.send_message(topic, pb_data)
-
-        self.log_message(f"发送数据 (Row {row}):\n{target_list}", "playback")
+        track, point_index, current_send_tm = current_item
+        row = track.row
+        original_timestamp = int(track.last_tm[point_index])
 
-        self.sent_points_per_row[row] += 1
-        self.playback_table.item(row, 6).setText(f"{self.sent_points_per_row[row]}/{self.total_points_per_row[row]}")
+        try:
+            with profiler.span("build_message"):
+                target_list = target_pb2.TargetProtoList()
+                target_list.list.append(build_playback_target(track, point_index, current_send_tm - original_timestamp))
+            with profiler.span("SerializeToString"):
+                pb_data = target_list.SerializeToString()
+            topic = self.config['kafka']['topic']
+            self.kafka_producer.send_message(topic, pb_data)
+            self.log_message(f"发送数据 (Row {row}):\n{target_list}", "playback")
+        except (ValueError, TypeError) as e:
+            self.log_message(f"错误: 准备点 (Row {row}, lastTm: {track.last_tm[point_index]}) 时失败: {e}", "playback")
 
-        # --- FIX 3: Calculate and display elapsed time in minutes ---
-        elapsed_minutes = ((current_item['original_timestamp'] - self.first_timestamp_per_row[row]) / 1000.0) / 60.0
-        self.playback_table.item(row, 7).setText(f"{elapsed_minutes:.2f}/{self.total_duration_per_row[row]:.2f}")
+        with profiler.span("update_table"):
+            self.sent_points_per_row[row] = self.playback_stream.sent_by_row[row]
+            self.playback_table.item(row, 6).setText(f"{self.sent_points_per_row[row]}/{self.total_points_per_row[row]}")
 
-        self.trajectory_sending_index += 1
+            # --- FIX 3: Calculate and display elapsed time in minutes ---
+            elapsed_minutes = ((original_timestamp - self.first_timestamp_per_row[row]) / 1000.0) / 60.0
+            self.playback_table.item(row, 7).setText(f"{elapsed_minutes:.2f}/{self.total_duration_per_row[row]:.2f}")
 
-        if self.trajectory_sending_index < len(self.trajectory_sending_queue):
-            next_item = self.trajectory_sending_queue[self.trajectory_sending_index]
-            delay = next_item['timestamp'] - current_item['timestamp']
+        next_item = self.playback_stream.peek()
+        if next_item is not None:
+            delay = next_item[2] - current_send_tm
             if delay < 0: delay = 0
             self.trajectory_sending_timer.start(delay)
         else:
@@ -2470,6 +3313,12 @@ class MainWindow(QWidget):
         logger = lambda msg: self.log_message(msg, 'playback')
         if self.trajectory_sending_timer.isActive():
             self.trajectory_sending_timer.stop()
+        if self.playback_prep_worker is not None:
+            self.playback_prep_worker.cancel()
+            self.playback_prep_worker = None
+        self.playback_prep_progress.setVisible(False)
+        self.playback_paused_at = None
+        self._set_playback_controls_enabled(False)
 
         # --- FIX 2: Reset UI state on stop ---
         for row, total_points in self.total_points_per_row.items():
@@ -2477,8 +3326,7 @@ class MainWindow(QWidget):
                 self.playback_table.setItem(row, 6, QTableWidgetItem(str(total_points)))
                 self.playback_table.setItem(row, 7, QTableWidgetItem(f"{self.total_duration_per_row[row]:.2f}"))
 
-        self.trajectory_sending_queue = []
-        self.trajectory_sending_index = 0
+        self.playback_stream = None
         self.sent_points_per_row.clear()
         self.total_points_per_row.clear()
         self.first_timestamp_per_row.clear()
@@ -2506,6 +3354,116 @@ class MainWindow(QWidget):
         self.log_message(f"已删除 {len(selected_rows)} 行查询。", "playback")
         self.draw_trajectories()
 
+    def _read_playback_row_params(self, row):
+        """读取回放表格某一行的查询参数，MMSI和ID都为空时返回 None。"""
+        mmsi = self.playback_table.item(row, 1).text().strip()
+        target_id = self.playback_table.item(row, 2).text().strip()
+
+        province_combo = self.playback_table.cellWidget(row, 3)
+        adapterId = province_combo.currentData()
+        province = self.config_index.province_name_en_by_id.get(adapterId)
+
+        start_time = self.playback_table.cellWidget(row, 4).dateTime().toString("yyyy-MM-dd HH:mm:ss")
+        end_time = self.playback_table.cellWidget(row, 5).dateTime().toString("yyyy-MM-dd HH:mm:ss")
+
+        if not mmsi and not target_id:
+            return None
+        return {
+            "mmsi": mmsi, "id": target_id, "province": province,
+            "start_time": start_time, "end_time": end_time
+        }
+
+    def _store_playback_query_result(self, row, params, points, preview_total=None):
+        """
+        把查询结果写入缓存，并更新表格中的点数和时长。
+        :param preview_total: 抽稀预览时为完整轨迹的点数，缓存标记为预览，发送前需要重新查询完整数据
+        """
+        point_count = len(points)
+
+        # 更新缓存和UI
+        entry = {"params": params, "points": points}
+        if preview_total is not None:
+            entry["preview"] = True
+            entry["total_points"] = preview_total
+        self.playback_query_cache[row] = entry
+        self.playback_table.item(row, 6).setText(str(point_count if preview_total is None else preview_total))
+
+        # 计算并更新轨迹时长
+        duration_str = "0.0"
+        if point_count > 1:
+            try:
+                lasttms = [p.get('lastTm', 0) for p in points]
+                time_diff_ms = max(lasttms) - min(lasttms)
+                time_diff_min = round((time_diff_ms / 1000) / 60, 1)
+                duration_str = str(time_diff_min)
+            except (ValueError, TypeError):
+                duration_str = "Error"
+
+        duration_item = QTableWidgetItem(duration_str)
+        duration_item.setFlags(duration_item.flags() & ~Qt.ItemIsEditable)
+        self.playback_table.setItem(row, 7, duration_item)
+
+        if preview_total is None:
+            self.log_message(f"第 {row+1} 行: 查询到 {point_count} 个点。", "playback")
+        else:
+            self.log_message(f"第 {row+1} 行: 共 {preview_total} 个点，预览抽稀为 {point_count} 个点。", "playback")
+
+    def _preview_max_points(self):
+        """预览抽稀的点数上限：按预览区宽度，每个像素约两个点。"""
+        return max(200, self.trajectory_preview.viewport().width() * 2)
+
+    def query_playback_rows(self, rows, full_resolution=False):
+        """
+        为多行一次性批量查询轨迹（缓存参数一致的行跳过），结果按行写入缓存。
+        :param full_resolution: True 时抽稀预览的缓存也需要重新查询完整数据（用于发送）
+        :return: 查询失败或数据库不可用时返回 False。
+        """
+        requests = {}
+        for row in rows:
+            try:
+                params = self._read_playback_row_params(row)
+            except Exception as e:
+                self.log_message(f"错误: 读取第 {row+1} 行查询参数失败: {e}", "playback")
+                continue
+            if params is None:
+                continue
+            cached_entry = self.playback_query_cache.get(row)
+            if cached_entry and cached_entry.get("params") == params:
+                if not (full_resolution and cached_entry.get("preview")):
+                    continue
+            requests[row] = params
+
+        if not requests:
+            return True
+        if not self.db:
+            self.log_message("错误: 数据库对象未初始化。", "playback")
+            return False
+
+        self.log_message(f"正在批量查询 {len(requests)} 行轨迹...", "playback")
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            results = self.db.query_trajectories_bulk(requests)
+        finally:
+            QApplication.restoreOverrideCursor()
+        self._log_query_cache_stats()
+
+        if results is None:
+            self.log_message("数据库查询失败，请检查日志。", "playback")
+            return False
+        for row, row_results in results.items():
+            self._store_playback_query_result(row, requests[row], [result._asdict() for result in row_results])
+        return True
+
+    def _log_query_cache_stats(self):
+        """在回放日志中输出数据库查询缓存的累计命中情况，未启用缓存时不输出。"""
+        stats = self.db.cache_stats()
+        if stats is None:
+            return
+        self.log_message(f"查询缓存: 命中 {stats['hits']} 次 / 未命中 {stats['misses']} 次"
+                         f"（命中率 {stats['hit_rate']:.0%}），{stats['entries']} 条结果，"
+                         f"{stats['bytes'] / 1048576:.1f} MB，淘汰 {stats['evictions']}，过期 {stats['expirations']}",
+                         "playback")
+
     def handle_draw_trajectory_checkbox(self, item):
         """当“绘制轨迹”复选框状态改变时触发查询和绘制"""
         if item.column() != 0:
@@ -2518,47 +3476,17 @@ class MainWindow(QWidget):
             self.draw_trajectories() # 如果是取消勾选，直接重绘
             return
 
-        # --- 开始查询逻辑 ---
-        if not hasattr(self, 'db') or not self.db:
-            self.log_message("错误: 数据库对象未初始化。", "playback")
-            item.setCheckState(Qt.Unchecked)
-            return
-        if not self.db.is_connected:
-            self.log_message("错误: 数据库未连接，无法查询。", "playback")
-            item.setCheckState(Qt.Unchecked)
-            return
-
         # 从表格中提取当前行的查询参数
         try:
-            mmsi = self.playback_table.item(row, 1).text().strip()
-            target_id = self.playback_table.item(row, 2).text().strip()
-
-            province_combo = self.playback_table.cellWidget(row, 3)
-            adapterId = province_combo.currentData()
-            province = None
-            if self.config['ui_options'].get('province'):
-                for province_item in self.config['ui_options']['province']:
-                    if province_item['adapterId'] == adapterId:
-                        province = province_item['name_en']
-                        break
-
-            #print("省:", province)
-            start_time = self.playback_table.cellWidget(row, 4).dateTime().toString("yyyy-MM-dd HH:mm:ss")
-            end_time = self.playback_table.cellWidget(row, 5).dateTime().toString("yyyy-MM-dd HH:mm:ss")
-
-            if not mmsi and not target_id:
-                self.log_message(f"第 {row+1} 行: MMSI和ID至少需要一个才能查询。", "playback")
-                item.setCheckState(Qt.Unchecked)
-                return
-
-            current_params = {
-                "mmsi": mmsi, "id": target_id, "province": province,
-                "start_time": start_time, "end_time": end_time
-            }
+            current_params = self._read_playback_row_params(row)
         except Exception as e:
             self.log_message(f"错误: 读取第 {row+1} 行查询参数失败: {e}", "playback")
             item.setCheckState(Qt.Unchecked)
             return
+        if current_params is None:
+            self.log_message(f"第 {row+1} 行: MMSI和ID至少需要一个才能查询。", "playback")
+            item.setCheckState(Qt.Unchecked)
+            return
 
         # 检查缓存
         cached_entry = self.playback_query_cache.get(row)
@@ -2567,62 +3495,62 @@ class MainWindow(QWidget):
             self.draw_trajectories()
             return
 
+        # --- 开始查询逻辑 (缓存未命中时才需要数据库) ---
+        if not hasattr(self, 'db') or not self.db:
+            self.log_message("错误: 数据库对象未初始化。", "playback")
+            item.setCheckState(Qt.Unchecked)
+            return
         # 执行数据库查询
         self.log_message(f"第 {row+1} 行: 正在查询数据库...", "playback")
         QApplication.setOverrideCursor(Qt.WaitCursor)
 
-        results = self.db.query_trajectories(
-            criteria={'mmsi': mmsi, 'id': target_id, 'province': province},
-            start_time=start_time,
-            end_time=end_time
-        )
+        criteria = {'mmsi': current_params['mmsi'], 'id': current_params['id'],
+                    'province': current_params['province']}
+        preview_total = None
+        if self.preview_downsample_checkbox.isChecked():
+            results = self.db.query_trajectory_preview(
+                criteria=criteria,
+                start_time=current_params['start_time'],
+                end_time=current_params['end_time'],
+                max_points=self._preview_max_points()
+            )
+            if results is not None:
+                points, preview_total = results
+                # 点数没有超过上限时，预览结果就是完整轨迹
+                if preview_total <= len(points):
+                    preview_total = None
+        else:
+            results = self.db.query_trajectories(
+                criteria=criteria,
+                start_time=current_params['start_time'],
+                end_time=current_params['end_time']
+            )
+            if results is not None:
+                points = [result._asdict() for result in results]
         QApplication.restoreOverrideCursor()
+        self._log_query_cache_stats()
 
         if results is None:
             self.log_message("数据库查询失败，请检查日志。", "playback")
             item.setCheckState(Qt.Unchecked)
             return
 
-        points = [row._asdict() for row in results]
-        point_count = len(points)
-
-        # 更新缓存和UI
-        self.playback_query_cache[row] = {"params": current_params, "points": points}
-        self.playback_table.item(row, 6).setText(str(point_count))
-
-        # 计算并更新轨迹时长
-        duration_str = "0.0"
-        if point_count > 1:
-            try:
-                lasttms = [p.get('lastTm', 0) for p in points]
-                time_diff_ms = max(lasttms) - min(lasttms)
-                time_diff_min = round((time_diff_ms / 1000) / 60, 1)
-                duration_str = str(time_diff_min)
-            except (ValueError, TypeError):
-                duration_str = "Error"
-
-        duration_item = QTableWidgetItem(duration_str)
-        duration_item.setFlags(duration_item.flags() & ~Qt.ItemIsEditable)
-        self.playback_table.setItem(row, 7, duration_item)
-
-
-        self.log_message(f"第 {row+1} 行: 查询到 {point_count} 个点。", "playback")
-
+        self._store_playback_query_result(row, current_params, points, preview_total)
         self.draw_trajectories()
 
     def toggle_all_trajectories(self, state):
-        """全选/全不选所有行的“绘制轨迹”复选框"""
+        """全选/全不选所有行的“绘制轨迹”复选框，全选时缺少数据的行合并为一次批量查询"""
         is_checked = state == Qt.Checked
         self.playback_table.itemChanged.disconnect(self.handle_draw_trajectory_checkbox)
         for row in range(self.playback_table.rowCount()):
             item = self.playback_table.item(row, 0)
             if item:
                 item.setCheckState(Qt.Checked if is_checked else Qt.Unchecked)
+        if is_checked:
+            self.query_playback_rows(range(self.playback_table.rowCount()))
         self.playback_table.itemChanged.connect(self.handle_draw_trajectory_checkbox)
 
-        # 触发一次查询/绘制
-        if self.playback_table.rowCount() > 0:
-            self.handle_draw_trajectory_checkbox(self.playback_table.item(0, 0))
+        self.draw_trajectories()
 
 
     def handle_save_as_button(self):
@@ -2664,6 +3592,53 @@ class MainWindow(QWidget):
             except Exception as e:
                 self.log_message(f"错误: 保存文件失败: {e}", "playback")
 
+    def handle_import_pb_capture(self):
+        """
+        导入unionTargetPB抓包文件（每行一帧Hex），直接解析为列式数据，
+        按目标ID拆分为回放查询行并写入缓存，无需查询数据库即可预览和发送。
+        """
+        filepath, _ = QFileDialog.getOpenFileName(self, "选择PB抓包文件", "", "Text Files (*.txt *.hex);;All Files (*)")
+        if not filepath:
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            columns, failed = decode_hex_file_to_columns(filepath)
+            tracks = columns.to_playback_points()
+        except Exception as e:
+            self.log_message(f"错误: 导入PB抓包失败: {e}", "playback")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if not tracks:
+            self.log_message(f"PB抓包中没有可导入的目标 (解析失败 {failed} 帧)。", "playback")
+            return
+
+        for target_id, points in tracks.items():
+            row = self.playback_table.rowCount()
+            start_time = points[0]["lastDT"]
+            end_time = points[-1]["lastDT"]
+            mmsi = str(points[0]["mmsi"]) if points[0]["mmsi"] else ""
+            # 缓存参数与 handle_draw_trajectory_checkbox 读取表格后得到的参数保持一致，勾选时直接命中缓存
+            self.playback_query_cache[row] = {
+                "params": {"mmsi": mmsi, "id": str(target_id), "province": None,
+                           "start_time": start_time, "end_time": end_time},
+                "points": points
+            }
+            # 建行期间屏蔽 itemChanged，避免勾选框在其余单元格创建前触发查询
+            self.playback_table.blockSignals(True)
+            self.add_playback_query_row(params={"draw": True, "mmsi": mmsi, "id": str(target_id),
+                                                "start_time": start_time, "end_time": end_time})
+            self.playback_table.blockSignals(False)
+            duration_min = (points[-1]["lastTm"] - points[0]["lastTm"]) / 60000.0
+            duration_item = QTableWidgetItem(f"{duration_min:.1f}")
+            duration_item.setFlags(duration_item.flags() & ~Qt.ItemIsEditable)
+            self.playback_table.setItem(row, 7, duration_item)
+
+        self.log_message(f"已从PB抓包导入 {len(tracks)} 条轨迹，共 {len(columns)} 个点 (解析失败 {failed} 帧)。", "playback")
+        self.draw_trajectories()
+
     def draw_trajectories(self, item=None, fit_view=True):
         """
         在预览区绘制所有被勾选的轨迹，并实现高级可视化功能。
@@ -2917,6 +3892,7 @@ class MainWindow(QWidget):
     #         self.log_message("所有轨迹回放完毕。", "playback")
 
 
+    @profiled("log_message")
     def log_message(self, message, tab='realtime'):
         """
         将消息记录到指定的日志显示区域。
@@ -2999,7 +3975,19 @@ class MainWindow(QWidget):
         self.simulation_timer.stop()
         self.association_timer.stop()
         self.static_sending_timer.stop()
+        self.fleet_static_timer.stop()
+        self.bds_fleet_timer.stop()
+        self.scenario_timer.stop()
         self.playback_timer.stop()
+        self.trajectory_sending_timer.stop()
+        if self.playback_prep_worker is not None:
+            self.playback_prep_worker.cancel()
+            self.playback_prep_worker.wait()
+        if self.scenario_compile_worker is not None:
+            self.scenario_compile_worker.cancel()
+            self.scenario_compile_worker.wait()
+        if self.topic_tap:
+            self.stop_topic_tap()
 
         if (self.association_state =="sending") or (self.association_state =="paused"):
             # 获取当前目标类型并发送状态为3的消息
@@ -3008,6 +3996,14 @@ class MainWindow(QWidget):
             self._send_protobuf_data(selected_class, override_status=3)
             self.log_message("终止消息已发送。")
 
+        if self.bds_fleet is not None:
+            self.stop_bds_fleet()
+        if self.scenario_player is not None:
+            self.stop_scenario()
+        self.multi_target_timer.stop()
+        if len(self.multi_target_store):
+            self._send_multi_target_deletes(range(len(self.multi_target_store)))
+
         if self.kafka_producer:
             self.kafka_producer.close()
         if self.db:
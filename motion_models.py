@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from location_calculator import (KNOTS_TO_MPS, constant_accel_travel, destination_points, great_circle_distance,
+                                 initial_bearing, offset_points)
+
+# 目标运动模型。
+# 每个模型的 evaluate(times) 一次计算整个时刻数组上的位置、航速、航向（numpy 向量化，没有逐步的Python循环），
+# times 为相对航迹开始的秒数（升序）。evaluate_tracks 把多条航迹排成 (船数, 时刻数) 的数组，
+# 可以提前为成千上万艘船生成航迹、缓存后按时间顺序发送。
+# 模型也可以由字典描述（见 model_from_spec），便于写入场景文件：
+#   {"type": "zigzag", "latitude": 36.0, "longitude": 120.3, "speed": 12, "course": 90,
+#    "amplitude": 30, "leg_seconds": 300, "noise": {"sigma": 0.5, "seed": 7}}
+
+TRACK_FIELDS = ("latitude", "longitude", "speed", "course")
+
+
+class MotionModel:
+    """运动模型基类。"""
+    def evaluate(self, times):
+        """
+        :param times: 相对开始时刻的秒数（一维数组，升序）
+        :return: (纬度, 经度, 航速(节), 航向(度)) 四个与 times 等长的 float64 数组
+        """
+        raise NotImplementedError
+
+
+def _full(value, times):
+    return np.full(times.shape, float(value))
+
+
+class ConstantCourse(MotionModel):
+    """定向航行，航速按 accel（节/分）线性变化，与实时目标页签的“目标关联”一致。"""
+    def __init__(self, latitude, longitude, speed, course, accel=0.0):
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.speed = float(speed)
+        self.course = float(course)
+        self.accel = float(accel)
+
+    def evaluate(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        distance, speed = constant_accel_travel(self.speed, self.accel, times)
+        latitude, longitude = destination_points(self.latitude, self.longitude, self.course, distance)
+        return latitude, longitude, speed, _full(self.course, times)
+
+
+class WaypointRoute(MotionModel):
+    """
+    按航路点匀速航行，各段走大圆航线。
+    :param waypoints: [(纬度, 经度), ...]，至少两个点
+    :param loop: 为 True 时到达终点后回到起点循环；否则停在终点（航速为0）
+    """
+    def __init__(self, waypoints, speed, loop=False):
+        points = np.asarray(waypoints, dtype=np.float64)
+        if points.ndim != 2 or points.shape[0] < 2 or points.shape[1] != 2:
+            raise ValueError("航路点至少需要两个 (纬度, 经度)。")
+        if loop:
+            points = np.vstack([points, points[:1]])
+        self.speed = float(speed)
+        self.loop = loop
+        self._start_lat, self._start_lon = points[:-1, 0], points[:-1, 1]
+        self._end_lat, self._end_lon = points[1:, 0], points[1:, 1]
+        lengths = great_circle_distance(self._start_lat, self._start_lon, self._end_lat, self._end_lon)
+        self._leg_bearing = initial_bearing(self._start_lat, self._start_lon, self._end_lat, self._end_lon)
+        self._leg_offset = np.concatenate([[0.0], np.cumsum(lengths)[:-1]])
+        self.total_distance = float(lengths.sum())
+
+    def evaluate(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        distance = self.speed * KNOTS_TO_MPS * times
+        if self.loop and self.total_distance > 0:
+            distance = distance % self.total_distance
+            arrived = np.zeros(times.shape, dtype=bool)
+        else:
+            arrived = distance >= self.total_distance
+            distance = np.minimum(distance, self.total_distance)
+        leg = np.clip(np.searchsorted(self._leg_offset, distance, side="right") - 1, 0, len(self._leg_offset) - 1)
+        latitude, longitude = destination_points(self._start_lat[leg], self._start_lon[leg], self._leg_bearing[leg],
+                                                 distance - self._leg_offset[leg])
+        # 大圆航线上的航向逐点变化：取当前点指向本段终点的航向，段终点处取本段的初始航向
+        remaining = great_circle_distance(latitude, longitude, self._end_lat[leg], self._end_lon[leg])
+        course = np.where(remaining > 1.0,
+                          initial_bearing(latitude, longitude, self._end_lat[leg], self._end_lon[leg]),
+                          self._leg_bearing[leg])
+        speed = np.where(arrived, 0.0, self.speed)
+        return latitude, longitude, speed, course
+
+
+class ConstantTurn(MotionModel):
+    """
+    以恒定角速度转向的圆弧航行（局部切平面上计算，适用于几十公里以内）。
+    :param turn_rate: 转向角速度（度/秒），正数右转（顺时针），0 为直航
+    """
+    def __init__(self, latitude, longitude, speed, course, turn_rate):
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.speed = float(speed)
+        self.course = float(course)
+        self.turn_rate = float(turn_rate)
+
+    def evaluate(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        speed_mps = self.speed * KNOTS_TO_MPS
+        course0 = np.radians(self.course)
+        omega = np.radians(self.turn_rate)
+        if abs(omega) < 1e-12:
+            east = speed_mps * times * np.sin(course0)
+            north = speed_mps * times * np.cos(course0)
+            course = _full(self.course, times)
+        else:
+            heading = course0 + omega * times
+            radius = speed_mps / omega
+            east = radius * (np.cos(course0) - np.cos(heading))
+            north = radius * (np.sin(heading) - np.sin(course0))
+            course = np.degrees(heading) % 360.0
+        latitude, longitude = offset_points(self.latitude, self.longitude, east, north)
+        return latitude, longitude, _full(self.speed, times), course
+
+
+class ZigZag(MotionModel):
+    """
+    之字形巡逻：航向在 course + amplitude 与 course - amplitude 之间交替，每段 leg_seconds 秒
+    （局部切平面上计算）。
+    """
+    def __init__(self, latitude, longitude, speed, course, amplitude, leg_seconds):
+        if leg_seconds <= 0:
+            raise ValueError("每段时长必须大于0。")
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.speed = float(speed)
+        self.course = float(course)
+        self.amplitude = float(amplitude)
+        self.leg_seconds = float(leg_seconds)
+
+    def evaluate(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        speed_mps = self.speed * KNOTS_TO_MPS
+        course_plus = np.radians(self.course + self.amplitude)
+        course_minus = np.radians(self.course - self.amplitude)
+        leg = np.floor(times / self.leg_seconds).astype(np.int64)
+        in_leg = times - leg * self.leg_seconds
+        # 第0段为 +amplitude；第 k 段之前共有 (k+1)//2 个 + 段和 k//2 个 - 段
+        plus_legs = (leg + 1) // 2
+        minus_legs = leg // 2
+        current = np.where(leg % 2 == 0, course_plus, course_minus)
+        leg_length = speed_mps * self.leg_seconds
+        east = leg_length * (plus_legs * np.sin(course_plus) + minus_legs * np.sin(course_minus)) \
+            + speed_mps * in_leg * np.sin(current)
+        north = leg_length * (plus_legs * np.cos(course_plus) + minus_legs * np.cos(course_minus)) \
+            + speed_mps * in_leg * np.cos(current)
+        latitude, longitude = offset_points(self.latitude, self.longitude, east, north)
+        return latitude, longitude, _full(self.speed, times), np.degrees(current) % 360.0
+
+
+class Loiter(MotionModel):
+    """
+    绕中心点以 radius 米为半径匀速盘旋。
+    :param start_bearing: 起点相对中心的方位（度）
+    """
+    def __init__(self, latitude, longitude, radius, speed, clockwise=True, start_bearing=0.0):
+        if radius <= 0:
+            raise ValueError("盘旋半径必须大于0。")
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.radius = float(radius)
+        self.speed = float(speed)
+        self.clockwise = bool(clockwise)
+        self.start_bearing = float(start_bearing)
+
+    def evaluate(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        sign = 1.0 if self.clockwise else -1.0
+        bearing = self.start_bearing + sign * np.degrees(self.speed * KNOTS_TO_MPS / self.radius * times)
+        latitude, longitude = destination_points(self.latitude, self.longitude, bearing, self.radius)
+        return latitude, longitude, _full(self.speed, times), (bearing + sign * 90.0) % 360.0
+
+
+class RandomWalkNoise(MotionModel):
+    """
+    在另一个模型的位置上叠加东、北方向独立的随机游走偏移，模拟定位噪声和航迹抖动。
+    同样的 seed 和 times 得到同样的结果。
+    :param sigma: 偏移的增长速度（米/√秒），即每秒偏移增量的标准差
+    """
+    def __init__(self, model, sigma, seed=0):
+        self.model = model
+        self.sigma = float(sigma)
+        self.seed = seed
+
+    def evaluate(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        latitude, longitude, speed, course = self.model.evaluate(times)
+        if not len(times) or self.sigma <= 0:
+            return latitude, longitude, speed, course
+        rng = np.random.default_rng(self.seed)
+        scale = self.sigma * np.sqrt(np.diff(times, prepend=times[0]).clip(min=0.0))
+        east = np.cumsum(rng.standard_normal(len(times)) * scale)
+        north = np.cumsum(rng.standard_normal(len(times)) * scale)
+        latitude, longitude = offset_points(latitude, longitude, east, north)
+        return latitude, longitude, speed, course
+
+
+MODEL_TYPES = {
+    "constant": ConstantCourse,
+    "waypoints": WaypointRoute,
+    "turn": ConstantTurn,
+    "zigzag": ZigZag,
+    "loiter": Loiter,
+}
+
+
+def model_from_spec(spec):
+    """
+    由字典构建模型：type 取值见 MODEL_TYPES，其余键为构造参数；
+    可选的 noise: {"sigma": ..., "seed": ...} 叠加随机游走。
+    """
+    spec = dict(spec)
+    model_type = spec.pop("type", None)
+    noise = spec.pop("noise", None)
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"未知的运动模型类型: {model_type}，可选 {list(MODEL_TYPES)}")
+    model = MODEL_TYPES[model_type](**spec)
+    if noise:
+        model = RandomWalkNoise(model, **noise)
+    return model
+
+
+def evaluate_tracks(models, times):
+    """
+    :param models: 运动模型列表
+    :param times: 各模型共用的时刻数组（秒）
+    :return: {字段: (船数, 时刻数) 的 float64 数组}，字段见 TRACK_FIELDS
+    """
+    times = np.asarray(times, dtype=np.float64)
+    tracks = {key: np.empty((len(models), len(times))) for key in TRACK_FIELDS}
+    for i, model in enumerate(models):
+        for key, values in zip(TRACK_FIELDS, model.evaluate(times)):
+            tracks[key][i] = values
+    return tracks
+
+
+def random_models(count, center, seed=0, radius_deg=0.3, noise_sigma=0.0):
+    """
+    在 center=(纬度, 经度) 周围随机生成 count 个不同类型的运动模型，相同种子结果相同。
+    :param noise_sigma: 大于0时为每个模型叠加随机游走（米/√秒）
+    """
+    rng = np.random.default_rng(seed)
+    center_lat, center_lon = center
+    kinds = rng.choice(list(MODEL_TYPES), size=count, p=[0.3, 0.25, 0.1, 0.15, 0.2])
+    models = []
+    for i, kind in enumerate(kinds):
+        latitude = center_lat + rng.uniform(-radius_deg, radius_deg)
+        longitude = center_lon + rng.uniform(-radius_deg, radius_deg)
+        speed = rng.uniform(3.0, 18.0)
+        course = rng.uniform(0.0, 360.0)
+        if kind == "constant":
+            model = ConstantCourse(latitude, longitude, speed, course, accel=rng.choice([0.0, 0.0, 0.2, -0.1]))
+        elif kind == "waypoints":
+            points = [(latitude, longitude)] + [
+                (center_lat + rng.uniform(-radius_deg, radius_deg), center_lon + rng.uniform(-radius_deg, radius_deg))
+                for _ in range(rng.integers(2, 6))]
+            model = WaypointRoute(points, speed, loop=bool(rng.integers(0, 2)))
+        elif kind == "turn":
+            model = ConstantTurn(latitude, longitude, speed, course, turn_rate=rng.uniform(-1.0, 1.0))
+        elif kind == "zigzag":
+            model = ZigZag(latitude, longitude, speed, course, amplitude=rng.uniform(15.0, 45.0),
+                           leg_seconds=rng.uniform(120.0, 600.0))
+        else:
+            model = Loiter(latitude, longitude, radius=rng.uniform(300.0, 3000.0), speed=speed,
+                           clockwise=bool(rng.integers(0, 2)), start_bearing=course)
+        if noise_sigma > 0:
+            model = RandomWalkNoise(model, noise_sigma, seed=int(seed) * 1000003 + i)
+        models.append(model)
+    return models
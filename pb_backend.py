@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+# 启动时检查 protobuf 的运行时实现。
+# upb / cpp 为C实现，纯python实现的序列化速度要慢一个数量级以上，高频发送时会成为瓶颈。
+
+FAST_BACKENDS = ("upb", "cpp")
+
+
+def get_protobuf_backend():
+    """返回当前 protobuf 运行时实现名称: 'upb' / 'cpp' / 'python'。"""
+    from google.protobuf.internal import api_implementation
+    return api_implementation.Type()
+
+
+def build_sample_message():
+    """构造一条与实时发送内容相当的 TargetProtoList，用于序列化测速。"""
+    import target_pb2
+
+    target_list = target_pb2.TargetProtoList()
+    target = target_list.list.add()
+    target.id = 1123456789012345678
+    target.lastTm = int(time.time() * 1000)
+    target.sost = 1
+    target.eTargetType = target_pb2.TT_AR
+    target.adapterId = 15
+    target.status = 2
+    target.maxLen = 90
+    pos_info = target.pos
+    pos_info.id = target.id
+    pos_info.mmsi = 412345678
+    pos_info.vesselName = "SIMU VESSEL"
+    pos_info.speed = 12.5
+    pos_info.course = 90.0
+    pos_info.heading = 90.0
+    pos_info.len = 90
+    pos_info.shiptype = 70
+    pos_info.geoPtn.longitude = 122.92539836
+    pos_info.geoPtn.latitude = 37.10129318
+    pos_info.displayId = target.id % 100000
+    pos_info.quality = 100
+    pos_info.period = 10
+    pos_info.aidtype = 1
+    for source_type, station_type, ids in (("AIS", 65, ("334", "337")), ("RADAR", 82, ("18",))):
+        source = target.sources.add()
+        source.provider = "HLX"
+        source.type = source_type
+        for an_id in ids:
+            source.ids.append(an_id)
+            info = target.vecFusionedTargetInfo.add()
+            info.uiStationType = station_type
+            info.ullPosUpdateTime = target.lastTm
+            info.ullUniqueId = target.id
+            info.uiStationId = int(an_id)
+    return target_list
+
+
+def measure_serialize_rate(duration_seconds=0.5):
+    """
+    测量当前实现下 SerializeToString 的速率。
+    :return: 每秒可序列化的消息条数。
+    """
+    message = build_sample_message()
+    count = 0
+    start = time.perf_counter()
+    deadline = start + duration_seconds
+    while True:
+        for _ in range(100):
+            message.SerializeToString()
+        count += 100
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - start)
+
+
+def check_protobuf_backend(log=print, bench_seconds=0.5):
+    """
+    检查 protobuf 是否使用了C实现；如果是纯python实现，给出实测的序列化速率作为警告。
+    :param log: 输出函数。
+    :return: (实现名称, 序列化速率或None)
+    """
+    try:
+        backend = get_protobuf_backend()
+    except ImportError as e:
+        log(f"警告: 无法检测 protobuf 运行时实现: {e}")
+        return None, None
+
+    if backend in FAST_BACKENDS:
+        log(f"protobuf 运行时实现: {backend}")
+        return backend, None
+
+    rate = measure_serialize_rate(bench_seconds)
+    log(
+        f"警告: protobuf 当前使用纯python实现 ('{backend}')，实测序列化速率约 {rate:.0f} 条/秒。"
+        "高频发送时CPU开销会明显增大。请安装带C扩展的 protobuf 版本 (pip install --force-reinstall protobuf)，"
+        "并确认未设置环境变量 PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=python。"
+    )
+    return backend, rate
+
+
+if __name__ == '__main__':
+    backend, rate = check_protobuf_backend()
+    if rate is None and backend:
+        print(f"序列化速率: {measure_serialize_rate():.0f} 条/秒")
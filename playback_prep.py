@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import json
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import target_pb2
+
+# 回放轨迹发送前的数据准备。
+# 缓存中的轨迹点(字典列表)一次性转换为按列存放的 numpy 数组，经纬度偏移、时间基准换算整体向量化完成；
+# sources / fusionTargets 的JSON按不同的字符串只解析一次。
+# 发送时由 PlaybackStream 对各条轨迹做多路归并，按下标从数组取值即时构建 TargetProto，不再物化整个发送队列。
+
+# fusionTargets.stationType -> vecFusionedTargetInfo.uiStationType，未知类型为 0
+STATION_TYPES = {"RADAR": 82, "AIS": 65}
+
+# 每次转换的点数，同时也是进度上报的粒度
+CHUNK_SIZE = 50000
+
+# 归并时每条轨迹每次取出的点数
+STREAM_BLOCK_SIZE = 4096
+
+# 循环播放时两轮之间的间隔(ms)
+LOOP_GAP_MS = 1000
+
+_POS_HAS_ADAPTER_ID = 'adapterId' in target_pb2.cTargProto.DESCRIPTOR.fields_by_name
+
+
+class JsonFieldCache:
+    """
+    按原始JSON字符串缓存 sources / fusionTargets 的解析结果。
+    同一条轨迹中这两个字段大量重复，相同字符串只解析一次；解析失败的字符串缓存为 None。
+    """
+    def __init__(self):
+        self._sources = {}
+        self._fusion = {}
+        self.errors = []  # [(字段名, 原始字符串)]
+
+    def sources(self, text):
+        """:return: ((provider, type, (id, ...)), ...) 或 None"""
+        if not text:
+            return None
+        try:
+            return self._sources[text]
+        except KeyError:
+            pass
+        try:
+            parsed = tuple(
+                (item.get("provider", ""), item.get("type", ""),
+                 tuple(str(an_id) for an_id in item["ids"]) if isinstance(item.get("ids"), list) else ())
+                for item in json.loads(text)
+            )
+        except (ValueError, TypeError, AttributeError):
+            parsed = None
+            self.errors.append(("sources", text))
+        self._sources[text] = parsed
+        return parsed
+
+    def fusion(self, text):
+        """:return: ((ullUniqueId, uiStationId, uiStationType, updateTime), ...) 或 None"""
+        if not text:
+            return None
+        try:
+            return self._fusion[text]
+        except KeyError:
+            pass
+        try:
+            parsed = tuple(
+                (int(item.get("targetId") or 0),
+                 int(item.get("stationId") or 0),
+                 STATION_TYPES.get(str(item.get("stationType", "")).upper(), 0),
+                 int(item.get("updateTime") or 0))
+                for item in json.loads(text)
+            )
+        except (ValueError, TypeError, AttributeError):
+            parsed = None
+            self.errors.append(("fusionTargets", text))
+        self._fusion[text] = parsed
+        return parsed
+
+
+def _numeric(values, dtype):
+    """将数据库返回的值(int/float/Decimal/数字字符串)转换为数组。"""
+    try:
+        return np.array(values, dtype=dtype)
+    except (ValueError, TypeError):
+        return np.array([float(v) for v in values]).astype(dtype)
+
+
+def _normalize_status(status):
+    if not status or status == 'UNKNOW':
+        return 2
+    if isinstance(status, str) and status.isdigit():
+        return int(status)
+    return status
+
+
+class PreparedTrack:
+    """
+    一条轨迹准备好的按列数据，只包含时间戳有效的点，保持原始顺序。
+    """
+    NUMERIC_COLUMNS = (
+        # (属性名, 轨迹点字段, 缺省值, dtype)
+        ("last_tm", "lastTm", 0, np.int64),
+        ("longitude", "longitude", 0.0, np.float64),
+        ("latitude", "latitude", 0.0, np.float64),
+        ("speed", "speed", 0.0, np.float64),
+        ("course", "course", 0.0, np.float64),
+        ("heading", "heading", 0.0, np.float64),
+        ("max_len", "maxLen", 0, np.int64),
+        ("length", "len", 0, np.int64),
+        ("id_r", "idR", 0, np.int64),
+        ("ship_type", "shipType", 99, np.int64),
+        ("state", "state", 0, np.int64),
+        ("aid_type", "aidType", 0, np.int64),
+        ("mmsi", "mmsi", 0, np.int64),
+    )
+
+    def __init__(self, row, target_id):
+        self.row = row
+        self.target_id = target_id
+        self.total_points = 0
+        self.skipped_points = 0
+        self.first_ts = 0
+        self.last_ts = 0
+
+    def __len__(self):
+        return len(self.last_tm)
+
+    @property
+    def duration_minutes(self):
+        return (self.last_ts - self.first_ts) / 60000.0
+
+
+def _convert_chunk(points, json_cache, s_class_map):
+    columns = {}
+    for attr, key, default, dtype in PreparedTrack.NUMERIC_COLUMNS:
+        columns[attr] = _numeric([p.get(key) or default for p in points], dtype)
+    columns["vessel_name"] = [p.get('vesselName') or '' for p in points]
+    columns["target_type"] = [p.get('targetType') or 'TT_A' for p in points]
+    columns["status"] = [_normalize_status(p.get('status')) for p in points]
+    columns["province"] = [p.get('province') for p in points]
+    columns["s_class"] = [s_class_map.get(p.get('sClass', ''), 0) for p in points]
+    columns["sources"] = [json_cache.sources(p.get('sources')) for p in points]
+    columns["fusion"] = [json_cache.fusion(p.get('fusionTargets')) for p in points]
+    return columns
+
+
+def prepare_track(row, points, target_id, json_cache, s_class_map, progress_callback=None, is_cancelled=None):
+    """
+    将一条轨迹的点转换为 PreparedTrack（偏移、MMSI、省份在 prepare_playback 中统一处理）。
+    :return: PreparedTrack，取消时返回 None
+    """
+    track = PreparedTrack(row, target_id)
+    track.total_points = len(points)
+    track.first_ts = int(points[0].get('lastTm') or 0)
+    track.last_ts = int(points[-1].get('lastTm') or 0)
+
+    chunks = []
+    for start in range(0, len(points), CHUNK_SIZE):
+        if is_cancelled and is_cancelled():
+            return None
+        chunk = points[start:start + CHUNK_SIZE]
+        chunks.append(_convert_chunk(chunk, json_cache, s_class_map))
+        if progress_callback:
+            progress_callback(len(chunk))
+
+    for attr, key, default, dtype in PreparedTrack.NUMERIC_COLUMNS:
+        setattr(track, attr, np.concatenate([c[attr] for c in chunks]))
+    valid = track.last_tm != 0
+    track.skipped_points = int(np.count_nonzero(~valid))
+    if track.skipped_points:
+        for attr, key, default, dtype in PreparedTrack.NUMERIC_COLUMNS:
+            setattr(track, attr, getattr(track, attr)[valid])
+    keep = np.flatnonzero(valid) if track.skipped_points else None
+    for attr in ("vessel_name", "target_type", "status", "province", "s_class", "sources", "fusion"):
+        values = [v for c in chunks for v in c[attr]]
+        setattr(track, attr, [values[i] for i in keep] if keep is not None else values)
+
+    track.sost = np.where(track.state == 0, 14, track.state)
+    track.pos_state = np.where(track.state == 0, 1, track.state)
+    return track
+
+
+class PreparedPlayback:
+    """多条轨迹准备完成后的结果。"""
+    def __init__(self, tracks, first_db_timestamp, lon_offset, lat_offset, json_errors):
+        self.tracks = tracks
+        self.first_db_timestamp = first_db_timestamp
+        self.lon_offset = lon_offset
+        self.lat_offset = lat_offset
+        self.json_errors = json_errors
+
+    @property
+    def total_points(self):
+        return sum(len(track) for track in self.tracks)
+
+
+class PlaybackStream:
+    """
+    按原始时间对多条轨迹做惰性多路归并，每次取出一个待发送的点。
+    每条轨迹本身已按时间排序（数据库查询 ORDER BY lastTm），只需维护一个大小为轨迹数的堆，
+    内存占用与总点数无关。时间相同的点按轨迹顺序、点的原始顺序发送。
+
+    发送时间 = 原始时间 + time_offset：
+    - 暂停/继续时由调用方把暂停时长加到 time_offset 上，后续节奏保持不变
+    - seek() 在各轨迹上二分查找起始位置，并让该时刻的点在指定时间发送
+    - loop 为 True 时播放完毕后从头开始，time_offset 增加一个周期，发送时间单调递增
+    """
+    def __init__(self, prepared, start_send_time, loop=False, loop_gap_ms=LOOP_GAP_MS):
+        self.prepared = prepared
+        self.loop = loop
+        self.loop_gap_ms = loop_gap_ms
+        self.cycle = 0
+        self.sent = 0
+        self.first_tm = prepared.first_db_timestamp
+        self.last_tm = int(max(track.last_tm.max() for track in prepared.tracks))
+        self.time_offset = start_send_time - self.first_tm
+
+        # 个别轨迹可能存在乱序点，仅对该轨迹排序
+        self._orders = []
+        self._sorted_tm = []
+        for track in prepared.tracks:
+            last_tm = track.last_tm
+            if len(last_tm) > 1 and np.any(last_tm[1:] < last_tm[:-1]):
+                order = np.argsort(last_tm, kind='stable')
+                self._orders.append(order)
+                self._sorted_tm.append(last_tm[order])
+            else:
+                self._orders.append(None)
+                self._sorted_tm.append(last_tm)
+        self._restart([0] * len(prepared.tracks))
+
+    @property
+    def total_points(self):
+        return self.prepared.total_points
+
+    @property
+    def loop_period(self):
+        """循环播放一轮的时长(ms)：原始时间跨度加上两轮之间的间隔。"""
+        return self.last_tm - self.first_tm + self.loop_gap_ms
+
+    def _restart(self, positions):
+        self.sent_by_row = {track.row: int(pos) for track, pos in zip(self.prepared.tracks, positions)}
+        self._merged = heapq.merge(*(self._iter_track(i, pos) for i, pos in enumerate(positions)))
+        self._pending = None
+
+    def _iter_track(self, track_index, position):
+        order = self._orders[track_index]
+        sorted_tm = self._sorted_tm[track_index]
+        for start in range(position, len(sorted_tm), STREAM_BLOCK_SIZE):
+            times = sorted_tm[start:start + STREAM_BLOCK_SIZE].tolist()
+            if order is None:
+                indices = range(start, start + len(times))
+            else:
+                indices = order[start:start + STREAM_BLOCK_SIZE].tolist()
+            for original_tm, point_index in zip(times, indices):
+                yield original_tm, track_index, point_index
+
+    def seek(self, original_tm, send_time):
+        """
+        跳转到原始时间 original_tm：之后第一个不早于该时间的点将在 send_time 发送。
+        :return: 跳过的点数（相对于各轨迹开头）
+        """
+        positions = [int(np.searchsorted(sorted_tm, original_tm, side='left')) for sorted_tm in self._sorted_tm]
+        self._restart(positions)
+        # 跳转时间落在两个点之间时，以其后第一个点为基准，避免跳转后空等
+        next_tms = [int(sorted_tm[pos]) for sorted_tm, pos in zip(self._sorted_tm, positions) if pos < len(sorted_tm)]
+        self.time_offset = send_time - (min(next_tms) if next_tms else original_tm)
+        return sum(positions)
+
+    def peek(self):
+        """:return: 下一个点 (PreparedTrack, 点下标, 发送时间)，没有更多点时返回 None。"""
+        if self._pending is None:
+            item = next(self._merged, None)
+            if item is None:
+                if not self.loop:
+                    return None
+                self.cycle += 1
+                self.time_offset += self.loop_period
+                self._restart([0] * len(self.prepared.tracks))
+                item = next(self._merged, None)
+                if item is None:
+                    return None
+            self._pending = item
+        original_tm, track_index, point_index = self._pending
+        return self.prepared.tracks[track_index], point_index, original_tm + self.time_offset
+
+    def next(self):
+        """取出下一个点，格式同 peek()。"""
+        item = self.peek()
+        if item is not None:
+            self._pending = None
+            self.sent += 1
+            self.sent_by_row[item[0].row] += 1
+        return item
+
+
+def prepare_playback(trajectories, base_lon=None, base_lat=None, override_mmsi=None, province_override=0,
+                     adapter_id_by_name_en=None, s_class_map=None, progress_callback=None, is_cancelled=None):
+    """
+    准备多条轨迹的发送数据。
+    :param trajectories: [(表格行号, 轨迹点列表, 目标ID), ...]，第一条轨迹的第一个点作为坐标基准
+    :param base_lon/base_lat: 界面输入的基准经纬度，均不为 None 时整体平移坐标
+    :param override_mmsi: 起始MMSI，有MMSI的轨迹依次使用 override_mmsi, override_mmsi+1, ...
+    :param province_override: 界面选择的 adapterId，为 0 时按轨迹点的省份英文名查找（默认 12）
+    :param adapter_id_by_name_en: 省份英文名 -> adapterId
+    :param s_class_map: sClass -> pos.s_class，即 ui_options.eTargetType
+    :param progress_callback: progress_callback(已处理点数, 总点数)
+    :param is_cancelled: 返回 True 时中止准备
+    :return: PreparedPlayback，取消时返回 None
+    :raises ValueError: 无法确定坐标或时间基准
+    """
+    adapter_id_by_name_en = adapter_id_by_name_en or {}
+    s_class_map = s_class_map or {}
+    json_cache = JsonFieldCache()
+    total = sum(len(points) for row, points, target_id in trajectories)
+    done = [0]
+
+    def on_chunk(count):
+        done[0] += count
+        if progress_callback:
+            progress_callback(done[0], total)
+
+    lon_offset, lat_offset = 0.0, 0.0
+    if base_lon is not None and base_lat is not None:
+        location_base_point = trajectories[0][1][0]
+        lon_offset = base_lon - float(location_base_point.get('longitude', 0.0))
+        lat_offset = base_lat - float(location_base_point.get('latitude', 0.0))
+
+    tracks = []
+    mmsi_counter = 0
+    for row, points, target_id in trajectories:
+        track = prepare_track(row, points, target_id, json_cache, s_class_map, on_chunk, is_cancelled)
+        if track is None:
+            return None
+        if len(track) == 0:
+            continue
+
+        track.longitude += lon_offset
+        track.latitude += lat_offset
+        if override_mmsi and np.any(track.mmsi):
+            track.mmsi[:] = override_mmsi + mmsi_counter
+            mmsi_counter += 1
+        if province_override:
+            track.adapter_id = np.full(len(track), int(province_override), dtype=np.int64)
+        else:
+            lookup = {}
+            for name in set(track.province):
+                lookup[name] = int(adapter_id_by_name_en.get(name, 12))
+            track.adapter_id = np.array([lookup[name] for name in track.province], dtype=np.int64)
+        tracks.append(track)
+
+    if not tracks:
+        raise ValueError("所有轨迹点都缺少有效时间戳。")
+    first_db_timestamp = int(min(track.last_tm.min() for track in tracks))
+    return PreparedPlayback(tracks, first_db_timestamp, lon_offset, lat_offset, json_cache.errors)
+
+
+def build_playback_target(track, i, time_offset):
+    """
+    按下标从 PreparedTrack 构建一个 TargetProto。
+    :param time_offset: 发送时间与原始时间的差值，同时加到 lastTm 与各信息源的更新时间上
+    """
+    target = target_pb2.TargetProto()
+    target.id = track.target_id
+    target.lastTm = int(track.last_tm[i]) + time_offset
+    target.maxLen = int(track.max_len[i])
+    target.adapterId = int(track.adapter_id[i])
+    target.eTargetType = track.target_type[i]
+    target.sost = int(track.sost[i])
+    target.status = track.status[i]
+
+    pos_info = target.pos
+    pos_info.id = target.id
+    pos_info.mmsi = int(track.mmsi[i])
+    pos_info.vesselName = track.vessel_name[i]
+    pos_info.speed = float(track.speed[i])
+    pos_info.course = float(track.course[i])
+    pos_info.len = int(track.length[i])
+    pos_info.id_r = int(track.id_r[i])
+    pos_info.shiptype = int(track.ship_type[i])
+    pos_info.geoPtn.longitude = float(track.longitude[i])
+    pos_info.geoPtn.latitude = float(track.latitude[i])
+    pos_info.displayId = int(target.id) % 100000
+    pos_info.state = int(track.pos_state[i])
+    pos_info.quality = 100
+    pos_info.heading = float(track.heading[i])
+    pos_info.s_class = track.s_class[i]
+    pos_info.m_mmsi = pos_info.mmsi
+    pos_info.aidtype = int(track.aid_type[i])
+    if _POS_HAS_ADAPTER_ID:
+        pos_info.adapterId = target.adapterId
+
+    sources = track.sources[i]
+    if sources:
+        for provider, source_type, ids in sources:
+            source_pb = target.sources.add()
+            source_pb.provider = provider
+            source_pb.type = source_type
+            source_pb.ids.extend(ids)
+
+    fusion = track.fusion[i]
+    if fusion:
+        for unique_id, station_id, station_type, update_time in fusion:
+            ft_pb = target.vecFusionedTargetInfo.add()
+            ft_pb.ullUniqueId = unique_id
+            ft_pb.uiStationId = station_id
+            ft_pb.uiStationType = station_type
+            ft_pb.ullPosUpdateTime = update_time + time_offset
+    return target
+
+
+class PlaybackPrepWorker(QThread):
+    """
+    在后台线程中执行 prepare_playback，避免准备大量轨迹点时阻塞界面。
+    progress(已处理点数, 总点数)；完成后发出 prepared(PreparedPlayback)，出错时发出 failed(错误信息)。
+    """
+    progress = pyqtSignal(int, int)
+    prepared = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, trajectories, options, parent=None):
+        super().__init__(parent)
+        self.trajectories = trajectories
+        self.options = options
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            result = prepare_playback(
+                self.trajectories,
+                progress_callback=self.progress.emit,
+                is_cancelled=lambda: self._cancelled,
+                **self.options
+            )
+        except (ValueError, TypeError, KeyError, IndexError) as e:
+            self.failed.emit(str(e))
+            return
+        except Exception as e:  # 其他异常也必须通知界面，否则发送一直停在准备状态
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        if result is not None and not self._cancelled:
+            self.prepared.emit(result)
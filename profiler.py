@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# 发送热点路径的可选性能剖析。
+# 关闭时 span() 返回共享的空上下文，profiled 装饰的函数只多一次属性判断；
+# 打开后各阶段的耗时记录在固定容量的环形缓冲区中，可导出为 Chrome trace JSON
+# （chrome://tracing、Perfetto、speedscope 均可打开，嵌套的阶段显示为火焰图）。
+# 运行中切换：界面日志区的“性能剖析”复选框，或
+#   python profiler.py on   # 修改 config.json 的 profiling 节，配置热加载后开始记录
+#   python profiler.py off  # 停止记录，程序自动把trace写到 profiling.trace_path
+#   python profiler.py summary profile_trace.json  # 按阶段汇总trace文件
+
+DEFAULT_CAPACITY = 200000
+DEFAULT_TRACE_PATH = "profile_trace.json"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start_ns")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start_ns, time.perf_counter_ns() - self.start_ns, self.args)
+        return False
+
+
+class Profiler:
+    """
+    记录 (阶段名, 开始时间ns, 耗时ns, 线程ID, 参数) 的环形缓冲区，写满后丢弃最早的记录。
+    deque.append 是线程安全的，后台线程中也可以使用。
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.enabled = False
+        self._spans = deque(maxlen=capacity)
+        self._thread_names = {}
+
+    @property
+    def capacity(self):
+        return self._spans.maxlen
+
+    def enable(self, capacity=None):
+        if capacity and capacity != self._spans.maxlen:
+            self._spans = deque(self._spans, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._spans.clear()
+
+    def __len__(self):
+        return len(self._spans)
+
+    def span(self, name, **args):
+        """with profiler.span("阶段名"): ...，关闭时不记录。"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def record(self, name, start_ns, duration_ns, args=None):
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+        self._spans.append((name, start_ns, duration_ns, thread_id, args))
+
+    def summary(self):
+        """:return: {阶段名: {count, total_ms, mean_us, max_us}}，按总耗时降序"""
+        return summarize((name, duration_ns / 1000.0) for name, start_ns, duration_ns, thread_id, args in self._spans)
+
+    def chrome_trace(self):
+        """:return: Chrome trace 格式的字典（完整事件 "ph": "X"，时间单位微秒）"""
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": thread_id, "args": {"name": thread_name}}
+                  for thread_id, thread_name in self._thread_names.items()]
+        for name, start_ns, duration_ns, thread_id, args in list(self._spans):
+            event = {"name": name, "cat": name.split(".")[0], "ph": "X", "pid": 1, "tid": thread_id,
+                     "ts": start_ns / 1000.0, "dur": duration_ns / 1000.0}
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path):
+        """:return: 写入的阶段记录数"""
+        trace = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False, default=str)
+        return sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+
+
+def summarize(name_durations_us):
+    stats = {}
+    for name, duration_us in name_durations_us:
+        entry = stats.get(name)
+        if entry is None:
+            stats[name] = entry = {"count": 0, "total_ms": 0.0, "mean_us": 0.0, "max_us": 0.0}
+        entry["count"] += 1
+        entry["total_ms"] += duration_us / 1000.0
+        entry["max_us"] = max(entry["max_us"], duration_us)
+    for entry in stats.values():
+        entry["mean_us"] = entry["total_ms"] * 1000.0 / entry["count"]
+    return dict(sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+
+# 进程内共享的实例
+profiler = Profiler()
+
+
+def span(name, **args):
+    return profiler.span(name, **args)
+
+
+def profiled(name):
+    """函数装饰器：剖析打开时把整个调用记录为一个阶段。"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _Span(profiler, name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def format_summary(stats, limit=None):
+    lines = [f"{'阶段':<32}{'次数':>10}{'总耗时(ms)':>14}{'平均(us)':>12}{'最大(us)':>12}"]
+    for name, entry in list(stats.items())[:limit]:
+        lines.append(f"{name:<32}{entry['count']:>10}{entry['total_ms']:>14.2f}"
+                     f"{entry['mean_us']:>12.1f}{entry['max_us']:>12.1f}")
+    return "\n".join(lines)
+
+
+def _set_config_profiling(config_path, enabled, trace_path):
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    profiling = config.setdefault("profiling", {})
+    profiling["enabled"] = enabled
+    if trace_path:
+        profiling["trace_path"] = trace_path
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    return profiling.get("trace_path", DEFAULT_TRACE_PATH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="运行中开关性能剖析（通过 config.json 热加载），或汇总导出的trace文件。")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command in ("on", "off"):
+        p = sub.add_parser(command, help="打开剖析" if command == "on" else "关闭剖析并由程序导出trace")
+        p.add_argument("--config", default="config.json", help="运行中程序使用的配置文件")
+        p.add_argument("--trace-path", help=f"关闭时trace的写入路径，默认 {DEFAULT_TRACE_PATH}")
+    p = sub.add_parser("summary", help="按阶段汇总 Chrome trace 文件")
+    p.add_argument("trace", help="导出的trace文件")
+    p.add_argument("-n", "--limit", type=int, default=None, help="只显示总耗时最多的前N个阶段")
+    args = parser.parse_args(argv)
+
+    if args.command == "summary":
+        with open(args.trace, "r", encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        stats = summarize((e["name"], e["dur"]) for e in events if e.get("ph") == "X")
+        print(format_summary(stats, args.limit))
+        return 0
+
+    trace_path = _set_config_profiling(args.config, args.command == "on", args.trace_path)
+    if args.command == "on":
+        print(f"已在 {args.config} 中打开性能剖析。")
+    else:
+        print(f"已在 {args.config} 中关闭性能剖析，trace 将写入 {trace_path}。")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
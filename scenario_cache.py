@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from bds_fleet import id_rule, random_ids
+from motion_models import TRACK_FIELDS, evaluate_tracks, model_from_spec, random_models
+from target_builder import RealtimeTargetTemplate, join_target_lists
+
+# 合成场景的预计算缓存。
+# 场景文件(JSON)描述时长、发送间隔和各目标的运动模型；“编译”时一次性算出所有目标在每个发送时刻的
+# 位置、航速、航向，按时刻为行、目标为列写入 .npy 文件（每个字段一个文件），发送时以内存映射方式打开，
+# 每一帧只读取一行并序列化，定时器路径上没有运动计算。
+# manifest.json 记录场景内容的哈希，场景未修改时再次运行直接复用缓存；manifest 最后写入，编译中断的缓存不会被使用。
+# 场景文件示例：
+#   {"duration": 3600, "interval": 10,
+#    "defaults": {"sost": 1, "eTargetType": 9, "adapterId": 37, "s_class": 1},
+#    "targets": [{"id": 1100000000000000001, "mmsi": 412000001, "vesselName": "SCN00001", "len": 120,
+#                 "motion": {"type": "turn", "latitude": 36.0, "longitude": 120.3, "speed": 10,
+#                            "course": 45, "turn_rate": 0.2}}],
+#    "random": {"count": 1000, "seed": 7, "center": [36.0, 120.3], "radius_deg": 0.3, "noise_sigma": 0.5}}
+# 用法: python scenario_cache.py compile scenario.json [-o 输出目录] [--force]
+#       python scenario_cache.py info 输出目录
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+TARGETS_FILE = "targets.json"
+TIME_FILE = "time_ms.npy"
+# 字段 -> 存储类型；航速、航向在 TargetProto 中本来就是 float
+COLUMN_DTYPES = {"latitude": np.float64, "longitude": np.float64, "speed": np.float32, "course": np.float32}
+# 编译时每次计算的目标数，限制中间数组的内存占用
+COMPILE_CHUNK_TARGETS = 256
+# 一条 TargetProtoList 消息最多包含的目标数
+PB_BATCH_SIZE = 200
+DEFAULT_ID_RULES = {"id": {"prefix": "11", "length": 19}, "mmsi": {"length": 9}}
+# 场景和界面都没有指定时使用的静态字段
+DEFAULT_FIELDS = {"sost": 1, "eTargetType": 0, "adapterId": 0, "mmsi": 0, "vesselName": "", "len": 0,
+                  "shiptype": 0, "s_class": 0, "is_radar": False, "sources": {}}
+
+
+def default_cache_dir(spec_path):
+    """场景文件 a/b.json 的缓存目录为 a/b.scenario"""
+    return os.path.splitext(spec_path)[0] + ".scenario"
+
+
+def spec_hash(spec):
+    text = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(f"{FORMAT_VERSION}:{text}".encode("utf-8")).hexdigest()
+
+
+def _scenario_targets(spec):
+    """:return: (运动模型列表, 各目标静态字段列表)；显式列出的目标在前，随机目标在后"""
+    defaults = spec.get("defaults", {})
+    models = []
+    fields = []
+    for i, target in enumerate(spec.get("targets", [])):
+        if "motion" not in target:
+            raise ValueError(f"第 {i + 1} 个目标缺少 motion。")
+        models.append(model_from_spec(target["motion"]))
+        fields.append({**defaults, **{key: value for key, value in target.items() if key != "motion"}})
+
+    random_spec = spec.get("random")
+    if random_spec:
+        count = int(random_spec["count"])
+        seed = int(random_spec.get("seed", 0))
+        models.extend(random_models(count, tuple(random_spec["center"]), seed=seed,
+                                    radius_deg=float(random_spec.get("radius_deg", 0.3)),
+                                    noise_sigma=float(random_spec.get("noise_sigma", 0.0))))
+        rng = np.random.default_rng(seed)
+        id_rules = spec.get("id_rules", DEFAULT_ID_RULES)
+        ids = random_ids(rng, count, **id_rule(id_rules, "id"))
+        mmsis = random_ids(rng, count, **id_rule(id_rules, "mmsi"))
+        lengths = rng.integers(20, 300, count).tolist()
+        for i in range(count):
+            fields.append({**defaults, "id": int(ids[i]), "mmsi": int(mmsis[i]),
+                           "vesselName": f"SCN{i:05d}", "len": lengths[i]})
+
+    for i, target in enumerate(fields):
+        if "id" not in target:
+            raise ValueError(f"第 {i + 1} 个目标缺少 id。")
+    if not models:
+        raise ValueError("场景中没有目标。")
+    return models, fields
+
+
+def compile_scenario(spec, out_dir, force=False, progress_callback=None, is_cancelled=None):
+    """
+    计算场景中所有目标在每个发送时刻的状态并写入 out_dir。缓存与场景内容一致时直接返回。
+    :param spec: 场景字典，见文件开头的说明
+    :param progress_callback: progress_callback(已完成目标数, 目标总数)
+    :return: 是否重新编译；取消时返回 None（不写 manifest，缓存视为未编译）
+    """
+    digest = spec_hash(spec)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            if json.load(f).get("spec_hash") == digest:
+                return False
+
+    duration = float(spec["duration"])
+    interval = float(spec["interval"])
+    if duration <= 0 or interval <= 0:
+        raise ValueError("场景时长和发送间隔必须大于0。")
+    models, fields = _scenario_targets(spec)
+    times = np.arange(0.0, duration, interval)
+
+    os.makedirs(out_dir, exist_ok=True)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    np.save(os.path.join(out_dir, TIME_FILE), np.round(times * 1000).astype(np.int64))
+    columns = {key: np.lib.format.open_memmap(os.path.join(out_dir, f"{key}.npy"), mode="w+",
+                                              dtype=COLUMN_DTYPES[key], shape=(len(times), len(models)))
+               for key in TRACK_FIELDS}
+    for start in range(0, len(models), COMPILE_CHUNK_TARGETS):
+        if is_cancelled and is_cancelled():
+            return None
+        stop = min(start + COMPILE_CHUNK_TARGETS, len(models))
+        tracks = evaluate_tracks(models[start:stop], times)
+        tracks["course"] %= 360.0
+        for key in TRACK_FIELDS:
+            columns[key][:, start:stop] = tracks[key].T
+        if progress_callback:
+            progress_callback(stop, len(models))
+    for column in columns.values():
+        column.flush()
+    del columns
+
+    with open(os.path.join(out_dir, TARGETS_FILE), "w", encoding="utf-8") as f:
+        json.dump(fields, f, ensure_ascii=False)
+    manifest = {
+        "version": FORMAT_VERSION,
+        "spec_hash": digest,
+        "duration": duration,
+        "interval": interval,
+        "frames": len(times),
+        "targets": len(models),
+        "compiled_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return True
+
+
+def load_spec(spec_path):
+    with open(spec_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ScenarioCache:
+    """
+    以内存映射方式打开编译好的场景，数组形状为 (帧数, 目标数)，按帧读取时只访问对应的一行。
+    :param defaults: 场景未指定的静态字段（如界面上的省份、目标类型），优先级低于场景
+    """
+    def __init__(self, cache_dir, defaults=None):
+        manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"{cache_dir} 不是编译完成的场景缓存。")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"场景缓存版本 {self.manifest.get('version')} 与当前版本 {FORMAT_VERSION} 不一致，请重新编译。")
+        with open(os.path.join(cache_dir, TARGETS_FILE), "r", encoding="utf-8") as f:
+            self.target_fields = json.load(f)
+        self.cache_dir = cache_dir
+        self.interval = float(self.manifest["interval"])
+        self.time_ms = np.load(os.path.join(cache_dir, TIME_FILE))
+        for key in TRACK_FIELDS:
+            setattr(self, key, np.load(os.path.join(cache_dir, f"{key}.npy"), mmap_mode="r"))
+        base = {**DEFAULT_FIELDS, **(defaults or {})}
+        self.templates = [RealtimeTargetTemplate({**base, **fields}) for fields in self.target_fields]
+
+    @property
+    def frame_count(self):
+        return len(self.time_ms)
+
+    @property
+    def target_count(self):
+        return len(self.templates)
+
+    @property
+    def period_ms(self):
+        """循环发送一轮的时长(ms)"""
+        return int(self.frame_count * self.interval * 1000)
+
+    def frame_messages(self, frame, last_tm, status, batch_size=PB_BATCH_SIZE):
+        """
+        读取一帧并序列化全部目标，按 batch_size 拼接为多目标 TargetProtoList。
+        :return: 消息 bytes 列表
+        """
+        lat = self.latitude[frame].tolist()
+        lon = self.longitude[frame].tolist()
+        speed = self.speed[frame].tolist()
+        course = self.course[frame].tolist()
+        chunks = [template.render(last_tm, status, lon[k], lat[k], speed[k], course[k]).SerializeToString()
+                  for k, template in enumerate(self.templates)]
+        return join_target_lists(chunks, batch_size)
+
+
+class ScenarioPlayer:
+    """
+    按帧发送场景：第 k 帧在开始后 time_ms[k] 发送，lastTm = 开始时的墙钟 + time_ms[k]。
+    帧是全部目标的快照，定时器延迟时只发送最新到期的一帧，跳过的帧计入 skipped。
+    :param start_time: 单调时钟的开始时间
+    :param start_wall: 对应的 time.time()
+    :param loop: 为 True 时播放完毕后从头开始，lastTm 每轮增加一个周期
+    """
+    def __init__(self, cache, start_time, start_wall, loop=False):
+        self.cache = cache
+        self.start_time = start_time
+        self.start_tm = int(start_wall * 1000)
+        self.loop = loop
+        self.sent = 0  # 已处理的帧数（跨周期累计，含跳过的帧）
+        self.skipped = 0
+        self.messages = 0
+        self.last_frame = None  # 最近发送的 (帧下标, lastTm)
+
+    @property
+    def cycle(self):
+        return self.sent // self.cache.frame_count
+
+    @property
+    def finished(self):
+        return not self.loop and self.sent >= self.cache.frame_count
+
+    def due_messages(self, now):
+        """:return: 从上次调用到 now 之间到期的消息 bytes 列表"""
+        cache = self.cache
+        due = int((now - self.start_time) / cache.interval) + 1
+        if not self.loop:
+            due = min(due, cache.frame_count)
+        if due <= self.sent:
+            return []
+        if due - self.sent > 1:
+            self.skipped += due - 1 - self.sent
+        cycle, frame = divmod(due - 1, cache.frame_count)
+        last_tm = self.start_tm + cycle * cache.period_ms + int(cache.time_ms[frame])
+        messages = cache.frame_messages(frame, last_tm, 1 if self.last_frame is None else 2)
+        self.sent = due
+        self.last_frame = (frame, last_tm)
+        self.messages += len(messages)
+        return messages
+
+    def delete_messages(self, wall_time):
+        """:return: 在最近发送的位置上为全部目标生成删除消息（数据状态3），尚未发送过时返回空列表"""
+        if self.last_frame is None:
+            return []
+        return self.cache.frame_messages(self.last_frame[0], int(wall_time * 1000), 3)
+
+
+class ScenarioCompileWorker(QThread):
+    """
+    在后台线程中读取并编译场景文件，避免大场景阻塞界面。
+    progress(已完成目标数, 目标总数)；完成后发出 compiled(缓存目录, 是否重新编译)，出错时发出 failed(错误信息)。
+    """
+    progress = pyqtSignal(int, int)
+    compiled = pyqtSignal(str, bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, spec_path, cache_dir, force=False, parent=None):
+        super().__init__(parent)
+        self.spec_path = spec_path
+        self.cache_dir = cache_dir
+        self.force = force
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            result = compile_scenario(load_spec(self.spec_path), self.cache_dir, force=self.force,
+                                      progress_callback=self.progress.emit,
+                                      is_cancelled=lambda: self._cancelled)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.failed.emit(str(e))
+            return
+        except Exception as e:  # 其他异常（如时长/间隔过大导致的 MemoryError）也必须通知界面
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        if result is not None and not self._cancelled:
+            self.compiled.emit(self.cache_dir, result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="编译合成场景为内存映射缓存，或查看已编译的缓存。")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("compile", help="预计算场景中所有目标的航迹")
+    p.add_argument("spec", help="场景文件(JSON)")
+    p.add_argument("-o", "--output", help="缓存目录，默认与场景文件同名的 .scenario 目录")
+    p.add_argument("--force", action="store_true", help="场景未修改时也重新编译")
+    p = sub.add_parser("info", help="显示缓存信息")
+    p.add_argument("cache_dir", help="缓存目录")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        cache = ScenarioCache(args.cache_dir)
+        for key, value in cache.manifest.items():
+            print(f"{key}: {value}")
+        return 0
+
+    out_dir = args.output or default_cache_dir(args.spec)
+    start = time.perf_counter()
+    compiled = compile_scenario(load_spec(args.spec), out_dir, force=args.force,
+                                progress_callback=lambda done, total: print(f"\r已计算 {done}/{total} 个目标", end=""))
+    if compiled:
+        print(f"\n编译完成，耗时 {time.perf_counter() - start:.1f}s，缓存目录 {out_dir}")
+    else:
+        print(f"场景未修改，直接使用缓存 {out_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from location_calculator import constant_accel_travel, destination_points
+
+
+class SimulationModel:
+    """
+    实时目标的运动状态，全精度浮点保存，与界面控件无关。
+    保存最近一次参数变化时的“锚点”（位置、航速、时刻），任意时刻的位置由锚点解析计算：
+    航速按 accel（节/分，负数为减速）线性变化、减速到0后停止，沿锚点处的航向走大圆航线。
+    计算结果与调用频率无关，发送时按消息的 lastTm 求值。
+    时间使用 time.time()（秒），与 lastTm 为同一时钟。
+    """
+    def __init__(self, latitude, longitude, speed, course, accel=0.0, now=None):
+        self.latitude = float(latitude)  # 锚点
+        self.longitude = float(longitude)
+        self.speed = float(speed)
+        self.course = float(course)
+        self.accel = float(accel)
+        self.running = False
+        self.anchor_time = time.time() if now is None else now
+
+    def state_at(self, now=None):
+        """:return: now 时刻的 (纬度, 经度, 航速)；暂停时为锚点"""
+        if not self.running:
+            return self.latitude, self.longitude, self.speed
+        now = time.time() if now is None else now
+        return self._travel(now - self.anchor_time)
+
+    def _travel(self, seconds):
+        if seconds <= 0:
+            return self.latitude, self.longitude, self.speed
+        distance, speed = constant_accel_travel(self.speed, self.accel, seconds)
+        latitude, longitude = destination_points(self.latitude, self.longitude, self.course, distance)
+        return float(latitude), float(longitude), float(speed)
+
+    def advance(self, seconds):
+        """把锚点沿当前参数推进 seconds 秒（不考虑运行状态），用于按暂停时长补算位移。"""
+        self.latitude, self.longitude, self.speed = self._travel(seconds)
+
+    def _reanchor(self, now):
+        now = time.time() if now is None else now
+        self.latitude, self.longitude, self.speed = self.state_at(now)
+        self.anchor_time = now
+
+    def start(self, now=None):
+        self.anchor_time = time.time() if now is None else now
+        self.running = True
+
+    def pause(self, now=None):
+        self._reanchor(now)
+        self.running = False
+
+    def set_params(self, now=None, **params):
+        """
+        修改航速、航向、加速度或位置。先把锚点移到 now，新参数从此刻开始生效。
+        :param params: speed / course / accel / latitude / longitude
+        """
+        self._reanchor(now)
+        for name, value in params.items():
+            if name not in ("speed", "course", "accel", "latitude", "longitude"):
+                raise KeyError(name)
+            setattr(self, name, float(value))
+
+    def snapshot(self, now=None):
+        """:return: now 时刻的 (经度, 纬度, 航速, 航向)"""
+        latitude, longitude, speed = self.state_at(now)
+        return longitude, latitude, speed, self.course
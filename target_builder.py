@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import target_pb2
+
+# 实时目标的 TargetProto 模板。
+# 一个运行中的目标在两次发送之间只有位置、航速、航向、lastTm、数据状态以及信息源更新时间会变化，
+# 其余字段（ID、MMSI、船名、类型、省份、信息源列表等）只在界面修改后才需要重新构建。
+
+# 信息源: (键, sources.type, vecFusionedTargetInfo.uiStationType)
+SOURCE_TYPES = (
+    ("ais", "AIS", 65),
+    ("radar", "RADAR", 82),
+    ("bds", "BDS", 66),  # Assuming 66 for BDS
+)
+
+
+def parse_source_ids(text):
+    """解析逗号分隔的信息源ID。"""
+    return [an_id.strip() for an_id in text.split(',') if an_id.strip()]
+
+
+def join_target_lists(serialized, batch_size):
+    """
+    把逐个序列化的单目标 TargetProtoList 按 batch_size 拼接为多目标消息。
+    repeated 字段的多段编码直接拼接等价于一个包含全部元素的 TargetProtoList，无需复制消息对象。
+    """
+    return [b"".join(serialized[start:start + batch_size]) for start in range(0, len(serialized), batch_size)]
+
+
+class RealtimeTargetTemplate:
+    """
+    预先构建好静态字段的 TargetProtoList，每次发送只覆盖动态字段。
+    :param static_fields: 静态字段字典，键包括
+        id, sost, eTargetType, adapterId, mmsi, vesselName, len, shiptype, s_class, is_radar,
+        sources: {源键: [id字符串, ...]}
+    """
+    def __init__(self, static_fields):
+        self.static_fields = static_fields
+        self.message = target_pb2.TargetProtoList()
+        self.target = self.message.list.add()
+        self._fusion_infos = {}
+        self._build(static_fields)
+
+    def _build(self, fields):
+        target = self.target
+        target.id = fields["id"]
+        target.sost = fields["sost"]
+        target.eTargetType = fields["eTargetType"]
+        target.adapterId = fields["adapterId"]
+
+        pos_info = target.pos
+        pos_info.id = target.id
+        pos_info.mmsi = fields["mmsi"]
+        pos_info.vesselName = fields["vesselName"]
+        pos_info.len = fields["len"]
+        pos_info.shiptype = fields["shiptype"]
+        target.maxLen = pos_info.len
+        pos_info.displayId = int(target.id) % 100000
+        if fields["is_radar"]:
+            pos_info.id_r = 18
+        pos_info.state = target.sost
+        pos_info.quality = 100
+        pos_info.period = 10
+        pos_info.s_class = fields["s_class"]
+        pos_info.m_mmsi = pos_info.mmsi
+        pos_info.aidtype = 1
+
+        sources = fields.get("sources", {})
+        for key, source_type, station_type in SOURCE_TYPES:
+            ids = sources.get(key)
+            if not ids:
+                continue
+            source = target.sources.add()
+            source.provider = "HLX"
+            source.type = source_type
+            infos = []
+            for an_id in ids:
+                source.ids.append(an_id)
+                info = target.vecFusionedTargetInfo.add()
+                info.uiStationType = station_type
+                info.ullUniqueId = target.id
+                info.uiStationId = int(an_id)
+                infos.append(info)
+            self._fusion_infos[key] = infos
+
+    def source_keys(self):
+        """返回模板中存在的信息源键，如 ['ais', 'radar']。"""
+        return list(self._fusion_infos.keys())
+
+    def render(self, last_tm, status, longitude, latitude, speed, course, source_update_times=None):
+        """
+        覆盖动态字段并返回可直接序列化的 TargetProtoList（原地修改，不复制）。
+        :param source_update_times: {源键: ullPosUpdateTime}，缺省时使用 last_tm。
+        """
+        target = self.target
+        target.lastTm = last_tm
+        target.status = status
+        pos_info = target.pos
+        pos_info.speed = speed
+        pos_info.course = course
+        pos_info.heading = pos_info.course
+        pos_info.geoPtn.longitude = longitude
+        pos_info.geoPtn.latitude = latitude
+        for key, infos in self._fusion_infos.items():
+            update_time = source_update_times.get(key, last_tm) if source_update_times else last_tm
+            for info in infos:
+                info.ullPosUpdateTime = update_time
+        return self.message
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from json_payloads import bds_template, encode_ais_record, iter_ais_exts_batches
+from location_calculator import constant_accel_travel, destination_points
+from target_builder import RealtimeTargetTemplate, join_target_lists
+
+# 实时目标页签的多目标表。
+# - 各目标的运动状态（位置、航速、航向、加速度、发送周期、下次发送时间、运行状态）按列保存在 numpy 数组中，
+#   不变字段（ID、MMSI、类型、信息源等）在加入时从目标信息区取一次快照，消息模板按行只构建一次
+# - 位置、航速保存为参数变化时的锚点，发送和显示时按当前时刻解析计算（同 SimulationModel），
+#   与定时器节拍无关
+# - 所有目标共用一个调度定时器：每次触发只计算到期目标的位置并合并发送
+#   （Protobuf 拼接为多目标 TargetProtoList，BDS 每个终端一条JSON）
+# - TargetTableModel 直接读取这些数组供 QTableView 显示，界面刷新与发送节拍分开，按需节流
+
+STOPPED, SENDING, PAUSED = 0, 1, 2
+STATE_NAMES = {STOPPED: "停止", SENDING: "发送中", PAUSED: "暂停"}
+
+PB_BATCH_SIZE = 200
+
+# 运动状态数组: 字段 -> dtype
+_ARRAY_FIELDS = {
+    # 锚点：anchor_time（单调时钟）时刻的位置和航速
+    "latitude": np.float64, "longitude": np.float64, "speed": np.float64, "anchor_time": np.float64,
+    "course": np.float64,
+    "accel": np.float64,     # 航速变化率（节/分），负数为减速，与目标关联的加速/减速一致
+    "interval": np.float64,  # 发送周期（秒）
+    "next_due": np.float64,  # 下次发送的单调时钟时间
+    "state": np.int8,
+    "reported": np.bool_,    # 已发送过（数据状态 1 -> 2）
+    "sent": np.int64,
+    # 最近一次刷新显示时的位置和航速
+    "shown_latitude": np.float64, "shown_longitude": np.float64, "shown_speed": np.float64,
+}
+# 修改时需要先移动锚点的字段
+_MOTION_FIELDS = ("latitude", "longitude", "speed", "course", "accel")
+
+
+class TargetStore:
+    """
+    多目标的状态存储与调度，不依赖界面。
+    行号即数组下标，删除行后后面的行号前移。
+    """
+    def __init__(self):
+        for name, dtype in _ARRAY_FIELDS.items():
+            setattr(self, name, np.zeros(0, dtype=dtype))
+        self.static = []  # 每行的不变字段，见 add()
+        self._pb_templates = []
+        self._bds_templates = []
+
+    def __len__(self):
+        return len(self.static)
+
+    def prepare_row(self, static_fields, latitude, longitude, speed, course, accel=0.0, interval=3.0):
+        """
+        校验参数并构建一行的消息模板，不修改存储；出错时抛出 ValueError / TypeError。
+        :param static_fields: RealtimeTargetTemplate 所需字段，另加
+            class(目标类型), terminal(北斗号), shipName, province(省份英文名), provider(北斗信息源)
+        :return: 交给 append_row() 的行数据
+        """
+        if interval <= 0:
+            raise ValueError("发送周期必须大于0。")
+        selected_class = static_fields["class"]
+        pb_template = RealtimeTargetTemplate(static_fields) if selected_class != "BDS" else None
+        bds = (bds_template(province=static_fields["province"], provider=static_fields["provider"],
+                            ship_length=float(static_fields["len"]), ship_name=static_fields["shipName"],
+                            terminal=static_fields["terminal"])
+               if "BDS" in selected_class else None)
+        values = {"latitude": latitude, "longitude": longitude, "speed": speed, "anchor_time": 0.0,
+                  "course": course, "accel": accel, "interval": interval, "next_due": 0.0, "state": STOPPED,
+                  "reported": False, "sent": 0,
+                  "shown_latitude": latitude, "shown_longitude": longitude, "shown_speed": speed}
+        arrays = {name: np.array([value], dtype=_ARRAY_FIELDS[name]) for name, value in values.items()}
+        return static_fields, arrays, pb_template, bds
+
+    def append_row(self, row_data):
+        """追加 prepare_row() 构建好的一行，不会失败。:return: 新行号"""
+        static_fields, arrays, pb_template, bds = row_data
+        for name, array in arrays.items():
+            setattr(self, name, np.append(getattr(self, name), array))
+        self.static.append(static_fields)
+        self._pb_templates.append(pb_template)
+        self._bds_templates.append(bds)
+        return len(self.static) - 1
+
+    def add(self, static_fields, **motion):
+        """:return: 新行号，参数见 prepare_row()"""
+        return self.append_row(self.prepare_row(static_fields, **motion))
+
+    def remove(self, rows):
+        keep = np.ones(len(self), dtype=bool)
+        keep[list(rows)] = False
+        for name in _ARRAY_FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
+        kept = np.flatnonzero(keep).tolist()
+        self.static = [self.static[i] for i in kept]
+        self._pb_templates = [self._pb_templates[i] for i in kept]
+        self._bds_templates = [self._bds_templates[i] for i in kept]
+
+    def active_count(self):
+        return int(np.count_nonzero(self.state == SENDING))
+
+    def start(self, rows, now):
+        """
+        开始或继续发送，立即发送一次。
+        :return: 从停止状态开始的行（需要先发送一次AIS静态信息）
+        """
+        rows = [row for row in rows if self.state[row] != SENDING]
+        started = [row for row in rows if self.state[row] == STOPPED]
+        self.anchor_time[rows] = now
+        self.state[rows] = SENDING
+        self.next_due[rows] = now
+        return started
+
+    def pause(self, rows, now):
+        rows = [row for row in rows if self.state[row] == SENDING]
+        self._reanchor(rows, now)
+        self.state[rows] = PAUSED
+        return rows
+
+    def terminate(self, rows, now, wall_time):
+        """:return: 已发送过的目标的删除消息（数据状态3），位置为 now 时刻的位置"""
+        rows = [row for row in rows if self.state[row] != STOPPED]
+        self._reanchor(rows, now)
+        messages = self._protobuf_messages([row for row in rows if self.reported[row]], int(wall_time * 1000), status=3)
+        self.state[rows] = STOPPED
+        self.reported[rows] = False
+        return messages
+
+    def set_value(self, row, name, value, now):
+        """修改单个目标的参数；运动参数先把锚点移到 now，新值从此刻开始生效。"""
+        if name in _MOTION_FIELDS:
+            self._reanchor([row], now)
+        getattr(self, name)[row] = value
+        if name in ("latitude", "longitude", "speed"):
+            getattr(self, "shown_" + name)[row] = value
+
+    def ais_static_messages(self, rows):
+        """为含AIS的目标构建一次性的AIS静态信息（MMSI、船名），多个目标合并为一条 AisExts 消息。"""
+        fragments = [encode_ais_record({"MMSI": str(self.static[row]["mmsi"]),
+                                        "Vessel Name": self.static[row]["vesselName"]})
+                     for row in rows if self.static[row]["mmsi"]]
+        return [message for message, count in iter_ais_exts_batches(fragments, PB_BATCH_SIZE)]
+
+    def state_at(self, rows, now):
+        """
+        计算指定行在 now 时刻的位置和航速：发送中的目标由锚点解析计算，其余为锚点。
+        :return: (纬度数组, 经度数组, 航速数组)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        latitude, longitude, speed = self.latitude[rows], self.longitude[rows], self.speed[rows]
+        running = self.state[rows] == SENDING
+        if running.any():
+            moving = rows[running]
+            distance, speed[running] = constant_accel_travel(
+                self.speed[moving], self.accel[moving], np.maximum(now - self.anchor_time[moving], 0.0))
+            latitude[running], longitude[running] = destination_points(
+                self.latitude[moving], self.longitude[moving], self.course[moving], distance)
+        return latitude, longitude, speed
+
+    def _reanchor(self, rows, now):
+        if len(rows):
+            self.latitude[rows], self.longitude[rows], self.speed[rows] = self.state_at(rows, now)
+            self.anchor_time[rows] = now
+
+    def update_shown(self, now):
+        """计算全部目标在 now 时刻的值供表格显示。"""
+        if len(self):
+            self.shown_latitude, self.shown_longitude, self.shown_speed = self.state_at(np.arange(len(self)), now)
+
+    def _protobuf_messages(self, rows, last_tm, status=None, positions=None):
+        """:param positions: 与 rows 对应的 (纬度, 经度, 航速) 列表，缺省时使用锚点"""
+        if positions is None:
+            positions = (self.latitude[rows].tolist(), self.longitude[rows].tolist(), self.speed[rows].tolist())
+        latitude, longitude, speed = positions
+        chunks = []
+        for k, row in enumerate(rows):
+            template = self._pb_templates[row]
+            if template is None:
+                continue
+            target_status = status if status is not None else (2 if self.reported[row] else 1)
+            chunks.append(template.render(last_tm, target_status, longitude[k], latitude[k], speed[k],
+                                          float(self.course[row])).SerializeToString())
+        return join_target_lists(chunks, PB_BATCH_SIZE)
+
+    def tick(self, now, wall_time):
+        """
+        取出到期的目标，按 now 时刻计算其位置后构建消息。
+        :param now: 单调时钟
+        :param wall_time: time.time()，用于 lastTm 和 utc（与 now 同时读取）
+        :return: (unionTargetPb 消息列表, BDS JSON 消息列表, 到期的行)
+        """
+        due = np.flatnonzero((self.state == SENDING) & (self.next_due <= now))
+        if not len(due):
+            return [], [], []
+        # 按周期推进下次发送时间，定时器延迟时不累积误差，落后超过一个周期则从现在重新计时
+        self.next_due[due] = np.maximum(self.next_due[due] + self.interval[due], now)
+        rows = due.tolist()
+        latitude, longitude, speed = (values.tolist() for values in self.state_at(due, now))
+        pb_messages = self._protobuf_messages(rows, int(wall_time * 1000), positions=(latitude, longitude, speed))
+        utc = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(wall_time))
+        bds_messages = []
+        for k, row in enumerate(rows):
+            template = self._bds_templates[row]
+            if template is not None:
+                bds_messages.append(template.render_bytes(round(float(self.course[row]), 1), round(latitude[k], 8),
+                                                          round(longitude[k], 8), round(speed[k], 2), utc))
+        self.reported[due] = True
+        self.sent[due] += 1
+        return pb_messages, bds_messages, rows
+
+
+# 表格列: (键, 表头, 可编辑)
+COLUMNS = (
+    ("class", "类型", False), ("id", "ID", False), ("mmsi", "MMSI", False), ("name", "船名", False),
+    ("longitude", "经度", True), ("latitude", "纬度", True), ("speed", "航速", True), ("course", "航向", True),
+    ("accel", "加速度(节/分)", True), ("interval", "周期(秒)", True), ("state", "状态", False),
+    ("sent", "已发送", False),
+)
+_COLUMN_INDEX = {key: column for column, (key, header, editable) in enumerate(COLUMNS)}
+# 发送过程中会变化、需要定期刷新的列
+DYNAMIC_COLUMNS = (_COLUMN_INDEX["longitude"], _COLUMN_INDEX["sent"])
+_FORMATS = {"longitude": "{:.6f}", "latitude": "{:.6f}", "speed": "{:.2f}", "course": "{:.1f}",
+            "accel": "{:g}", "interval": "{:g}"}
+
+
+class TargetTableModel(QAbstractTableModel):
+    """TargetStore 的表格模型，显示值直接从数组读取；运动参数列可编辑，修改立即生效。"""
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section][1]
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if COLUMNS[index.column()][2]:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        store = self.store
+        row = index.row()
+        key = COLUMNS[index.column()][0]
+        if key in _FORMATS:
+            if key in ("latitude", "longitude", "speed"):
+                key = "shown_" + key
+            return _FORMATS[COLUMNS[index.column()][0]].format(float(getattr(store, key)[row]))
+        if key == "state":
+            return STATE_NAMES[int(store.state[row])]
+        if key == "sent":
+            return str(int(store.sent[row]))
+        fields = store.static[row]
+        if key == "class":
+            return fields["class"]
+        if key == "id":
+            return str(fields["id"] or "")
+        if key == "mmsi":
+            return str(fields["mmsi"] or "")
+        return fields["vesselName"] or fields["shipName"]
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        key = COLUMNS[index.column()][0]
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return False
+        if (key == "interval" and number <= 0) or (key == "speed" and number < 0):
+            return False
+        self.store.set_value(index.row(), key, number, time.monotonic())
+        self.dataChanged.emit(index, index)
+        return True
+
+    def add_target(self, static_fields, **motion):
+        """先构建并校验整行（可能抛出异常），再通知视图插入。"""
+        row_data = self.store.prepare_row(static_fields, **motion)
+        row = len(self.store)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.store.append_row(row_data)
+        self.endInsertRows()
+        return row
+
+    def remove_targets(self, rows):
+        self.beginResetModel()
+        self.store.remove(rows)
+        self.endResetModel()
+
+    def refresh_rows(self, rows=None):
+        """计算当前时刻的位置，刷新位置、航速等变化列以及状态列；rows 为 None 时刷新全部行。"""
+        if not len(self.store):
+            return
+        self.store.update_shown(time.monotonic())
+        first, last = (0, len(self.store) - 1) if rows is None else (min(rows), max(rows))
+        self.dataChanged.emit(self.index(first, DYNAMIC_COLUMNS[0]), self.index(last, DYNAMIC_COLUMNS[1]))
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# 发送定时精度测试。
+# 在离屏Qt平台上创建真实的主窗口（Kafka 换成空/文件 Sink，数据库指向不可达地址），
+# 驱动实时目标发送(sending_timer / simulation_timer)与 v4 轨迹回放(trajectory_sending_timer)，
+# 记录每条消息的实际发出时间并与计划时间比较，输出抖动分位数和累计漂移，
+# 据此给出在给定误差阈值内可以信赖的最高发送速率。
+# 用法: python timing_benchmark.py [-o timing_results.json] [--duration 5] [--sink null|file]
+
+DEFAULT_OUTPUT = "timing_results.json"
+PERCENTILES = (50, 90, 99)
+
+_app = None  # 保持 QApplication 的引用
+
+
+class RecordingSink:
+    """包装 NullSink / FileSink，记录每条消息的发出时间(ms)、topic 和内容。"""
+    def __init__(self, sink):
+        self.sink = sink
+        self.records = []
+
+    def __getattr__(self, name):
+        return getattr(self.sink, name)
+
+    def send_message(self, topic, message_bytes):
+        self.records.append((time.time() * 1000.0, topic, message_bytes))
+        return self.sink.send_message(topic, message_bytes)
+
+
+def _percentiles(values, prefix):
+    values = np.abs(np.asarray(values, dtype=np.float64))
+    if len(values) == 0:
+        return {}
+    result = {f"{prefix}_p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES}
+    result[f"{prefix}_max_ms"] = float(values.max())
+    return result
+
+
+def periodic_stats(times, interval_ms):
+    """
+    周期定时器的统计。计划时间为 第一次发出时间 + k * interval_ms。
+    - interval_jitter: 相邻两次的间隔与计划间隔之差
+    - drift: 最后一次发出时间相对计划时间的累计偏差（正值表示落后）
+    """
+    times = np.asarray(times, dtype=np.float64)
+    stats = {"emits": len(times), "interval_ms": interval_ms}
+    if len(times) < 2:
+        return stats
+    stats.update(_percentiles(np.diff(times) - interval_ms, "interval_jitter"))
+    scheduled = times[0] + np.arange(len(times)) * interval_ms
+    stats["drift_ms"] = float(times[-1] - scheduled[-1])
+    stats["drift_ms_per_min"] = stats["drift_ms"] / ((times[-1] - times[0]) / 60000.0)
+    stats["achieved_rate_hz"] = (len(times) - 1) / ((times[-1] - times[0]) / 1000.0)
+    return stats
+
+
+def scheduled_stats(actual, scheduled):
+    """
+    按计划时间发送的统计（v4 回放，计划时间即消息中的 lastTm）。
+    - lateness: 实际发出时间减计划时间
+    - drift: 最后 10% 与最初 10% 的平均延迟之差，反映延迟是否随时间累积
+    """
+    actual = np.asarray(actual, dtype=np.float64)
+    scheduled = np.asarray(scheduled, dtype=np.float64)
+    stats = {"emits": len(actual)}
+    if len(actual) == 0:
+        return stats
+    lateness = actual - scheduled
+    stats.update(_percentiles(lateness, "lateness"))
+    stats["lateness_mean_ms"] = float(lateness.mean())
+    tenth = max(1, len(lateness) // 10)
+    stats["drift_ms"] = float(lateness[-tenth:].mean() - lateness[:tenth].mean())
+    span = actual[-1] - actual[0]
+    if span > 0:
+        stats["drift_ms_per_min"] = stats["drift_ms"] / (span / 60000.0)
+        stats["achieved_rate_hz"] = (len(actual) - 1) / (span / 1000.0)
+    return stats
+
+
+def _harness_config(sink, work_dir):
+    """基于当前 config.json（不存在时用默认配置）生成测试用配置：空/文件 Sink，数据库不可达。"""
+    from config_loader import DEFAULT_CONFIG, ConfigError, default_config, load_config
+    try:
+        config, index = load_config()
+    except (OSError, ValueError, ConfigError):
+        config, index = default_config()
+    config = copy.deepcopy(config)
+    # 发送时需要一个省份(adapterId)；配置中没有省份时使用默认配置的“未选择”
+    if not config["ui_options"].get("province"):
+        config["ui_options"]["province"] = copy.deepcopy(DEFAULT_CONFIG["ui_options"]["province"])
+    config["kafka"].pop("file_sink", None)
+    config["kafka"].pop("null_sink", None)
+    if sink == "file":
+        config["kafka"]["file_sink"] = os.path.join(work_dir, "sink.jsonl")
+    else:
+        config["kafka"]["null_sink"] = True
+    config["starrocks"].update({"host": "127.0.0.1", "port": 1, "connect_timeout": 1, "max_retries": 0})
+    return config
+
+
+def create_window(sink, work_dir):
+    """在 work_dir 中写入测试配置并创建主窗口，返回 (窗口, RecordingSink)。"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from main_window import MainWindow
+
+    global _app
+    _app = QApplication.instance() or QApplication(sys.argv[:1])
+    with open(os.path.join(work_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(_harness_config(sink, work_dir), f, ensure_ascii=False, indent=2)
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        window = MainWindow()
+    finally:
+        os.chdir(cwd)
+    recorder = RecordingSink(window.kafka_producer)
+    window.kafka_producer = recorder
+    return window, recorder
+
+
+def run_event_loop(duration_ms, until=None, poll_ms=50):
+    """运行Qt事件循环 duration_ms 毫秒；until() 返回 True 时提前结束。"""
+    from PyQt5.QtCore import QEventLoop, QTimer
+
+    loop = QEventLoop()
+    QTimer.singleShot(int(duration_ms), loop.quit)
+    poll = None
+    if until is not None:
+        poll = QTimer()
+        poll.timeout.connect(lambda: until() and loop.quit())
+        poll.start(poll_ms)
+    loop.exec_()
+    if poll is not None:
+        poll.stop()
+
+
+def measure_realtime(window, recorder, rate_hz, duration_s):
+    """以 rate_hz 的频率运行实时目标发送 duration_s 秒，同时记录 simulation_timer 的触发时间。"""
+    topic = window.config["kafka"]["topic"]
+    for field, value in (("longitude", "122.92539836"), ("latitude", "37.10129318"),
+                         ("speed", "12.5"), ("course", "90"), ("len", "90")):
+        window.inputs[field].setText(value)
+    class_index = window.inputs["eTargetType"].findText("RADAR_AIS_A")
+    window.inputs["eTargetType"].setCurrentIndex(max(0, class_index))
+    window.keep_trend_combo.setCurrentText("否")
+    window.frequency_input.setText(f"{1.0 / rate_hz:g}")
+    interval_ms = int(float(window.frequency_input.text()) * 1000)
+
+    simulation_times = []
+    record_simulation = lambda: simulation_times.append(time.time() * 1000.0)
+    window.simulation_timer.timeout.connect(record_simulation)
+    recorder.records.clear()
+    window.toggle_sending_state()
+    run_event_loop(duration_s * 1000)
+    sent = [ts for ts, record_topic, data in recorder.records if record_topic == topic]
+    window.terminate_sending()
+    window.simulation_timer.timeout.disconnect(record_simulation)
+
+    return {
+        "rate_hz": rate_hz,
+        "sending_timer": periodic_stats(sent, interval_ms),
+        "simulation_timer": periodic_stats(simulation_times, 1000),
+    }
+
+
+def _load_playback_rows(window, trajectories):
+    from PyQt5.QtCore import Qt
+
+    window.playback_table.blockSignals(True)
+    window.playback_table.setRowCount(0)
+    window.playback_query_cache.clear()
+    for row, points, target_id in trajectories:
+        window.add_playback_query_row({})
+        window.playback_query_cache[row] = {"params": {}, "points": points}
+        window.playback_table.item(row, 0).setCheckState(Qt.Checked)
+    window.playback_table.blockSignals(False)
+
+
+def measure_playback(window, recorder, targets, rate_hz, duration_s, seed):
+    """v4 回放 targets 条轨迹，每条轨迹每秒 rate_hz 个点、时长 duration_s 秒。"""
+    import target_pb2
+    from benchmark import synthetic_track_points
+
+    rng = random.Random(seed)
+    points_per_track = int(duration_s * rate_hz) + 1
+    interval_ms = 1000.0 / rate_hz
+    trajectories = [(row, synthetic_track_points(points_per_track, 412000000 + row, rng, interval_ms=interval_ms),
+                     None) for row in range(targets)]
+    _load_playback_rows(window, trajectories)
+    window.playback_loop_checkbox.setChecked(False)
+    for field in ("longitude", "latitude", "mmsi"):
+        window.playback_send_inputs[field].clear()
+
+    topic = window.config["kafka"]["topic"]
+    recorder.records.clear()
+    window.send_selected_trajectories_v4()
+    finished = lambda: window.playback_stream is None and window.playback_prep_worker is None
+    run_event_loop((duration_s + 10) * 1000, until=finished)
+    completed = finished()
+    if not completed:
+        window.handle_playback_stop_sending_v4(completed=False)
+
+    actual, scheduled = [], []
+    message = target_pb2.TargetProtoList()
+    for ts, record_topic, data in recorder.records:
+        if record_topic != topic:
+            continue
+        message.ParseFromString(data)
+        actual.append(ts)
+        scheduled.append(message.list[0].lastTm)
+    stats = scheduled_stats(actual, scheduled)
+    stats.update({"targets": targets, "rate_hz_per_target": rate_hz, "aggregate_rate_hz": targets * rate_hz,
+                  "planned_points": targets * points_per_track, "completed": completed})
+    return stats
+
+
+def max_trusted_rate(scenarios, rate_key, jitter_key, jitter_threshold, drift_threshold):
+    """:return: 抖动 p99 与累计漂移都在阈值内的场景中的最高速率，没有满足条件的场景时返回 None"""
+    trusted = [s[rate_key] for s in scenarios
+               if s.get(jitter_key) is not None and s[jitter_key] <= jitter_threshold
+               and abs(s.get("drift_ms", 0.0)) <= drift_threshold and s.get("completed", True)]
+    return max(trusted) if trusted else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量实时发送与v4轨迹回放定时器的抖动和累计漂移（不需要Kafka和数据库）。")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help=f"结果输出路径，默认 {DEFAULT_OUTPUT}")
+    parser.add_argument("--duration", type=float, default=5.0, help="每个场景的发送时长(秒)")
+    parser.add_argument("--sink", choices=("null", "file"), default="null", help="消息输出：丢弃或写入临时文件")
+    parser.add_argument("--realtime-rates", type=float, nargs="+", default=[1, 10, 50],
+                        help="实时目标发送频率(Hz)")
+    parser.add_argument("--playback-targets", type=int, nargs="+", default=[1, 10, 50], help="回放轨迹条数")
+    parser.add_argument("--playback-rates", type=float, nargs="+", default=[1, 5, 10],
+                        help="回放每条轨迹的点频率(Hz)")
+    parser.add_argument("--jitter-threshold", type=float, default=20.0, help="可信速率的 p99 抖动上限(ms)")
+    parser.add_argument("--drift-threshold", type=float, default=100.0, help="可信速率的累计漂移上限(ms)")
+    parser.add_argument("--seed", type=int, default=20240601)
+    args = parser.parse_args(argv)
+
+    from benchmark import environment_info
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        window, recorder = create_window(args.sink, work_dir)
+
+        realtime = []
+        for rate in args.realtime_rates:
+            print(f"实时发送 {rate:g} Hz ...")
+            realtime.append(measure_realtime(window, recorder, rate, args.duration))
+            print(f"  {json.dumps(realtime[-1]['sending_timer'], ensure_ascii=False)}")
+
+        playback = []
+        for targets in args.playback_targets:
+            for rate in args.playback_rates:
+                print(f"v4回放 {targets} 条轨迹 x {rate:g} Hz ...")
+                playback.append(measure_playback(window, recorder, targets, rate, args.duration, args.seed))
+                print(f"  {json.dumps(playback[-1], ensure_ascii=False)}")
+
+        window.kafka_producer.close()
+        window.close()
+
+    realtime_flat = [dict(s["sending_timer"], rate_hz=s["rate_hz"]) for s in realtime]
+    summary = {
+        "realtime_max_trusted_rate_hz": max_trusted_rate(
+            realtime_flat, "rate_hz", "interval_jitter_p99_ms", args.jitter_threshold, args.drift_threshold),
+        "playback_max_trusted_aggregate_rate_hz": max_trusted_rate(
+            playback, "aggregate_rate_hz", "lateness_p99_ms", args.jitter_threshold, args.drift_threshold),
+        "jitter_threshold_ms": args.jitter_threshold,
+        "drift_threshold_ms": args.drift_threshold,
+    }
+    environment = environment_info()
+    environment.update({"sink": args.sink, "duration_s": args.duration, "seed": args.seed})
+    report = {"environment": environment, "summary": summary, "realtime": realtime, "playback": playback}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    print(f"结果已写入 {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())